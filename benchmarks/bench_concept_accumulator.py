@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concept merging via `merge_concept` (dict of Concept dataclasses) versus
+`ConceptAccumulator`, at 10k / 100k / 1M term occurrences.
+
+Reports wall time and tracemalloc peak for both paths and checks the outputs are
+identical.
+
+Usage:
+  python3 benchmarks/bench_concept_accumulator.py [--sizes 10000 100000 1000000] [--out results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import extract_nomenclature as en  # noqa: E402
+
+
+Occurrence = Tuple[str, str, int, Optional[List[str]]]
+
+
+def synth_occurrences(n: int, seed: int = 7) -> Tuple[List[Tuple[str, str]], List[Occurrence]]:
+    """n (term, definition, source index, aliases) occurrences over ~n/20 distinct terms."""
+    rng = random.Random(seed)
+    vocab = max(50, n // 20)
+    terms = [f"Term{i}.{rng.choice(['Query', 'Mutate', 'Probe', 'Emit'])}" for i in range(vocab)]
+    sources = [(f"engine/crate_{i % 40}/SYSTEM_PROMPT_{i}.md", ("system_prompt", "system_report", "library")[i % 3]) for i in range(200)]
+    occ: List[Occurrence] = []
+    for _ in range(n):
+        term = rng.choice(terms)
+        definition = f"Definition of {term}." if rng.random() < 0.05 else ""
+        aliases = [rng.choice(terms).lower(), term] if rng.random() < 0.02 else None
+        occ.append((term, definition, rng.randrange(len(sources)), aliases))
+    return sources, occ
+
+
+def run_merge_concept(sources: List[Tuple[str, str]], occ: List[Occurrence]) -> List[en.Concept]:
+    concepts: Dict[str, en.Concept] = {}
+    for term, definition, si, aliases in occ:
+        path, kind = sources[si]
+        en.merge_concept(concepts, term, definition, en.SourceRef(path=path, kind=kind), aliases=aliases)
+    return sorted(concepts.values(), key=lambda c: c.id)
+
+
+def run_accumulator(sources: List[Tuple[str, str]], occ: List[Occurrence]) -> List[en.Concept]:
+    acc = en.ConceptAccumulator()
+    for term, definition, si, aliases in occ:
+        path, kind = sources[si]
+        acc.add(term, definition, acc.source(path, kind), aliases=aliases)
+    return acc.finalize()
+
+
+def measure(fn, *args) -> Tuple[dict, List[en.Concept]]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 4), "peak_bytes": peak}, out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    results = []
+    for n in args.sizes:
+        sources, occ = synth_occurrences(n)
+        old, old_out = measure(run_merge_concept, sources, occ)
+        new, new_out = measure(run_accumulator, sources, occ)
+        identical = [(c.id, c.term, c.definition, c.aliases, c.sources) for c in old_out] == [
+            (c.id, c.term, c.definition, c.aliases, c.sources) for c in new_out
+        ]
+        row = {"occurrences": n, "concepts": len(new_out), "merge_concept": old, "accumulator": new, "identical": identical}
+        results.append(row)
+        print(
+            f"occurrences={n} concepts={len(new_out)} "
+            f"merge_concept_s={old['seconds']} merge_concept_peak_mb={old['peak_bytes'] / 1e6:.1f} "
+            f"accumulator_s={new['seconds']} accumulator_peak_mb={new['peak_bytes'] / 1e6:.1f} identical={int(identical)}"
+        )
+        del occ, old_out, new_out
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"benchmark": "concept_accumulator", "results": results}, indent=2) + "\n", encoding="utf-8")
+    return 0 if all(r["identical"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the nomenclature extractor and the TriBench merge.
+
+For each scenario a synthetic engine repo is generated (cached under --work-dir),
+then, each in a fresh process so peak RSS is per measurement:
+  - extract stages: catalog load, catalog extraction, doc read, the four
+    `extract_*` passes, the single-pass scanner, normalize + merge, curation,
+    build_hypergraph, rendering and writing; wall time, items and RSS high-water
+    after each stage
+  - extract_end_to_end: tools/extract_nomenclature.py --no-cache
+  - merge: tools/tribench/merge_hypergraphs.py over the scenario's track graphs
+
+Results are JSON. With --baseline, every `seconds` / `peak_rss_mb` metric is
+compared to the stored run and the suite exits 1 when one regresses by more than
+--time-tolerance / --rss-tolerance (ignoring differences under the noise floors).
+
+Usage:
+  python3 benchmarks/bench_pipeline.py [--scenarios small medium] [--out tmp/bench_pipeline.json]
+      [--baseline benchmarks/pipeline_baseline.json] [--write-baseline benchmarks/pipeline_baseline.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "small": {"catalog_entries": 1_000, "doc_bytes": 256 << 10, "graphs": 3, "graph_edges": 10_000},
+    "medium": {"catalog_entries": 20_000, "doc_bytes": 8 << 20, "graphs": 3, "graph_edges": 100_000},
+    "large": {"catalog_entries": 200_000, "doc_bytes": 64 << 20, "graphs": 3, "graph_edges": 500_000},
+    "xl": {"catalog_entries": 1_000_000, "doc_bytes": 300 << 20, "graphs": 3, "graph_edges": 1_000_000},
+}
+DEFAULT_SCENARIOS = ["small", "medium"]
+
+
+def _maxrss_mb(ru_maxrss: int) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return round(ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def run_measured(cmd: List[str]) -> Dict[str, Any]:
+    """Run cmd, returning its wall time, peak RSS (via wait4) and stdout."""
+    # stderr goes to a file so reading stdout to EOF cannot block on a full stderr pipe;
+    # communicate() would reap the child before wait4 sees its rusage.
+    with tempfile.TemporaryFile(mode="w+") as errf:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errf, text=True)
+        out = proc.stdout.read()
+        proc.stdout.close()
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - t0
+        code = os.waitstatus_to_exitcode(status)
+        proc.returncode = code
+        if code != 0:
+            errf.seek(0)
+            raise RuntimeError(f"{' '.join(cmd)} failed ({code}):\n{errf.read()}")
+    return {"seconds": round(seconds, 4), "peak_rss_mb": _maxrss_mb(usage.ru_maxrss), "stdout": out}
+
+
+def ensure_repo(work: Path, name: str, params: Dict[str, int]) -> Path:
+    repo = work / name
+    stamp = repo / ".params.json"
+    if stamp.exists() and json.loads(stamp.read_text(encoding="utf-8")) == params:
+        return repo
+    if repo.exists():
+        shutil.rmtree(repo)
+    from synth_engine_repo import generate
+
+    generate(repo, params["catalog_entries"], params["doc_bytes"], params["graphs"], params["graph_edges"])
+    stamp.write_text(json.dumps(params, sort_keys=True), encoding="utf-8")
+    return repo
+
+
+def extract_stages(repo: Path, out_dir: Path) -> Dict[str, Any]:
+    """Run the extractor pipeline stage by stage in this process (child mode)."""
+    import extract_nomenclature as en
+    from graph_io import write_json_document
+    from synth_engine_repo import CATALOG, DOCS
+
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    def stage(name: str, fn: Callable[[], Any], count: Callable[[Any], int] = len) -> Any:
+        t0 = time.perf_counter()
+        value = fn()
+        seconds = time.perf_counter() - t0
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "items": count(value),
+            "rss_mb": _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+        }
+        return value
+
+    cat = repo / CATALOG
+    docs = [repo / rel for rel in DOCS]
+    data = stage("catalog_load", lambda: en.load_json(cat), lambda d: len(d.get("capabilities") or []))
+    del data
+    catalog = stage("catalog_extract", lambda: en.extract_catalog_source(cat), lambda c: len(c["entries"]))
+    texts = stage("docs_read", lambda: [en.read_text(p) for p in docs], lambda ts: sum(len(t) for t in ts))
+    stage("extract_headings", lambda: [x for t in texts for x in en.extract_markdown_headings(t)])
+    stage("extract_backticked", lambda: [x for t in texts for x in en.extract_backticked_terms(t)])
+    stage("extract_inline_definitions", lambda: [x for t in texts for x in en.extract_inline_definitions(t)])
+    stage("extract_table_terms", lambda: [x for t in texts for x in en.extract_markdown_table_terms(t)])
+    del texts
+    scanned = stage("scan_markdown", lambda: [en.scan_markdown(p) for p in docs], lambda ds: sum(len(d["backticked"]) for d in ds))
+
+    def merge() -> List[Any]:
+        acc = en.ConceptAccumulator()
+        sid = acc.source(CATALOG, "capability_catalog")
+        for term, desc in catalog["entries"]:
+            t = en.normalize_term(term)
+            if t:
+                acc.add(t, desc, sid)
+        for p, doc in zip(docs, scanned):
+            sid = acc.source(str(p.relative_to(repo)), "system_prompt")
+            for term, desc in doc["inline_definitions"] + doc["table_terms"]:
+                t = en.normalize_term(term)
+                if t:
+                    acc.add(t, en.first_sentence(desc), sid)
+            for term in doc["headings"] + doc["backticked"]:
+                t = en.normalize_term(term)
+                if t:
+                    acc.add(t, "", sid)
+        return acc.finalize()
+
+    concepts = stage("normalize_merge", merge)
+
+    def curate() -> List[Any]:
+        curation = en.load_curation(ROOT / "concepts" / "curation.json")
+        out = en.apply_curation(list(concepts), curation)
+        out = en.ensure_seed_terms(out, curation)
+        return en.apply_taxonomy(out, set(catalog["types"]))
+
+    stage("curation", curate)
+    graph = stage("build_hypergraph", lambda: en.build_hypergraph(concepts, "bench"), lambda g: len(g["hyperedges"]))
+    stage(
+        "render",
+        lambda: (en.render_glossary(concepts, "bench", str(repo)), json.dumps(graph, indent=2)),
+        lambda r: sum(len(x) for x in r),
+    )
+    del graph
+
+    def write() -> int:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        write_json_document(out_dir / "nomenclature.hypergraph.json", en.hypergraph_members(concepts, "bench"))
+        return (out_dir / "nomenclature.hypergraph.json").stat().st_size
+
+    stage("write", write, lambda n: n)
+    return {"stages": stages, "concepts": len(concepts)}
+
+
+def run_scenario(name: str, params: Dict[str, int], work: Path) -> Dict[str, Any]:
+    repo = ensure_repo(work, name, params)
+    out = work / f"{name}_out"
+    if out.exists():
+        shutil.rmtree(out)
+    (out / "concepts").mkdir(parents=True)
+    shutil.copy(ROOT / "concepts" / "curation.json", out / "concepts" / "curation.json")
+
+    child = run_measured([sys.executable, __file__, "--child-extract", str(repo), str(out / "stages")])
+    stages = json.loads(child["stdout"])
+    result: Dict[str, Any] = {
+        "params": params,
+        "concepts": stages["concepts"],
+        "stages": stages["stages"],
+        "extract_stages": {"seconds": child["seconds"], "peak_rss_mb": child["peak_rss_mb"]},
+    }
+    e2e = run_measured(
+        [sys.executable, str(ROOT / "tools" / "extract_nomenclature.py"), "--engine-repo", str(repo), "--out-dir", str(out), "--no-cache"]
+    )
+    result["extract_end_to_end"] = {"seconds": e2e["seconds"], "peak_rss_mb": e2e["peak_rss_mb"]}
+    tracks = sorted(str(p) for p in (repo / "tracks").glob("*.hypergraph.json"))
+    if tracks:
+        merged = run_measured(
+            [sys.executable, str(ROOT / "tools" / "tribench" / "merge_hypergraphs.py"), "--out", str(out / "merged.json"), "--run-id", "bench", "--inputs", *tracks]
+        )
+        result["merge"] = {"seconds": merged["seconds"], "peak_rss_mb": merged["peak_rss_mb"]}
+    return result
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """scenario/metric-path -> value for every seconds / peak_rss_mb / rss_mb leaf."""
+    out: Dict[str, float] = {}
+
+    def walk(prefix: str, node: Any) -> None:
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if k != "params":
+                    walk(f"{prefix}/{k}" if prefix else k, v)
+        elif prefix.rsplit("/", 1)[-1] in ("seconds", "peak_rss_mb", "rss_mb") and isinstance(node, (int, float)):
+            out[prefix] = float(node)
+
+    walk("", results)
+    return out
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], time_tol: float, rss_tol: float, time_floor: float, rss_floor: float) -> List[Tuple[str, float, float]]:
+    cur, base = flatten(current["scenarios"]), flatten(baseline.get("scenarios") or {})
+    regressions: List[Tuple[str, float, float]] = []
+    for key, new in sorted(cur.items()):
+        old = base.get(key)
+        if old is None:
+            continue
+        is_time = key.endswith("/seconds")
+        tol, floor = (time_tol, time_floor) if is_time else (rss_tol, rss_floor)
+        if new > old * (1 + tol) and new - old > floor:
+            regressions.append((key, old, new))
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Pipeline benchmark suite with baseline regression checks")
+    ap.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=DEFAULT_SCENARIOS)
+    ap.add_argument("--work-dir", default=str(ROOT / "tmp" / "bench"), help="Generated repos and outputs (reused across runs)")
+    ap.add_argument("--out", default="", help="Write results JSON here")
+    ap.add_argument("--baseline", default="", help="Stored results to compare against")
+    ap.add_argument("--write-baseline", default="", help="Store this run as the new baseline")
+    ap.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed relative slowdown per timing (0.5 = +50%%)")
+    ap.add_argument("--rss-tolerance", type=float, default=0.25, help="Allowed relative peak-RSS growth")
+    ap.add_argument("--time-floor", type=float, default=0.05, help="Ignore timing differences below this many seconds")
+    ap.add_argument("--rss-floor", type=float, default=8.0, help="Ignore RSS differences below this many MB")
+    ap.add_argument("--child-extract", nargs=2, metavar=("REPO", "OUT"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child_extract:
+        print(json.dumps(extract_stages(Path(args.child_extract[0]), Path(args.child_extract[1]))))
+        return 0
+
+    work = Path(args.work_dir)
+    work.mkdir(parents=True, exist_ok=True)
+    results: Dict[str, Any] = {
+        "benchmark": "pipeline",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        r = run_scenario(name, SCENARIOS[name], work)
+        results["scenarios"][name] = r
+        slowest = max(r["stages"].items(), key=lambda kv: kv[1]["seconds"])
+        print(
+            f"scenario={name} concepts={r['concepts']} extract_s={r['extract_end_to_end']['seconds']}"
+            f" extract_peak_mb={r['extract_end_to_end']['peak_rss_mb']}"
+            f" merge_s={r.get('merge', {}).get('seconds', 0)} merge_peak_mb={r.get('merge', {}).get('peak_rss_mb', 0)}"
+            f" slowest_stage={slowest[0]}:{slowest[1]['seconds']}s"
+        )
+
+    text = json.dumps(results, indent=2) + "\n"
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text, encoding="utf-8")
+    if args.write_baseline:
+        Path(args.write_baseline).write_text(text, encoding="utf-8")
+
+    if not args.baseline:
+        print("bench_ok=1 baseline=none")
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.time_tolerance, args.rss_tolerance, args.time_floor, args.rss_floor)
+    for key, old, new in regressions:
+        print(f"regression {key}: {old} -> {new}")
+    print(f"bench_ok={int(not regressions)} regressions={len(regressions)} baseline={args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
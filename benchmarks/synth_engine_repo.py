@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Synthetic engine-repo generator for pipeline benchmarks.
+
+Writes the layout extract_nomenclature.py reads by default:
+  dist/meta3-engine-v0.5.0/config/capabilities.json   (N entries, ~3% duplicate names, a few dozen types)
+  meta3-causal-kernel/SYSTEM_PROMPT.md                 (doc bytes split across the three docs)
+  meta3-graph-core/SYSTEM_REPORT.md
+  meta3-graph-core/SYSTEM_PROMPT.md
+plus, optionally, per-track hypergraphs for merge_hypergraphs.py:
+  tracks/track_<i>.hypergraph.json                     (pretty, ~20% of edges shared across tracks)
+
+Docs mix headings, `- \`term\` — definition` lists, `| \`term\` | desc |` tables and
+prose with backticked identifiers drawn from a Zipf-ish vocabulary, so term
+repetition resembles real system prompts.
+
+Usage:
+  python3 benchmarks/synth_engine_repo.py --out tmp/bench/engine --catalog-entries 100000 --doc-bytes 50000000 \
+      [--graphs 3 --graph-edges 200000] [--seed 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from graph_io import write_json_document  # noqa: E402
+
+
+WORDS = (
+    "graph query mutate probe emit receipt capability catalog report state hyper edge node kernel "
+    "runtime transducer verify invariant delta packet mission bridge track sandbox policy agent "
+    "tool hub bundle context harness render merge index cache stream shard tile layout seed "
+    "commit ledger schema trace span metric budget quota plan step shell parallel guard"
+).split()
+
+TYPES = [f"{w}_{k}" for w in ("graph", "report", "utility", "safety", "io", "agent") for k in ("core", "ext", "aux", "exp")]
+
+DOCS = [
+    "meta3-causal-kernel/SYSTEM_PROMPT.md",
+    "meta3-graph-core/SYSTEM_REPORT.md",
+    "meta3-graph-core/SYSTEM_PROMPT.md",
+]
+CATALOG = "dist/meta3-engine-v0.5.0/config/capabilities.json"
+
+
+def make_vocab(rng: random.Random, size: int) -> List[str]:
+    """Identifier-like terms in the styles seen in engine docs."""
+    out: List[str] = []
+    for i in range(size):
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        style = i % 5
+        if style == 0:
+            out.append(f"{a}_{b}_{i}")
+        elif style == 1:
+            out.append(f"{a.title()}.{b.title()}")
+        elif style == 2:
+            out.append(f"{a.title()}{b.title()}{i}")
+        elif style == 3:
+            out.append(f"{a} {b} {i}")
+        else:
+            out.append(f"{a}_{b}")
+    return out
+
+
+def zipf_pick(rng: random.Random, vocab: List[str]) -> str:
+    # Inverse-power sampling: low indices are much more frequent.
+    return vocab[min(len(vocab) - 1, int(len(vocab) * rng.random() ** 3))]
+
+
+def sentence(rng: random.Random, n: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def write_catalog(path: Path, entries: int, rng: random.Random) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    def caps() -> Iterator[dict]:
+        for i in range(entries):
+            # ~3% of entries repeat an earlier name.
+            j = rng.randrange(i) if i and rng.random() < 0.03 else i
+            yield {
+                "name": f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{j}",
+                "description": f"{sentence(rng)} {sentence(rng, 5)}",
+                "type": rng.choice(TYPES),
+                "source": f"crates/{rng.choice(WORDS)}/src/lib.rs",
+            }
+
+    write_json_document(path, [("version", "synthetic"), ("capabilities", caps())])
+
+
+def write_doc(path: Path, target_bytes: int, vocab: List[str], rng: random.Random) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write(f"# {path.parent.name} {path.stem}\n\n")
+        while written < target_bytes:
+            parts: List[str] = [f"## {zipf_pick(rng, vocab).replace('_', ' ').title()}\n\n"]
+            for _ in range(rng.randint(1, 3)):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(12, 30))]
+                for _ in range(rng.randint(1, 4)):
+                    words.insert(rng.randrange(len(words)), f"`{zipf_pick(rng, vocab)}`")
+                parts.append(" ".join(words).capitalize() + ".\n\n")
+            items = rng.randint(0, 4)
+            for _ in range(items):
+                parts.append(f"- `{zipf_pick(rng, vocab)}` — {sentence(rng)} {sentence(rng, 4)}\n")
+            if items:
+                parts.append("\n")
+            if rng.random() < 0.3:
+                parts.append("| Capability | Description | Stable |\n|---|---|---|\n")
+                for _ in range(rng.randint(2, 6)):
+                    parts.append(f"| `{zipf_pick(rng, vocab)}` | {sentence(rng, 6)} | yes |\n")
+                parts.append("\n")
+            block = "".join(parts)
+            f.write(block)
+            written += len(block)
+
+
+def write_track_graph(path: Path, track: int, edges: int, seed: int) -> None:
+    rng = random.Random(seed * 1000 + track)
+    shared = random.Random(seed)
+    n_nodes = max(10, edges // 5)
+
+    def nodes() -> Iterator[dict]:
+        for i in range(n_nodes):
+            yield {"id": f"node:{i}", "kind": "concept" if i % 3 else "file", "label": f"N{i}", "data": None}
+
+    def hyperedges() -> Iterator[dict]:
+        for i in range(edges):
+            # ~20% of edges are identical across tracks (same id and payload).
+            r = shared if i % 5 == 0 else rng
+            a, b = r.randrange(n_nodes), r.randrange(n_nodes)
+            eid = f"edge:{i}" if i % 5 == 0 else f"edge:t{track}:{i}"
+            yield {"id": eid, "kind": "uses" if i % 2 else "derives", "causes": [f"node:{a}"], "effects": [f"node:{b}"], "data": {"w": i % 7}}
+
+    write_json_document(
+        path,
+        [("id", f"track_{track}"), ("nodes", nodes()), ("hyperedges", hyperedges()), ("metadata", {"source": "synthetic"})],
+    )
+
+
+def generate(out: Path, catalog_entries: int, doc_bytes: int, graphs: int = 0, graph_edges: int = 0, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    write_catalog(out / CATALOG, catalog_entries, rng)
+    vocab = make_vocab(rng, max(200, int(doc_bytes ** 0.5)))
+    for rel in DOCS:
+        write_doc(out / rel, doc_bytes // len(DOCS), vocab, rng)
+    for i in range(graphs):
+        write_track_graph(out / "tracks" / f"track_{i}.hypergraph.json", i, graph_edges, seed)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate a synthetic engine repo for benchmarks")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--catalog-entries", type=int, default=1000)
+    ap.add_argument("--doc-bytes", type=int, default=256 << 10, help="Total size of the three system docs")
+    ap.add_argument("--graphs", type=int, default=0, help="Per-track hypergraphs to write under tracks/")
+    ap.add_argument("--graph-edges", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    out = Path(args.out)
+    generate(out, args.catalog_entries, args.doc_bytes, args.graphs, args.graph_edges, args.seed)
+    size = sum(p.stat().st_size for p in out.rglob("*") if p.is_file())
+    print(f"synth_ok=1 out={out} catalog_entries={args.catalog_entries} doc_bytes={args.doc_bytes} graphs={args.graphs} bytes={size}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for published artifacts (showcase copies, docs viewers).
+
+  artifact_store.py publish SRC DEST [DEST ...]       one file to one or more output paths
+  artifact_store.py publish --tree SRC_DIR DEST_DIR   mirror a directory (stale files removed)
+  artifact_store.py status                            outputs, distinct blobs, logical vs stored bytes
+  artifact_store.py verify                            re-hash blobs and outputs; exit 1 on drift
+  artifact_store.py gc                                drop blobs and entries no output refers to
+
+Blobs live under `<store>/objects/<sha256[:2]>/<sha256[2:]>` (read-only), and
+`<store>/manifest.json` maps every output path to its sha256. Publishing hashes
+the source (skipped when its size/mtime/inode match the last publish), copies it
+into the store only if that content is new (reflink when the filesystem supports
+it), then materializes each output as a hardlink to the blob. Outputs already
+linked to the right blob are left alone, so a rebuild does I/O per distinct
+artifact, not per copy. Sources are never linked: producers rewrite them in
+place. `--mode reflink` / `--mode copy` give outputs their own inode when a
+filesystem has no hardlinks or a consumer edits outputs in place.
+
+Output paths under the repo root are recorded relative to it. The store
+defaults to `tmp/artifact_store/` in this repo; commands hold a lock on it, so
+parallel publishes are safe.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE = ROOT / "tmp" / "artifact_store"
+MANIFEST_VERSION = "artifact_manifest_v1"
+MODES = ("auto", "reflink", "copy")
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+CHUNK = 1 << 20
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(st: os.stat_result) -> Dict[str, int]:
+    return {"bytes": st.st_size, "mtime_ns": st.st_mtime_ns, "ino": st.st_ino}
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    with src.open("rb") as s, dst.open("wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink()
+            raise
+
+
+def _materialize(blob: Path, dest: Path, mode: str) -> str:
+    """Put blob's content at dest atomically; returns how ("linked", "reflinked", "copied")."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    how = "copied"
+    try:
+        if mode == "auto":
+            os.link(blob, tmp)
+            how = "linked"
+    except OSError:
+        pass
+    if how != "linked" and mode != "copy":
+        try:
+            _reflink(blob, tmp)
+            how = "reflinked"
+        except OSError:
+            pass
+    if how == "copied":
+        shutil.copyfile(blob, tmp)
+    if how != "linked":
+        os.chmod(tmp, 0o644)
+    os.replace(tmp, dest)
+    return how
+
+
+class ArtifactStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.objects = root / "objects"
+        self.manifest_path = root / "manifest.json"
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ("published", "skipped", "linked", "reflinked", "copied", "removed", "ingested", "bytes_hashed", "bytes_ingested"), 0
+        )
+
+    @contextmanager
+    def locked(self) -> Iterator["ArtifactStore"]:
+        self.objects.mkdir(parents=True, exist_ok=True)
+        with (self.root / "lock").open("w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._load()
+            yield self
+
+    def _load(self) -> None:
+        if self.manifest_path.exists():
+            doc = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            self.outputs = doc.get("outputs") or {}
+            self.sources = doc.get("sources") or {}
+
+    def save(self) -> None:
+        doc = {
+            "version": MANIFEST_VERSION,
+            "outputs": dict(sorted(self.outputs.items())),
+            "sources": dict(sorted(self.sources.items())),
+        }
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def blob_path(self, sha: str) -> Path:
+        return self.objects / sha[:2] / sha[2:]
+
+    @staticmethod
+    def key(path: Path) -> str:
+        path = Path(os.path.abspath(path))
+        try:
+            return path.relative_to(ROOT).as_posix()
+        except ValueError:
+            return str(path)
+
+    @staticmethod
+    def resolve(key: str) -> Path:
+        return Path(key) if os.path.isabs(key) else ROOT / key
+
+    def hash_source(self, src: Path) -> str:
+        st = src.stat()
+        k = self.key(src)
+        cached = self.sources.get(k)
+        if cached and {f: cached.get(f) for f in ("bytes", "mtime_ns", "ino")} == _stat_key(st):
+            return cached["sha256"]
+        sha = sha256_file(src)
+        self.stats["bytes_hashed"] += st.st_size
+        self.sources[k] = {"sha256": sha, **_stat_key(st)}
+        return sha
+
+    def ingest(self, src: Path, sha: str) -> Path:
+        blob = self.blob_path(sha)
+        if blob.exists():
+            return blob
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{os.getpid()}.tmp")
+        try:
+            _reflink(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        if sha256_file(tmp) != sha:
+            tmp.unlink()
+            raise RuntimeError(f"{src} changed while being published")
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, blob)
+        self.stats["ingested"] += 1
+        self.stats["bytes_ingested"] += blob.stat().st_size
+        return blob
+
+    def _current(self, dest: Path, sha: str, blob: Path, mode: str) -> bool:
+        """Whether dest already holds sha: linked to the blob (auto), or unchanged since we wrote it."""
+        try:
+            st = dest.stat()
+        except FileNotFoundError:
+            return False
+        bst = blob.stat()
+        if (st.st_dev, st.st_ino) == (bst.st_dev, bst.st_ino):
+            return mode == "auto"
+        entry = self.outputs.get(self.key(dest))
+        return bool(entry) and entry["sha256"] == sha and {f: entry.get(f) for f in ("bytes", "mtime_ns", "ino")} == _stat_key(st)
+
+    def publish(self, src: Path, dests: Sequence[Path], mode: str = "auto") -> str:
+        sha = self.hash_source(src)
+        blob = self.ingest(src, sha)
+        for dest in dests:
+            if Path(os.path.abspath(dest)) == Path(os.path.abspath(src)):
+                raise ValueError(f"output is the source: {dest}")
+            self.stats["published"] += 1
+            if self._current(dest, sha, blob, mode):
+                self.stats["skipped"] += 1
+            else:
+                self.stats[_materialize(blob, dest, mode)] += 1
+            self.outputs[self.key(dest)] = {"sha256": sha, **_stat_key(dest.stat())}
+        return sha
+
+    def publish_tree(self, src_dir: Path, dest_dir: Path, mode: str = "auto") -> None:
+        if not src_dir.is_dir():
+            raise NotADirectoryError(str(src_dir))
+        wanted = set()
+        for src in sorted(p for p in src_dir.rglob("*") if p.is_file()):
+            rel = src.relative_to(src_dir)
+            wanted.add(rel)
+            self.publish(src, [dest_dir / rel], mode)
+        if not dest_dir.is_dir():
+            return
+        # Mirror semantics (rm -rf + cp -R): drop files the source no longer has.
+        for path in sorted(dest_dir.rglob("*"), key=lambda p: len(p.parts), reverse=True):
+            if path.is_dir():
+                if not any(path.iterdir()):
+                    path.rmdir()
+            elif path.relative_to(dest_dir) not in wanted:
+                path.unlink()
+                self.outputs.pop(self.key(path), None)
+                self.stats["removed"] += 1
+
+    def blob_sizes(self) -> Dict[str, int]:
+        sizes = {}
+        for blob in self.objects.glob("??/*"):
+            if not blob.name.startswith("."):
+                sizes[blob.parent.name + blob.name] = blob.stat().st_size
+        return sizes
+
+    def status(self) -> Dict[str, int]:
+        sizes = self.blob_sizes()
+        live = {e["sha256"] for e in self.outputs.values()}
+        return {
+            "outputs": len(self.outputs),
+            "blobs": len(sizes),
+            "unreferenced": len(set(sizes) - live),
+            "logical_bytes": sum(e.get("bytes", 0) for e in self.outputs.values()),
+            "stored_bytes": sum(sizes.values()),
+        }
+
+    def verify(self) -> List[str]:
+        problems: List[str] = []
+        good: Dict[str, bool] = {}
+        for sha in sorted({e["sha256"] for e in self.outputs.values()}):
+            blob = self.blob_path(sha)
+            good[sha] = blob.exists() and sha256_file(blob) == sha
+            if not good[sha]:
+                problems.append(f"blob {sha}: missing or corrupt")
+        for key, entry in sorted(self.outputs.items()):
+            dest, sha = self.resolve(key), entry["sha256"]
+            if not dest.is_file():
+                problems.append(f"{key}: missing")
+                continue
+            blob = self.blob_path(sha)
+            if good[sha] and blob.exists() and os.path.samefile(dest, blob):
+                continue
+            if sha256_file(dest) != sha:
+                problems.append(f"{key}: content differs from {sha[:12]}")
+        return problems
+
+    def gc(self) -> Tuple[int, int]:
+        """Forget outputs/sources that no longer exist and delete unreferenced blobs."""
+        self.outputs = {k: e for k, e in self.outputs.items() if self.resolve(k).is_file()}
+        self.sources = {k: e for k, e in self.sources.items() if self.resolve(k).is_file()}
+        live = {e["sha256"] for e in self.outputs.values()}
+        removed = freed = 0
+        for sha, size in self.blob_sizes().items():
+            if sha not in live:
+                self.blob_path(sha).unlink()
+                removed += 1
+                freed += size
+        for d in self.objects.iterdir():
+            if d.is_dir() and not any(d.iterdir()):
+                d.rmdir()
+        return removed, freed
+
+
+def _summary(stats: Dict[str, Any]) -> str:
+    return " ".join(f"{k}={v}" for k, v in stats.items())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Content-addressed store for published artifacts")
+    ap.add_argument("--store", default=str(DEFAULT_STORE), help=f"Store directory (default: {DEFAULT_STORE.relative_to(ROOT)})")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("publish", help="Materialize output paths from a source file or directory")
+    p.add_argument("src")
+    p.add_argument("dests", nargs="+")
+    p.add_argument("--tree", action="store_true", help="SRC and DEST are directories; mirror SRC into DEST")
+    p.add_argument("--mode", choices=MODES, default="auto", help="auto: hardlink, else reflink, else copy")
+
+    sub.add_parser("status", help="Summarize outputs and blobs")
+    sub.add_parser("verify", help="Check blobs and outputs against their sha256")
+    sub.add_parser("gc", help="Delete blobs no output refers to")
+
+    args = ap.parse_args()
+    store = ArtifactStore(Path(args.store))
+    with store.locked():
+        if args.command == "publish":
+            src = Path(args.src)
+            if args.tree:
+                if len(args.dests) != 1:
+                    ap.error("--tree takes exactly one DEST")
+                store.publish_tree(src, Path(args.dests[0]), args.mode)
+            else:
+                store.publish(src, [Path(d) for d in args.dests], args.mode)
+            store.save()
+            print(f"artifact_store_ok=1 {_summary(store.stats)} src={src}")
+        elif args.command == "status":
+            print(f"artifact_store_ok=1 {_summary(store.status())} store={args.store}")
+        elif args.command == "verify":
+            problems = store.verify()
+            for msg in problems:
+                print(msg, file=sys.stderr)
+            print(f"artifact_store_ok={int(not problems)} outputs={len(store.outputs)} problems={len(problems)}")
+            return 1 if problems else 0
+        elif args.command == "gc":
+            removed, freed = store.gc()
+            store.save()
+            print(f"artifact_store_ok=1 blobs_removed={removed} bytes_freed={freed} {_summary(store.status())}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -30,14 +30,20 @@ DOCS_CAP="$ROOT/docs/capability-graph"
 DOCS_MIS="$ROOT/docs/mission-bridge"
 TMP="$ROOT/tmp/_showcase_tmp"
 
+# Output copies are hardlinks into the content-addressed store (tools/artifact_store.py):
+# unchanged artifacts are skipped, identical ones share one blob.
+publish() {
+  python3 "$ROOT/tools/artifact_store.py" publish "$@" >/dev/null
+}
+
 mkdir -p "$OUT_NOM" "$OUT_CAP" "$OUT_MIS" "$DOCS_NOM" "$DOCS_CAP" "$DOCS_MIS" "$TMP"
 
 echo "[1/3] Extract curated nomenclature"
 python3 "$ROOT/tools/extract_nomenclature.py" --engine-repo "$ENGINE_REPO" --out-dir "$ROOT" >/dev/null
 
-cp -f "$ROOT/concepts/concepts.json" "$OUT_NOM/concepts.json"
-cp -f "$ROOT/concepts/glossary.md" "$OUT_NOM/glossary.md"
-cp -f "$ROOT/graphs/nomenclature.hypergraph.json" "$OUT_NOM/hypergraph.json"
+publish "$ROOT/concepts/concepts.json" "$OUT_NOM/concepts.json"
+publish "$ROOT/concepts/glossary.md" "$OUT_NOM/glossary.md"
+publish "$ROOT/graphs/nomenclature.hypergraph.json" "$OUT_NOM/hypergraph.json"
 
 echo "[2/3] Build capability graph + report (engine)"
 CARGO_TARGET_DIR="$ENGINE_REPO/target" \
@@ -54,12 +60,12 @@ cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
   --out "$TMP/capability_report.md" \
   --root "$ENGINE_REPO"
 
-cp -f "$TMP/capability.hypergraph.json" "$OUT_CAP/hypergraph.json"
-cp -f "$TMP/capability_report.md" "$OUT_CAP/capability_report.md"
+publish "$TMP/capability.hypergraph.json" "$OUT_CAP/hypergraph.json"
+publish "$TMP/capability_report.md" "$OUT_CAP/capability_report.md"
 
 echo "[3/4] Mission → Code bridge (measured)"
-cp -f "$ENGINE_REPO/tests/graph_core/fixtures/hyper_small.json" "$OUT_MIS/hypergraph.json"
-cp -f "$ENGINE_REPO/tests/graph_core/fixtures/mission_small.json" "$OUT_MIS/mission_graph.json"
+publish "$ENGINE_REPO/tests/graph_core/fixtures/hyper_small.json" "$OUT_MIS/hypergraph.json"
+publish "$ENGINE_REPO/tests/graph_core/fixtures/mission_small.json" "$OUT_MIS/mission_graph.json"
 
 CARGO_TARGET_DIR="$ENGINE_REPO/target" \
 cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
@@ -69,14 +75,15 @@ cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
   --out "$OUT_MIS/merged.hypergraph.json" \
   --scope full
 
-python3 "$ENGINE_REPO/scripts/graph_core_eval.py" \
+python3 "$ROOT/tools/mission_eval.py" \
   --hyper "$OUT_MIS/hypergraph.json" \
   --mission "$OUT_MIS/mission_graph.json" \
   --merged "$OUT_MIS/merged.hypergraph.json" \
   --scope full \
   --min-precision 1.0 \
   --min-recall 1.0 \
-  --out "$OUT_MIS/eval.json"
+  --out "$OUT_MIS/eval.json" \
+  --md-out "$OUT_MIS/eval.md"
 
 echo "[4/4] Render viewers (engine)"
 CARGO_TARGET_DIR="$ENGINE_REPO/target" \
@@ -84,26 +91,24 @@ cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
   --bin render_hypergraph -- \
   --in "$OUT_NOM/hypergraph.json" --out "$TMP/nomenclature_view"
 
-cp -f "$TMP/nomenclature_view/index.html" "$OUT_NOM/index.html"
-cp -f "$TMP/nomenclature_view/hypergraph.dot" "$OUT_NOM/hypergraph.dot"
-cp -f "$TMP/nomenclature_view/index.html" "$DOCS_NOM/index.html"
+publish "$TMP/nomenclature_view/index.html" "$OUT_NOM/index.html" "$DOCS_NOM/index.html"
+publish "$TMP/nomenclature_view/hypergraph.dot" "$OUT_NOM/hypergraph.dot"
 
 CARGO_TARGET_DIR="$ENGINE_REPO/target" \
 cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
   --bin render_hypergraph -- \
   --in "$OUT_CAP/hypergraph.json" --out "$TMP/capability_view"
 
-cp -f "$TMP/capability_view/index.html" "$OUT_CAP/index.html"
-cp -f "$TMP/capability_view/hypergraph.dot" "$OUT_CAP/hypergraph.dot"
-cp -f "$TMP/capability_view/index.html" "$DOCS_CAP/index.html"
+publish "$TMP/capability_view/index.html" "$OUT_CAP/index.html" "$DOCS_CAP/index.html"
+publish "$TMP/capability_view/hypergraph.dot" "$OUT_CAP/hypergraph.dot"
 
 CARGO_TARGET_DIR="$ENGINE_REPO/target" \
 cargo run --quiet --manifest-path "$ENGINE_REPO/meta3-graph-core/Cargo.toml" \
   --bin render_hypergraph -- \
   --in "$OUT_MIS/merged.hypergraph.json" --out "$TMP/mission_view"
 
-cp -f "$TMP/mission_view/index.html" "$OUT_MIS/index.html"
-cp -f "$TMP/mission_view/hypergraph.dot" "$OUT_MIS/hypergraph.dot"
-cp -f "$TMP/mission_view/index.html" "$DOCS_MIS/index.html"
+publish "$TMP/mission_view/index.html" "$OUT_MIS/index.html" "$DOCS_MIS/index.html"
+publish "$TMP/mission_view/hypergraph.dot" "$OUT_MIS/hypergraph.dot"
 
+python3 "$ROOT/tools/artifact_store.py" gc >/dev/null
 echo "showcases_ok=1"
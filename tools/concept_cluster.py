@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate concept clustering for alias resolution.
+
+Concepts are merged by the extractor only when `slugify(term)` collides, so
+`Graph.Query` / `graph query` / `GraphQuery` or `Receipts` / `receipt` survive as
+separate concepts. This module groups such variants:
+
+  1. Every term and alias is reduced to a cluster key (camelCase split, lowercased,
+     punctuation dropped, naive singular). Equal keys link at similarity 1.0.
+  2. Distinct keys are joined on character-trigram Jaccard similarity >= threshold
+     with a prefix-filtered inverted index (AllPairs style): keys are only compared
+     when they share one of their rarest trigrams and their sizes are compatible,
+     which keeps the join near-linear instead of all-pairs.
+  3. Links are applied strongest first through a union-find; a union that would put
+     two protected (curated) concepts in one cluster is refused.
+
+Standalone usage (report only):
+  python3 tools/concept_cluster.py concepts/concepts.json [--threshold 0.85] [--report out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+DEFAULT_THRESHOLD = 0.85
+MIN_FUZZY_KEY = 4
+
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=1 << 17)
+def cluster_key(text: str) -> str:
+    words = _NON_ALNUM_RE.split(_CAMEL_RE.sub(" ", text).lower())
+    return "".join(_singular(w) for w in words if w)
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    padded = f"^{key}$"
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def similar_keys(keys: Sequence[str], threshold: float) -> Iterator[Tuple[int, int, float]]:
+    """
+    Yield (i, j, jaccard) for distinct keys whose trigram Jaccard is >= threshold.
+
+    Prefix filtering: with tokens ordered by ascending document frequency, two sets
+    with Jaccard >= t must share a token among the first |x| - ceil(t*|x|) + 1 of
+    each. Keys are visited by size, so earlier (smaller) candidates only need the
+    size check |y| >= t*|x|.
+    """
+    sets = [trigrams(k) if len(k) >= MIN_FUZZY_KEY else frozenset() for k in keys]
+    df: Dict[str, int] = defaultdict(int)
+    for s in sets:
+        for tok in s:
+            df[tok] += 1
+    rank = {tok: r for r, tok in enumerate(sorted(df, key=lambda t: (df[t], t)))}
+    order = sorted((i for i, s in enumerate(sets) if s), key=lambda i: (len(sets[i]), keys[i]))
+    sizes = [len(s) for s in sets]
+    digits = {i: _DIGITS_RE.findall(keys[i]) for i in order}
+    index: Dict[str, List[int]] = defaultdict(list)
+    # Posting lists are filled in ascending size, so entries below the size bound
+    # can be skipped for good by advancing a per-list start offset.
+    start: Dict[str, int] = defaultdict(int)
+    for i in order:
+        x = sets[i]
+        n = sizes[i]
+        prefix = sorted(x, key=rank.__getitem__)[: n - math.ceil(threshold * n) + 1]
+        min_size = threshold * n
+        seen: Set[int] = set()
+        for tok in prefix:
+            postings = index[tok]
+            lo = start[tok]
+            while lo < len(postings) and sizes[postings[lo]] < min_size:
+                lo += 1
+            start[tok] = lo
+            for j in postings[lo:]:
+                if j in seen:
+                    continue
+                seen.add(j)
+                # Variants that differ in a number (v1/v2, phase_3/phase_4) are different things.
+                if digits[i] != digits[j]:
+                    continue
+                inter = len(x & sets[j])
+                sim = inter / (n + sizes[j] - inter)
+                if sim >= threshold:
+                    yield (j, i, sim) if j < i else (i, j, sim)
+            postings.append(i)
+
+
+class UnionFind:
+    def __init__(self, n: int, protected: Sequence[bool]) -> None:
+        self.parent = list(range(n))
+        self.protected = [bool(p) for p in protected]
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return True
+        if self.protected[ra] and self.protected[rb]:
+            return False
+        if rb < ra:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.protected[ra] = self.protected[ra] or self.protected[rb]
+        return True
+
+
+@dataclass
+class Link:
+    a: int
+    b: int
+    a_text: str
+    b_text: str
+    similarity: float
+
+
+@dataclass
+class Cluster:
+    members: List[int]
+    links: List[Link] = field(default_factory=list)
+
+
+def find_clusters(
+    labels: Sequence[Sequence[str]],
+    threshold: float = DEFAULT_THRESHOLD,
+    protected: Sequence[bool] = (),
+) -> Tuple[List[Cluster], int]:
+    """
+    Group items whose labels (term first, then aliases) are near-duplicates.
+
+    Returns (clusters with >= 2 members ordered by lowest member, refused link count).
+    """
+    key_ids: Dict[str, int] = {}
+    keys: List[str] = []
+    # key id -> [(item, original text)]
+    owners: List[List[Tuple[int, str]]] = []
+    for item, texts in enumerate(labels):
+        for text in texts:
+            k = cluster_key(text)
+            if not k:
+                continue
+            kid = key_ids.get(k)
+            if kid is None:
+                kid = key_ids[k] = len(keys)
+                keys.append(k)
+                owners.append([])
+            if not owners[kid] or owners[kid][-1][0] != item:
+                owners[kid].append((item, text))
+
+    links: List[Link] = []
+    for own in owners:
+        for (a, at), (b, bt) in zip(own, own[1:]):
+            links.append(Link(a, b, at, bt, 1.0))
+    for ki, kj, sim in similar_keys(keys, threshold):
+        (a, at), (b, bt) = owners[ki][0], owners[kj][0]
+        if a != b:
+            links.append(Link(a, b, at, bt, sim))
+    links.sort(key=lambda l: (-l.similarity, min(l.a, l.b), max(l.a, l.b)))
+
+    uf = UnionFind(len(labels), list(protected) + [False] * (len(labels) - len(protected)))
+    refused = 0
+    kept: List[Link] = []
+    for link in links:
+        if link.a == link.b or uf.find(link.a) == uf.find(link.b):
+            continue
+        if uf.union(link.a, link.b):
+            kept.append(link)
+        else:
+            refused += 1
+
+    groups: Dict[int, Cluster] = {}
+    for item in range(len(labels)):
+        root = uf.find(item)
+        groups.setdefault(root, Cluster(members=[])).members.append(item)
+    for link in kept:
+        groups[uf.find(link.a)].links.append(link)
+    return sorted((c for c in groups.values() if len(c.members) > 1), key=lambda c: c.members[0]), refused
+
+
+def cluster_concepts(
+    concepts: List[object],
+    threshold: float = DEFAULT_THRESHOLD,
+    curated: Set[str] = frozenset(),
+    apply: bool = False,
+    rank: Optional[Callable[[object], tuple]] = None,
+) -> Tuple[List[object], Dict[str, object]]:
+    """
+    Cluster Concept-like objects (id, term, definition, aliases, sources).
+
+    The representative of each cluster is the highest-ranked member (default:
+    curated term, then capability-catalog source, then most sources, then has a
+    definition, then shortest term). With apply=True, other members are folded
+    into the representative (their terms become aliases; sources and a missing
+    definition carry over) and dropped. Returns (concepts, report).
+    """
+    rank = rank or (lambda c: default_rank(c, curated))
+    labels = [[c.term] + list(c.aliases) for c in concepts]
+    protected = [c.term in curated for c in concepts]
+    clusters, refused = find_clusters(labels, threshold, protected)
+
+    report_clusters = []
+    drop: Set[int] = set()
+    for cl in clusters:
+        rep_i = min(cl.members, key=lambda i: (rank(concepts[i]), concepts[i].id))
+        rep = concepts[rep_i]
+        others = [i for i in cl.members if i != rep_i]
+        report_clusters.append(
+            {
+                "id": rep.id,
+                "representative": rep.term,
+                "members": [
+                    {"id": concepts[i].id, "term": concepts[i].term, "sources": len(concepts[i].sources)}
+                    for i in others
+                ],
+                "links": [
+                    {
+                        "a": l.a_text,
+                        "a_id": concepts[l.a].id,
+                        "b": l.b_text,
+                        "b_id": concepts[l.b].id,
+                        "similarity": round(l.similarity, 4),
+                    }
+                    for l in cl.links
+                ],
+            }
+        )
+        if not apply:
+            continue
+        aliases = set(rep.aliases)
+        for i in others:
+            c = concepts[i]
+            aliases.add(c.term)
+            aliases.update(c.aliases)
+            if not rep.definition and c.definition:
+                rep.definition = c.definition
+            for s in c.sources:
+                if s not in rep.sources:
+                    rep.sources.append(s)
+            drop.add(i)
+        aliases.discard(rep.term)
+        rep.aliases = sorted(aliases)
+
+    report = {
+        "version": "v1",
+        "mode": "apply" if apply else "propose",
+        "threshold": threshold,
+        "concepts_in": len(concepts),
+        "clusters": len(report_clusters),
+        "merged": sum(len(c["members"]) for c in report_clusters),
+        "refused_links": refused,
+        "items": sorted(report_clusters, key=lambda c: c["id"]),
+    }
+    out = [c for i, c in enumerate(concepts) if i not in drop] if apply else concepts
+    return out, report
+
+
+def default_rank(c: object, curated: Set[str]) -> tuple:
+    from_catalog = any(s.kind == "capability_catalog" for s in c.sources)
+    return (c.term not in curated, not from_catalog, -len(c.sources), not c.definition, len(c.term), c.term)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Report near-duplicate concepts in a concepts.json")
+    ap.add_argument("concepts")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    ap.add_argument("--curation", default="", help="curation.json whose allow_terms are protected representatives")
+    ap.add_argument("--report", default="", help="Write the JSON report here instead of stdout")
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from extract_nomenclature import Concept, SourceRef, curated_terms, load_curation
+    from graph_io import load_json_document
+
+    doc = load_json_document(Path(args.concepts))
+    concepts = [
+        Concept(
+            id=c["id"],
+            term=c["term"],
+            definition=c.get("definition", ""),
+            category=c.get("category", "concept"),
+            aliases=list(c.get("aliases") or []),
+            sources=[SourceRef(**s) for s in c.get("sources") or []],
+        )
+        for c in doc.get("concepts") or []
+    ]
+    curation = load_curation(Path(args.curation)) if args.curation else {}
+    curated = set(curated_terms(curation))
+    _, report = cluster_concepts(concepts, args.threshold, curated)
+    text = json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+    if args.report:
+        Path(args.report).write_text(text, encoding="utf-8")
+        print(f"cluster_ok=1 concepts={len(concepts)} clusters={report['clusters']} merged={report['merged']} report={args.report}")
+    else:
+        print(text, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+SQLite export of concepts.json for lookups and full-text search without a JSON parse.
+
+Tables:
+  concepts(id, term, definition, category_id, digest)   indexed on term (case-insensitive) and category
+  aliases(concept_id, alias)                            indexed on alias (case-insensitive)
+  sources(id, path, kind)                               indexed on kind
+  concept_sources(concept_id, source_id, seq)           indexed on source_id
+  categories(id, name)
+  concepts_fts                                          FTS5 over term, aliases, definition (rowid = concepts.rowid)
+  meta(key, value)                                      run_id, generated_at, version
+
+Writes are incremental: each concept carries a digest of its content, so a run
+inserts new concepts, rewrites changed ones, deletes vanished ones and leaves the
+rest untouched, all in one transaction (readers see the old or the new set, never
+a mix).
+
+  concept_db.py [--db DB] build concepts/concepts.json
+  concept_db.py [--db DB] lookup TERM        exact term or alias, case-insensitive
+  concept_db.py [--db DB] search QUERY       FTS5 over term/aliases/definition (--kind, --category, --raw)
+
+--db (default concepts/concepts.sqlite) is also accepted after the subcommand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SCHEMA_VERSION = "concept_db_v1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS sources (
+  id INTEGER PRIMARY KEY,
+  path TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  UNIQUE (path, kind)
+);
+CREATE INDEX IF NOT EXISTS sources_kind ON sources (kind);
+CREATE TABLE IF NOT EXISTS concepts (
+  id TEXT PRIMARY KEY,
+  term TEXT NOT NULL,
+  definition TEXT NOT NULL,
+  category_id INTEGER NOT NULL REFERENCES categories (id),
+  digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS concepts_term ON concepts (term COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS concepts_category ON concepts (category_id);
+CREATE TABLE IF NOT EXISTS aliases (
+  concept_id TEXT NOT NULL REFERENCES concepts (id),
+  alias TEXT NOT NULL,
+  PRIMARY KEY (concept_id, alias)
+);
+CREATE INDEX IF NOT EXISTS aliases_alias ON aliases (alias COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS concept_sources (
+  concept_id TEXT NOT NULL REFERENCES concepts (id),
+  source_id INTEGER NOT NULL REFERENCES sources (id),
+  seq INTEGER NOT NULL,
+  PRIMARY KEY (concept_id, source_id)
+);
+CREATE INDEX IF NOT EXISTS concept_sources_source ON concept_sources (source_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS concepts_fts USING fts5 (term, aliases, definition);
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path))
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    # Rank matches with term hits weighted over alias and definition hits.
+    db.execute("INSERT INTO concepts_fts (concepts_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')")
+    db.commit()
+    return db
+
+
+def _concept_fields(c: Any) -> Tuple[str, str, str, str, List[str], List[Tuple[str, str]]]:
+    """(id, term, definition, category, aliases, [(path, kind)]) from a Concept or its JSON dict."""
+    if isinstance(c, dict):
+        sources = [(str(s.get("path", "")), str(s.get("kind", ""))) for s in c.get("sources") or [] if isinstance(s, dict)]
+        return (
+            str(c["id"]),
+            str(c.get("term", "")),
+            str(c.get("definition", "")),
+            str(c.get("category", "concept")),
+            [str(a) for a in c.get("aliases") or []],
+            sources,
+        )
+    return c.id, c.term, c.definition, c.category, list(c.aliases), [(s.path, s.kind) for s in c.sources]
+
+
+def _digest(fields: Tuple[Any, ...]) -> str:
+    return hashlib.blake2b(json.dumps(fields, separators=(",", ":")).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _Ids:
+    """Get-or-create integer ids for a lookup table, cached for the transaction."""
+
+    def __init__(self, db: sqlite3.Connection, table: str, columns: Sequence[str]) -> None:
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.ids: Dict[Tuple[str, ...], int] = {
+            tuple(row[1:]): row[0] for row in db.execute(f"SELECT id, {', '.join(columns)} FROM {table}")
+        }
+
+    def get(self, key: Tuple[str, ...]) -> int:
+        sid = self.ids.get(key)
+        if sid is None:
+            marks = ", ".join("?" for _ in self.columns)
+            cur = self.db.execute(f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({marks})", key)
+            sid = self.ids[key] = cur.lastrowid
+        return sid
+
+
+def write_concept_db(path: Path, concepts: Iterable[Any], meta: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Bring the database at path in line with concepts in one transaction; returns change counts."""
+    stats = {"concepts": 0, "inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    db = connect(path)
+    try:
+        with db:
+            known: Dict[str, Tuple[int, str]] = {
+                cid: (rowid, digest) for rowid, cid, digest in db.execute("SELECT rowid, id, digest FROM concepts")
+            }
+            categories = _Ids(db, "categories", ("name",))
+            sources = _Ids(db, "sources", ("path", "kind"))
+            seen = set()
+            for c in concepts:
+                fields = _concept_fields(c)
+                cid, term, definition, category, aliases, refs = fields
+                if cid in seen:
+                    continue
+                seen.add(cid)
+                stats["concepts"] += 1
+                digest = _digest(fields)
+                old = known.get(cid)
+                if old is not None and old[1] == digest:
+                    stats["unchanged"] += 1
+                    continue
+                cat = categories.get((category,))
+                if old is None:
+                    rowid = db.execute(
+                        "INSERT INTO concepts (id, term, definition, category_id, digest) VALUES (?, ?, ?, ?, ?)",
+                        (cid, term, definition, cat, digest),
+                    ).lastrowid
+                    stats["inserted"] += 1
+                else:
+                    rowid = old[0]
+                    db.execute(
+                        "UPDATE concepts SET term = ?, definition = ?, category_id = ?, digest = ? WHERE rowid = ?",
+                        (term, definition, cat, digest, rowid),
+                    )
+                    db.execute("DELETE FROM aliases WHERE concept_id = ?", (cid,))
+                    db.execute("DELETE FROM concept_sources WHERE concept_id = ?", (cid,))
+                    db.execute("DELETE FROM concepts_fts WHERE rowid = ?", (rowid,))
+                    stats["updated"] += 1
+                db.executemany("INSERT OR IGNORE INTO aliases VALUES (?, ?)", ((cid, a) for a in aliases))
+                links = [(cid, sources.get(ref), i) for i, ref in enumerate(refs)]
+                db.executemany("INSERT OR IGNORE INTO concept_sources VALUES (?, ?, ?)", links)
+                db.execute(
+                    "INSERT INTO concepts_fts (rowid, term, aliases, definition) VALUES (?, ?, ?, ?)",
+                    (rowid, term, " ".join(aliases), definition),
+                )
+            gone = [(cid, rowid) for cid, (rowid, _) in known.items() if cid not in seen]
+            for cid, rowid in gone:
+                db.execute("DELETE FROM aliases WHERE concept_id = ?", (cid,))
+                db.execute("DELETE FROM concept_sources WHERE concept_id = ?", (cid,))
+                db.execute("DELETE FROM concepts_fts WHERE rowid = ?", (rowid,))
+                db.execute("DELETE FROM concepts WHERE rowid = ?", (rowid,))
+            stats["deleted"] = len(gone)
+            if gone or stats["updated"]:
+                db.execute("DELETE FROM sources WHERE id NOT IN (SELECT DISTINCT source_id FROM concept_sources)")
+                db.execute("DELETE FROM categories WHERE id NOT IN (SELECT DISTINCT category_id FROM concepts)")
+            rows = {"version": SCHEMA_VERSION, **{k: v for k, v in (meta or {}).items() if v is not None}}
+            db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", ((k, str(v)) for k, v in rows.items()))
+    finally:
+        db.close()
+    return stats
+
+
+def iter_concepts_json(path: Path, meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Concepts of a concepts.json in any graph_io format, one at a time; run_id/generated_at go into meta."""
+    from graph_io import iter_document
+
+    for rec, key, value in iter_document(path, stream_keys=("concepts",)):
+        if key == "concepts":
+            if rec == "item":
+                yield value
+            elif rec == "value":
+                yield from value or []
+        elif rec == "value" and key in ("run_id", "generated_at") and meta is not None:
+            meta[key] = value
+
+
+def _describe(db: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    out = []
+    for cid, term, definition, category in rows:
+        aliases = [a for (a,) in db.execute("SELECT alias FROM aliases WHERE concept_id = ? ORDER BY alias", (cid,))]
+        sources = [
+            {"path": p, "kind": k}
+            for p, k in db.execute(
+                "SELECT s.path, s.kind FROM concept_sources cs JOIN sources s ON s.id = cs.source_id"
+                " WHERE cs.concept_id = ? ORDER BY cs.seq",
+                (cid,),
+            )
+        ]
+        out.append({"id": cid, "term": term, "definition": definition, "category": category, "aliases": aliases, "sources": sources})
+    return out
+
+
+def lookup(db: sqlite3.Connection, term: str) -> List[Dict[str, Any]]:
+    """Concepts whose term or an alias equals term, ignoring case."""
+    rows = db.execute(
+        "SELECT c.id, c.term, c.definition, g.name FROM concepts c JOIN categories g ON g.id = c.category_id"
+        " WHERE c.term = ? COLLATE NOCASE"
+        " UNION SELECT c.id, c.term, c.definition, g.name FROM aliases a JOIN concepts c ON c.id = a.concept_id"
+        " JOIN categories g ON g.id = c.category_id WHERE a.alias = ? COLLATE NOCASE",
+        (term, term),
+    ).fetchall()
+    return _describe(db, sorted(rows))
+
+
+def fts_query(text: str) -> str:
+    """Plain words as an FTS5 query: every word must match, the last one as a prefix."""
+    words = [w.replace('"', '""') for w in text.split()]
+    return " ".join(f'"{w}"' + ("*" if i == len(words) - 1 else "") for i, w in enumerate(words))
+
+
+def search(
+    db: sqlite3.Connection, query: str, limit: int = 20, kind: str = "", category: str = "", raw: bool = False
+) -> List[Dict[str, Any]]:
+    # Ranking stays inside FTS5 (rank is configured as weighted bm25 in connect()),
+    # so only matching rowids are scored and joined.
+    sql = (
+        "SELECT c.id, c.term, c.definition, g.name FROM"
+        " (SELECT rowid, rank FROM concepts_fts WHERE concepts_fts MATCH ?) f"
+        " JOIN concepts c ON c.rowid = f.rowid JOIN categories g ON g.id = c.category_id"
+    )
+    params: List[Any] = [query if raw else fts_query(query)]
+    where: List[str] = []
+    if category:
+        where.append("g.name = ?")
+        params.append(category)
+    if kind:
+        where.append(
+            "EXISTS (SELECT 1 FROM concept_sources cs JOIN sources s ON s.id = cs.source_id"
+            " WHERE cs.concept_id = c.id AND s.kind = ?)"
+        )
+        params.append(kind)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY f.rank LIMIT ?"
+    params.append(limit)
+    return _describe(db, db.execute(sql, params).fetchall())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="SQLite/FTS5 concept database: build from concepts.json, look up, search")
+    ap.add_argument("--db", default="concepts/concepts.sqlite", help="Database path")
+    # --db after the subcommand; SUPPRESS keeps it from resetting the top-level value.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=argparse.SUPPRESS, help="Database path")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", parents=[common], help="Update the database from a concepts.json (incremental)")
+    p.add_argument("concepts", help="concepts.json (pretty, compact or ndjson)")
+    p = sub.add_parser("lookup", parents=[common], help="Exact term or alias, case-insensitive")
+    p.add_argument("term")
+    p = sub.add_parser("search", parents=[common], help="Full-text search over terms, aliases and definitions")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--kind", default="", help="Only concepts with a source of this kind")
+    p.add_argument("--category", default="", help="Only concepts of this category")
+    p.add_argument("--raw", action="store_true", help="Pass QUERY to FTS5 MATCH unchanged")
+    args = ap.parse_args()
+
+    db_path = Path(args.db)
+    if args.command == "build":
+        # Filled while streaming; write_concept_db stores meta after the last concept.
+        meta: Dict[str, Any] = {}
+        stats = write_concept_db(db_path, iter_concepts_json(Path(args.concepts), meta), meta)
+        print("concept_db_ok=1 " + " ".join(f"{k}={v}" for k, v in stats.items()) + f" db={db_path}")
+        return 0
+    if not db_path.exists():
+        print(f"missing database: {db_path}", file=sys.stderr)
+        return 2
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        if args.command == "lookup":
+            found = lookup(db, args.term)
+        else:
+            try:
+                found = search(db, args.query, args.limit, args.kind, args.category, args.raw)
+            except sqlite3.OperationalError as e:
+                print(f"search: {e}", file=sys.stderr)
+                return 2
+    finally:
+        db.close()
+    for c in found:
+        print(json.dumps(c, ensure_ascii=False))
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Compiled allow/deny rule sets for concepts/curation.json.
+
+Entries of `allow_terms` / `deny_terms` are exact terms unless prefixed:
+  prefix:TEXT   term starts with TEXT
+  suffix:TEXT   term ends with TEXT
+  glob:PATTERN  fnmatch-style (* ? [abc]) over the whole term
+  re:PATTERN    Python regex, full match
+  exact:TEXT    exact term (for terms that themselves start with one of the prefixes)
+
+A RuleSet compiles its rules once so matching a term costs O(len(term)) plus the
+few candidates it reaches, not O(rules):
+  - exact rules are one dict lookup
+  - prefix and suffix rules live in character tries walked along the term (suffix
+    rules on the reversed term)
+  - globs hang off the trie node of their literal head (or, failing that, tail)
+    and are verified only when the walk reaches that node
+  - regexes hang off the prefix-trie node of their literal head (the root if
+    they have none); the checked rules at each node are alternated into one
+    combined regex of named groups, so a node costs one match call; a regex with
+    groups of its own (backreferences, named groups) or global inline flags cannot
+    be alternated safely and is compiled and matched on its own
+When several rules match, the one declared first decides; its hit counter is
+incremented, so `report()` shows which rules do work and which never fire.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+KINDS = ("exact", "prefix", "suffix", "glob", "re")
+_WILDCARDS = "*?["
+
+
+def parse_rule(text: str) -> Tuple[str, str]:
+    """(kind, pattern) for one curation entry."""
+    head, sep, rest = text.partition(":")
+    if sep and head in KINDS:
+        return head, rest
+    return "exact", text
+
+
+@dataclass
+class Rule:
+    index: int
+    text: str
+    kind: str
+    pattern: str
+    origin: str = "curation"
+    hits: int = 0
+
+
+def _literal_head(regex: str) -> str:
+    """Literal text every match of regex must start with (conservative; "" if unsure)."""
+    if "|" in regex:
+        return ""
+    out: List[str] = []
+    i = 0
+    while i < len(regex):
+        ch = regex[i]
+        if ch == "\\" and i + 1 < len(regex) and not regex[i + 1].isalnum():
+            out.append(regex[i + 1])
+            i += 2
+        elif ch.isalnum() or ch in "_- :/@,'\"":
+            out.append(ch)
+            i += 1
+        else:
+            break
+    if i < len(regex) and regex[i] in "?*{" and out:
+        # The last literal is quantified and may be absent.
+        out.pop()
+    return "".join(out)
+
+
+def _groupable(regex: str) -> bool:
+    """True when regex still compiles wrapped in a group (global inline flags do not)."""
+    try:
+        re.compile(f"(?:{regex})")
+    except re.error:
+        return False
+    return True
+
+
+class _Trie:
+    """Character trie; each node keeps its first unconditional rule and one combined regex of checked rules."""
+
+    __slots__ = ("children", "plain", "checks", "combined", "groups", "first_check", "singles")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Trie"] = {}
+        self.plain: Optional[Rule] = None
+        self.checks: List[Tuple[Rule, str]] = []
+        self.combined: Optional["re.Pattern[str]"] = None
+        self.groups: Dict[str, Rule] = {}
+        self.first_check = 0
+        self.singles: List[Tuple[Rule, "re.Pattern[str]"]] = []
+
+    def insert(self, key: str, rule: Rule, regex: Optional[str] = None, single: Optional["re.Pattern[str]"] = None) -> None:
+        node = self
+        for ch in key:
+            node = node.children.setdefault(ch, _Trie())
+        if single is not None:
+            node.singles.append((rule, single))
+        elif regex is not None:
+            node.checks.append((rule, regex))
+        elif node.plain is None:
+            node.plain = rule
+
+    def compile(self, flags: int) -> None:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children.values())
+            if not node.checks:
+                continue
+            # Alternatives are tried in declaration order, so the first one that matches
+            # is also the lowest-index checked rule at this node.
+            alts = []
+            for rule, regex in node.checks:
+                node.groups[f"r{rule.index}"] = rule
+                alts.append(f"(?P<r{rule.index}>{regex})")
+            node.combined = re.compile("|".join(alts), flags)
+            node.first_check = node.checks[0][0].index
+            node.checks = []
+
+    def best(self, text: str, subject: str, current: Optional[Rule]) -> Optional[Rule]:
+        """Lowest-index rule along text's path (checked rules must fully match subject)."""
+        node: Optional[_Trie] = self
+        i = 0
+        while node is not None:
+            if node.plain is not None and (current is None or node.plain.index < current.index):
+                current = node.plain
+            if node.combined is not None and (current is None or node.first_check < current.index):
+                m = node.combined.fullmatch(subject)
+                if m is not None:
+                    rule = node.groups[m.lastgroup]
+                    if current is None or rule.index < current.index:
+                        current = rule
+            for rule, single in node.singles:
+                if current is not None and rule.index >= current.index:
+                    break
+                if single.fullmatch(subject) is not None:
+                    current = rule
+                    break
+            if i == len(text):
+                break
+            node = node.children.get(text[i])
+            i += 1
+        return current
+
+
+class RuleSet:
+    def __init__(self, entries: Iterable[Any], ignore_case: bool = False, builtin: Iterable[str] = ()) -> None:
+        self.ignore_case = ignore_case
+        self.rules: List[Rule] = []
+        self._exact: Dict[str, Rule] = {}
+        self._prefix = _Trie()
+        self._suffix = _Trie()
+        flags = re.IGNORECASE if ignore_case else 0
+
+        texts = [(str(e).strip(), "curation") for e in entries] + [(str(e), "builtin") for e in builtin]
+        for text, origin in texts:
+            kind, pattern = parse_rule(text)
+            if not pattern.strip():
+                continue
+            rule = Rule(index=len(self.rules), text=text, kind=kind, pattern=pattern, origin=origin)
+            self.rules.append(rule)
+            key = self._fold(pattern)
+            if kind == "exact":
+                self._exact.setdefault(key, rule)
+            elif kind == "prefix":
+                self._prefix.insert(key, rule)
+            elif kind == "suffix":
+                self._suffix.insert(key[::-1], rule)
+            elif kind == "glob":
+                regex = fnmatch.translate(pattern)
+                cut = min((key.find(c) for c in _WILDCARDS if c in key), default=len(key))
+                tail = re.split(r"[*?\]]", key)[-1] if cut < len(key) else key
+                if key[:cut] or not tail:
+                    self._prefix.insert(key[:cut], rule, regex)
+                else:
+                    self._suffix.insert(tail[::-1], rule, regex)
+            else:
+                try:
+                    compiled = re.compile(pattern, flags)
+                except re.error as e:
+                    raise ValueError(f"invalid curation rule {text!r}: {e}") from None
+                # Unanchored regexes sit at the trie root and are checked for every term.
+                key = self._fold(_literal_head(pattern))
+                if compiled.groups or not _groupable(pattern):
+                    self._prefix.insert(key, rule, single=compiled)
+                else:
+                    self._prefix.insert(key, rule, f"(?:{pattern})")
+        self._prefix.compile(flags)
+        self._suffix.compile(flags)
+
+    def _fold(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, term: str) -> Optional[Rule]:
+        """The first-declared rule matching term (its hit counter is incremented), else None."""
+        key = self._fold(term)
+        best = self._exact.get(key)
+        best = self._prefix.best(key, term, best)
+        best = self._suffix.best(key[::-1], term, best)
+        if best is not None:
+            best.hits += 1
+        return best
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [{"rule": r.text, "kind": r.kind, "origin": r.origin, "hits": r.hits} for r in self.rules]
@@ -12,19 +12,47 @@ Outputs (into this canonical repo):
   - concepts/concepts.json
   - concepts/glossary.md
   - graphs/nomenclature.hypergraph.json  (Meta3 hypergraph schema)
+  - graphs/nomenclature.hypergraph.sidecar.bin  (viewer analytics, with --sidecar)
+
+With --rank, graph analytics (PageRank, degree, component, source co-occurrence
+cluster; tools/graph_analytics.py) go into each node's data.analytics and order
+the glossary.
 """
 
 from __future__ import annotations
 
 import argparse
+import glob
+import hashlib
 import json
+import mmap
 import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from concept_cluster import DEFAULT_THRESHOLD as DEFAULT_CLUSTER_THRESHOLD, cluster_concepts
+from concept_db import write_concept_db
+from graph_analytics import analytics_by_id, analyze, csr_from_records
+from graph_io import FORMATS, RenderMemo, iter_json_array, render_item, replace_if_changed, write_json_document
+from curation_rules import RuleSet, parse_rule
+from graph_sidecar import build_sidecar, sidecar_path
+from hypergraph_bin import SUFFIX as BINARY_SUFFIX, write_bin_document
+from run_metrics import RunMetrics
+
+
+# Bump whenever extraction output for an unchanged source could differ, so stale
+# cache entries are never reused.
+EXTRACTOR_VERSION = "1"
 
+DEFAULT_CATALOG = "dist/meta3-engine-v0.5.0/config/capabilities.json"
+CATALOG_TYPE_DEFINITION = "A capability classification used in the catalog."
 
 STOP_TERMS = {
     "meta3",
@@ -66,6 +94,12 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+def source_date_iso() -> str:
+    """Timestamp for --deterministic runs: SOURCE_DATE_EPOCH if set, else the Unix epoch."""
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0") or 0)
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
 def slugify(text: str) -> str:
     s = text.strip().lower()
     s = re.sub(r"[^\w\s-]", "", s)
@@ -82,6 +116,23 @@ def load_json(path: Path):
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size), or None if the file is missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def first_sentence(text: str) -> str:
     t = " ".join(text.strip().split())
     if not t:
@@ -90,63 +141,116 @@ def first_sentence(text: str) -> str:
     return m[0].strip()
 
 
+_HEADING_JUNK_RE = re.compile(r"[^\w\s\-\(\):/]+")
+_WS_RE = re.compile(r"\s+")
+_NUMBERED_RE = re.compile(r"^\d+(\.\d+)?\s+")
+_LETTERED_RE = re.compile(r"^[A-Z]\)\s+")
+_BACKTICK_RE = re.compile(r"`([^`]{2,80})`")
+_INLINE_DEF_RE = re.compile(r"^[-*]\s+`([^`]{2,80})`\s*[—-]\s*(.+)$")
+_TABLE_ROW_RE = re.compile(r"^\|\s*`([^`]{2,80})`\s*\|\s*([^|]{2,200})\|")
+_TERM_PREFIX_RE = re.compile(r"^[#>\-\*\s]+")
+_LEADING_DIGIT_RE = re.compile(r"^\d")
+_NUMERIC_RE = re.compile(r"\d+(\.\d+)*")
+
+_SKIP_HEADINGS = {
+    "overview",
+    "architecture",
+    "usage",
+    "notes",
+    "examples",
+    "constraints",
+    "response protocol",
+    "outputs",
+    "inputs",
+    "testing",
+    "development",
+    "advanced features",
+    "quick start",
+    "installation",
+}
+
+_SKIP_HEADING_KEYWORDS = (
+    "how to run",
+    "how to",
+    "template",
+    "example",
+    "quick",
+    "usage",
+    "outputs",
+    "inputs",
+    "testing",
+    "validation",
+)
+
+# Documents at least this large are scanned through mmap instead of being read whole.
+MMAP_THRESHOLD = 4 << 20
+
+
+def heading_term(line: str) -> Optional[str]:
+    """Nomenclature term for a stripped heading line, or None if it is noise."""
+    if not line.startswith("#"):
+        return None
+    title = line.lstrip("#").strip()
+    # Drop emoji / punctuation-only headings
+    title = _HEADING_JUNK_RE.sub("", title).strip()
+    title = _WS_RE.sub(" ", title).strip()
+    if len(title) < 3:
+        return None
+    # Drop obvious section headings (too noisy for nomenclature)
+    if _NUMBERED_RE.match(title):
+        return None
+    if _LETTERED_RE.match(title):
+        return None
+    title_l = title.lower()
+    if title_l in _SKIP_HEADINGS:
+        return None
+    if any(kw in title_l for kw in _SKIP_HEADING_KEYWORDS):
+        return None
+    return title
+
+
+def inline_definition(line: str) -> Optional[Tuple[str, str]]:
+    """(term, description) for a stripped "- `term` — description" line."""
+    m = _INLINE_DEF_RE.match(line)
+    if not m:
+        return None
+    term = m.group(1).strip()
+    desc = m.group(2).strip()
+    if term and desc:
+        return (term, desc)
+    return None
+
+
+def table_term(line: str) -> Optional[Tuple[str, str]]:
+    """(term, description) for a stripped "| `term` | description |" table row."""
+    if not (line.startswith("|") and "`" in line):
+        return None
+    # | `FileSystem.Write` | Write content to file | ...
+    m = _TABLE_ROW_RE.match(line)
+    if not m:
+        return None
+    term = m.group(1).strip()
+    desc = m.group(2).strip()
+    # Skip header rows
+    if term.lower() in {"capability", "tool id", "id"}:
+        return None
+    if term and desc and not set(desc) <= {"-", " "}:
+        return (term, desc)
+    return None
+
+
 def extract_markdown_headings(md: str) -> List[str]:
     out: List[str] = []
     for line in md.splitlines():
-        line = line.strip()
-        if not line.startswith("#"):
-            continue
-        title = line.lstrip("#").strip()
-        # Drop emoji / punctuation-only headings
-        title = re.sub(r"[^\w\s\-\(\):/]+", "", title).strip()
-        title = re.sub(r"\s+", " ", title).strip()
-        if len(title) < 3:
-            continue
-        # Drop obvious section headings (too noisy for nomenclature)
-        if re.match(r"^\d+(\.\d+)?\s+", title):
-            continue
-        if re.match(r"^[A-Z]\)\s+", title):
-            continue
-        if title.lower() in {
-            "overview",
-            "architecture",
-            "usage",
-            "notes",
-            "examples",
-            "constraints",
-            "response protocol",
-            "outputs",
-            "inputs",
-            "testing",
-            "development",
-            "advanced features",
-            "quick start",
-            "installation",
-        }:
-            continue
-        if any(
-            kw in title.lower()
-            for kw in (
-                "how to run",
-                "how to",
-                "template",
-                "example",
-                "quick",
-                "usage",
-                "outputs",
-                "inputs",
-                "testing",
-                "validation",
-            )
-        ):
-            continue
-        out.append(title)
+        title = heading_term(line.strip())
+        if title is not None:
+            out.append(title)
     return out
 
 
 def extract_backticked_terms(md: str) -> List[str]:
     # Extract `like_this` and `Tool.Name` and `graph_capability_graph`
-    return [m.group(1).strip() for m in re.finditer(r"`([^`]{2,80})`", md)]
+    return [m.group(1).strip() for m in _BACKTICK_RE.finditer(md)]
 
 def extract_inline_definitions(md: str) -> List[Tuple[str, str]]:
     """
@@ -156,14 +260,9 @@ def extract_inline_definitions(md: str) -> List[Tuple[str, str]]:
     """
     out: List[Tuple[str, str]] = []
     for line in md.splitlines():
-        l = line.strip()
-        m = re.match(r"^[-*]\s+`([^`]{2,80})`\s*[—-]\s*(.+)$", l)
-        if not m:
-            continue
-        term = m.group(1).strip()
-        desc = m.group(2).strip()
-        if term and desc:
-            out.append((term, desc))
+        d = inline_definition(line.strip())
+        if d is not None:
+            out.append(d)
     return out
 
 
@@ -174,36 +273,123 @@ def extract_markdown_table_terms(md: str) -> List[Tuple[str, str]]:
     """
     out: List[Tuple[str, str]] = []
     for line in md.splitlines():
-        l = line.strip()
-        if not (l.startswith("|") and "`" in l):
-            continue
-        # | `FileSystem.Write` | Write content to file | ...
-        m = re.match(r"^\|\s*`([^`]{2,80})`\s*\|\s*([^|]{2,200})\|", l)
-        if not m:
-            continue
-        term = m.group(1).strip()
-        desc = m.group(2).strip()
-        # Skip header rows
-        if term.lower() in {"capability", "tool id", "id"}:
-            continue
-        if term and desc and not set(desc) <= {"-", " "}:
-            out.append((term, desc))
+        d = table_term(line.strip())
+        if d is not None:
+            out.append(d)
     return out
 
 
+class BacktickScanner:
+    """
+    Incremental equivalent of `_BACKTICK_RE.finditer` over a text fed in chunks.
+
+    A span opened by a backtick matches iff the next backtick follows 2..80
+    characters later; otherwise that next backtick becomes the new opener. Spans
+    may cross chunk (line) boundaries, exactly as with a whole-text regex.
+    """
+
+    def __init__(self, out: List[str]) -> None:
+        self.out = out
+        self._pending: Optional[str] = None
+
+    def feed(self, chunk: str) -> None:
+        pos = 0
+        pending = self._pending
+        while True:
+            q = chunk.find("`", pos)
+            if q < 0:
+                if pending is not None:
+                    # Anything past 80 chars can never match; keep 81 to remember that.
+                    pending = (pending + chunk[pos:])[:81]
+                break
+            if pending is not None:
+                body = pending + chunk[pos:q]
+                if 2 <= len(body) <= 80:
+                    self.out.append(body.strip())
+                    pending = None
+                else:
+                    pending = ""
+            else:
+                pending = ""
+            pos = q + 1
+        self._pending = pending
+
+    @property
+    def open(self) -> bool:
+        """True while a backtick span is open and later chunks must be fed."""
+        return self._pending is not None
+
+
+def iter_text_chunks(path: Path) -> Iterable[str]:
+    """
+    Yield a document as consecutive line chunks (terminators kept), matching
+    `read_text(path).splitlines(keepends=True)`. Large files are streamed via mmap.
+    """
+    size = path.stat().st_size
+    if size == 0 or size < MMAP_THRESHOLD:
+        yield from read_text(path).splitlines(keepends=True)
+        return
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for raw in iter(mm.readline, b""):
+            line = raw.decode("utf-8", errors="replace")
+            if "\r" in line:
+                # Universal newlines, as in text-mode reads.
+                line = line.replace("\r\n", "\n").replace("\r", "\n")
+            yield from line.splitlines(keepends=True)
+
+
+def scan_markdown(path: Path) -> Dict[str, Any]:
+    """
+    Fused single-pass scanner: classifies each line once and collects inline
+    definitions, table terms, headings and backticked terms together. Produces the
+    same lists as running the four extract_* passes over the whole text.
+    """
+    inline_defs: List[List[str]] = []
+    table_terms: List[List[str]] = []
+    headings: List[str] = []
+    backticked: List[str] = []
+    ticks = BacktickScanner(backticked)
+    for chunk in iter_text_chunks(path):
+        if ticks.open or "`" in chunk:
+            ticks.feed(chunk)
+        line = chunk.strip()
+        if not line:
+            continue
+        lead = line[0]
+        if lead == "#":
+            title = heading_term(line)
+            if title is not None:
+                headings.append(title)
+        elif lead == "-" or lead == "*":
+            d = inline_definition(line)
+            if d is not None:
+                inline_defs.append(list(d))
+        elif lead == "|":
+            d = table_term(line)
+            if d is not None:
+                table_terms.append(list(d))
+    return {
+        "inline_definitions": inline_defs,
+        "table_terms": table_terms,
+        "headings": headings,
+        "backticked": backticked,
+    }
+
+
+@lru_cache(maxsize=1 << 16)
 def normalize_term(term: str) -> Optional[str]:
     t = term.strip()
     # Trim common markdown/list prefixes that may appear in backticked strings.
-    t = re.sub(r"^[#>\-\*\s]+", "", t).strip()
-    t = re.sub(r"^\d+(\.\d+)?\s+", "", t).strip()
-    t = re.sub(r"^[A-Z]\)\s+", "", t).strip()
+    t = _TERM_PREFIX_RE.sub("", t).strip()
+    t = _NUMBERED_RE.sub("", t).strip()
+    t = _LETTERED_RE.sub("", t).strip()
     t = t.replace("\u2014", "-").replace("\u2013", "-")
-    t = re.sub(r"\s+", " ", t)
+    t = _WS_RE.sub(" ", t)
     if len(t) < 3 or len(t) > 80:
         return None
-    if re.match(r"^\d", t):
+    if _LEADING_DIGIT_RE.match(t):
         return None
-    if re.match(r"^[A-Z]\)\s+", t):
+    if _LETTERED_RE.match(t):
         return None
     # Drop obvious paths
     if "/" in t or t.endswith(".rs") or t.endswith(".md") or t.endswith(".json"):
@@ -212,7 +398,7 @@ def normalize_term(term: str) -> Optional[str]:
     if t.startswith("cargo ") or t.startswith("git ") or t.startswith("gh "):
         return None
     # Drop purely numeric
-    if re.fullmatch(r"\d+(\.\d+)*", t):
+    if _NUMERIC_RE.fullmatch(t):
         return None
     # Reduce stopwords
     if t.lower() in STOP_TERMS:
@@ -245,27 +431,36 @@ def load_curation(path: Path) -> Dict[str, Any]:
         return {}
 
 
-def apply_curation(concepts: List[Concept], curation: Dict[str, Any]) -> List[Concept]:
-    allow_raw = curation.get("allow_terms") or []
-    deny_raw = curation.get("deny_terms") or []
+def compile_curation(curation: Dict[str, Any]) -> Tuple[RuleSet, RuleSet]:
+    """(allow, deny) rule sets; deny matches case-insensitively and includes DEFAULT_DENY_TERMS."""
+    allow = RuleSet(curation.get("allow_terms") or [])
+    deny = RuleSet(curation.get("deny_terms") or [], ignore_case=True, builtin=sorted(DEFAULT_DENY_TERMS))
+    return allow, deny
+
+
+def apply_curation(
+    concepts: List[Concept],
+    curation: Dict[str, Any],
+    stats: Optional[Dict[str, int]] = None,
+    rules: Optional[Tuple[RuleSet, RuleSet]] = None,
+) -> List[Concept]:
+    allow, deny = rules or compile_curation(curation)
     definitions = curation.get("definitions") or {}
     aliases = curation.get("aliases") or {}
 
-    allow: Set[str] = {str(t).strip() for t in allow_raw if str(t).strip()}
-    deny: Set[str] = {str(t).strip().lower() for t in deny_raw if str(t).strip()}
-    deny |= DEFAULT_DENY_TERMS
-
     out: List[Concept] = []
+    denied = not_allowed = 0
     for c in concepts:
         term = c.term.strip()
-        term_l = term.lower()
 
         # Always keep catalog-derived terms (capability names/types) unless explicitly denied.
-        from_catalog = any(s.kind == "capability_catalog" for s in c.sources)
-        if term_l in deny and not from_catalog:
+        # Sources are only scanned for terms a rule would drop.
+        if deny.match(term) is not None and not any(s.kind == "capability_catalog" for s in c.sources):
+            denied += 1
             continue
 
-        if allow and not from_catalog and term not in allow:
+        if allow and allow.match(term) is None and not any(s.kind == "capability_catalog" for s in c.sources):
+            not_allowed += 1
             continue
 
         # Apply definition overrides by exact term.
@@ -279,15 +474,27 @@ def apply_curation(concepts: List[Concept], curation: Dict[str, Any]) -> List[Co
 
         out.append(c)
 
+    if stats is not None:
+        stats["denied"] = stats.get("denied", 0) + denied
+        stats["not_allowed"] = stats.get("not_allowed", 0) + not_allowed
+    return out
+
+
+def curated_terms(curation: Dict[str, Any]) -> List[str]:
+    """Exact allow_terms entries (pattern rules name no single term)."""
+    out: List[str] = []
+    for t in curation.get("allow_terms") or []:
+        kind, term = parse_rule(str(t).strip())
+        if kind == "exact" and term.strip():
+            out.append(term.strip())
     return out
 
 
 def ensure_seed_terms(concepts: List[Concept], curation: Dict[str, Any]) -> List[Concept]:
-    allow_raw = curation.get("allow_terms") or []
     definitions = curation.get("definitions") or {}
     aliases = curation.get("aliases") or {}
 
-    want: List[str] = [str(t).strip() for t in allow_raw if str(t).strip()]
+    want: List[str] = curated_terms(curation)
     have: Set[str] = {c.term for c in concepts}
 
     out = list(concepts)
@@ -312,7 +519,7 @@ def apply_taxonomy(concepts: List[Concept], catalog_types: Set[str]) -> List[Con
     for c in concepts:
         if c.term in catalog_types:
             c.category = "taxonomy"
-        if c.definition.strip() == "A capability classification used in the catalog.":
+        if c.definition.strip() == CATALOG_TYPE_DEFINITION:
             c.category = "taxonomy"
     return concepts
 
@@ -345,100 +552,371 @@ def merge_concept(
         c.sources.append(source)
 
 
-def extract_from_capabilities_catalog(path: Path) -> List[Tuple[str, str]]:
-    data = load_json(path)
-    caps = data.get("capabilities") if isinstance(data, dict) else data
-    if not isinstance(caps, list):
-        return []
-    out: List[Tuple[str, str]] = []
-    for cap in caps:
+class _ConceptRecord:
+    __slots__ = ("term", "definition", "aliases", "sources")
+
+    def __init__(self, term: str, definition: str) -> None:
+        self.term = term
+        self.definition = definition
+        self.aliases: Optional[Set[str]] = None
+        # Source ids in first-seen order (dict as an ordered set).
+        self.sources: Dict[int, None] = {}
+
+
+class ConceptAccumulator:
+    """
+    Memory-lean equivalent of repeated `merge_concept` calls.
+
+    Records use __slots__, terms and paths are interned, aliases and sources are
+    set-backed, and sources live in one table referenced by small integer ids.
+    Sorting happens once in `finalize`, which yields the same concepts (same
+    order, aliases, source order) as the dict + merge_concept path.
+    """
+
+    def __init__(self) -> None:
+        self._records: Dict[str, _ConceptRecord] = {}
+        self._ids: Dict[str, str] = {}
+        self._source_ids: Dict[Tuple[str, str], int] = {}
+        self._sources: List[SourceRef] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def source(self, path: str, kind: str) -> int:
+        key = (sys.intern(path), sys.intern(kind))
+        sid = self._source_ids.get(key)
+        if sid is None:
+            sid = len(self._sources)
+            self._source_ids[key] = sid
+            self._sources.append(SourceRef(path=key[0], kind=key[1]))
+        return sid
+
+    def _concept_id(self, term: str) -> str:
+        cid = self._ids.get(term)
+        if cid is None:
+            cid = self._ids[term] = sys.intern(f"concept:{slugify(term)}")
+        return cid
+
+    def add(self, term: str, definition: str, source_id: int, aliases: Optional[Iterable[str]] = None) -> None:
+        cid = self._concept_id(term)
+        rec = self._records.get(cid)
+        if rec is None:
+            rec = self._records[cid] = _ConceptRecord(sys.intern(term), definition.strip())
+        elif not rec.definition and definition:
+            rec.definition = definition.strip()
+        if aliases:
+            extra = {a for a in aliases if a and a != term}
+            if extra:
+                if rec.aliases is None:
+                    rec.aliases = set()
+                rec.aliases |= extra
+        if source_id not in rec.sources:
+            rec.sources[source_id] = None
+
+    def finalize(self) -> List[Concept]:
+        sources = self._sources
+        return [
+            Concept(
+                id=cid,
+                term=rec.term,
+                definition=rec.definition,
+                category="concept",
+                aliases=sorted(rec.aliases) if rec.aliases else [],
+                sources=[sources[i] for i in rec.sources],
+            )
+            for cid, rec in sorted(self._records.items())
+        ]
+
+
+def extract_catalog_source(path: Path) -> Dict[str, Any]:
+    """
+    Cacheable per-catalog extraction result: (term, description) entries + type labels.
+
+    One pass over the file: the `capabilities` array (or a top-level array) is
+    streamed element by element, so memory follows the extracted terms rather
+    than the catalog size.
+    """
+    entries: List[List[str]] = []
+    types: Set[str] = set()
+    for cap in iter_json_array(path, "capabilities"):
         if not isinstance(cap, dict):
             continue
         name = cap.get("name") or cap.get("id")
         desc = cap.get("description") or ""
         if isinstance(name, str) and name.strip():
-            out.append((name.strip(), first_sentence(str(desc))))
+            entries.append([name.strip(), first_sentence(str(desc))])
         cap_type = cap.get("type")
         if isinstance(cap_type, str) and cap_type.strip():
-            out.append((cap_type.strip(), "A capability classification used in the catalog."))
+            entries.append([cap_type.strip(), CATALOG_TYPE_DEFINITION])
+            types.add(cap_type.strip())
+    return {"entries": entries, "types": sorted(types)}
+
+
+def extract_markdown_source(path: Path) -> Dict[str, Any]:
+    """Cacheable per-document extraction result, one list per term kind."""
+    return scan_markdown(path)
+
+
+def input_digest(cache: "ExtractionCache", inputs: List[Tuple[str, str, Path]], settings: Dict[str, Any]) -> str:
+    """sha256 over everything that determines the output: (kind, label, path) inputs plus settings."""
+    h = hashlib.sha256()
+    h.update(f"extractor=v{EXTRACTOR_VERSION}\n".encode("utf-8"))
+    h.update(json.dumps(settings, sort_keys=True).encode("utf-8") + b"\n")
+    for kind, label, path in inputs:
+        digest = cache.digest(path) if path.exists() else "missing"
+        h.update(f"{kind}\t{label}\t{digest}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of per-source extraction results.
+
+    Entries are keyed by (extractor version, parser, sha256 of the source bytes), so
+    an unchanged source is loaded instead of re-parsed and any edit is a miss.
+    Results and digests are also kept in memory against the file's (mtime_ns, size),
+    so a long-lived cache (--watch) skips even the hash for untouched sources.
+    """
+
+    def __init__(self, root: Optional[Path], rebuild: bool = False) -> None:
+        self.root = root
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._digests: Dict[Path, Tuple[Optional[Tuple[int, int]], str]] = {}
+        self._memo: Dict[Tuple[str, Path], Tuple[Optional[Tuple[int, int]], Dict[str, Any]]] = {}
+        self._stamps: Dict[Tuple[str, Path], Optional[Tuple[int, int]]] = {}
+
+    def _entry_path(self, parser: str, digest: str) -> Path:
+        assert self.root is not None
+        return self.root / f"v{EXTRACTOR_VERSION}-{parser}-{digest}.json"
+
+    def digest(self, path: Path) -> str:
+        stamp = file_stamp(path)
+        known = self._digests.get(path)
+        if known is None or known[0] != stamp:
+            known = self._digests[path] = (stamp, file_sha256(path))
+        return known[1]
+
+    def _read(self, parser: str, digest: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry_path(parser, digest)
+        if not entry.exists():
+            return None
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if data.get("extractor_version") != EXTRACTOR_VERSION or data.get("sha256") != digest:
+            return None
+        result = data.get("result")
+        return result if isinstance(result, dict) else None
+
+    def _write(self, parser: str, digest: str, result: Dict[str, Any]) -> None:
+        entry = self._entry_path(parser, digest)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(entry.name + f".{os.getpid()}.tmp")
+        payload = {"extractor_version": EXTRACTOR_VERSION, "parser": parser, "sha256": digest, "result": result}
+        tmp.write_text(json.dumps(payload, separators=(",", ":")) + "\n", encoding="utf-8")
+        os.replace(tmp, entry)
+
+    def lookup(self, parser: str, path: Path) -> Optional[Dict[str, Any]]:
+        # Stamp before reading so an edit made mid-parse is seen on the next lookup.
+        key = (parser, path)
+        stamp = self._stamps[key] = file_stamp(path)
+        memo = self._memo.get(key)
+        if memo is not None and memo[0] == stamp:
+            self.hits += 1
+            return memo[1]
+        if self.root is None or self.rebuild:
+            return None
+        cached = self._read(parser, self.digest(path))
+        if cached is not None:
+            self.hits += 1
+            self._memo[key] = (stamp, cached)
+        return cached
+
+    def store(self, parser: str, path: Path, result: Dict[str, Any]) -> None:
+        self.misses += 1
+        key = (parser, path)
+        self._memo[key] = (self._stamps.pop(key, None), result)
+        if self.root is not None:
+            self._write(parser, self.digest(path), result)
+
+
+PARSERS = {
+    "catalog": extract_catalog_source,
+    "markdown": extract_markdown_source,
+}
+
+
+def _run_parser(task: Tuple[str, Path]) -> Dict[str, Any]:
+    parser, path = task
+    return PARSERS[parser](path)
+
+
+def extract_sources(cache: ExtractionCache, tasks: List[Tuple[str, Path]], jobs: int = 1) -> List[Dict[str, Any]]:
+    """
+    Run (parser, path) tasks, serving unchanged sources from the cache.
+
+    Cache misses are parsed in a process pool when jobs > 1. Results come back in
+    task order either way, so downstream merging is identical to a serial run.
+    """
+    results: List[Optional[Dict[str, Any]]] = [cache.lookup(parser, path) for parser, path in tasks]
+    pending = [i for i, r in enumerate(results) if r is None]
+    todo = [tasks[i] for i in pending]
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as ex:
+            parsed = list(ex.map(_run_parser, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+    else:
+        parsed = [_run_parser(t) for t in todo]
+    for i, r in zip(pending, parsed):
+        cache.store(tasks[i][0], tasks[i][1], r)
+        results[i] = r
+    return [r for r in results if r is not None]
+
+
+DEFAULT_DOC_SOURCES: List[Tuple[str, str]] = [
+    ("meta3-causal-kernel/SYSTEM_PROMPT.md", "system_prompt"),
+    ("meta3-graph-core/SYSTEM_REPORT.md", "system_report"),
+    ("meta3-graph-core/SYSTEM_PROMPT.md", "graph_core_prompt"),
+]
+
+
+def parse_source_spec(spec: str) -> Tuple[str, str]:
+    """Split a KIND=PATH (or KIND=GLOB) command-line spec."""
+    kind, sep, target = spec.partition("=")
+    if not sep or not kind.strip() or not target.strip():
+        raise argparse.ArgumentTypeError(f"expected KIND=PATH, got: {spec!r}")
+    return kind.strip(), target.strip()
+
+
+def resolve_doc_sources(
+    engine_repo: Path,
+    explicit: List[Tuple[str, str]],
+    globs: List[Tuple[str, str]],
+) -> List[Tuple[Path, str]]:
+    """
+    System doc list in a deterministic order: explicit sources as given, then each
+    glob's matches sorted by path. Falls back to the default three docs when no
+    source options are given. A path is kept only at its first occurrence.
+    """
+    if not explicit and not globs:
+        explicit = [(kind, rel) for rel, kind in DEFAULT_DOC_SOURCES]
+    out: List[Tuple[Path, str]] = []
+    seen: Set[Path] = set()
+    for kind, rel in explicit:
+        p = engine_repo / rel
+        if p not in seen:
+            seen.add(p)
+            out.append((p, kind))
+    for kind, pattern in globs:
+        for p in sorted(engine_repo.glob(pattern)):
+            if p.is_file() and p not in seen:
+                seen.add(p)
+                out.append((p, kind))
     return out
 
 
-def extract_catalog_types(path: Path) -> Set[str]:
-    data = load_json(path)
-    caps = data.get("capabilities") if isinstance(data, dict) else data
-    if not isinstance(caps, list):
-        return set()
-    out: Set[str] = set()
-    for cap in caps:
-        if not isinstance(cap, dict):
-            continue
-        cap_type = cap.get("type")
-        if isinstance(cap_type, str) and cap_type.strip():
-            out.add(cap_type.strip())
+def resolve_catalogs(engine_repo: Path, specs: List[str]) -> List[Tuple[Path, str]]:
+    """
+    (path, provenance label) per capability catalog, in spec order. A spec with
+    glob characters expands to its sorted matches (labelled relative to the engine
+    repo); a plain path is kept even if missing and labelled as given.
+    """
+    out: List[Tuple[Path, str]] = []
+    seen: Set[Path] = set()
+    for spec in specs or [DEFAULT_CATALOG]:
+        if any(c in spec for c in "*?["):
+            matches = [Path(m) for m in sorted(glob.glob(str(engine_repo / spec), recursive=True))]
+            found = [(m, str(m.relative_to(engine_repo)) if m.is_relative_to(engine_repo) else str(m)) for m in matches if m.is_file()]
+        else:
+            found = [(engine_repo / spec, str(Path(spec)))]
+        for p, label in found:
+            if p not in seen:
+                seen.add(p)
+                out.append((p, label))
     return out
 
 
-def build_hypergraph(concepts: List[Concept], run_id: str) -> dict:
-    nodes = []
+def iter_hypergraph_nodes(concepts: List[Concept], analytics: Optional[Dict[str, dict]] = None) -> Iterator[dict]:
     for c in concepts:
-        nodes.append(
-            {
-                "id": c.id,
-                "kind": "concept",
-                "label": c.term,
-                "data": {
-                    "definition": c.definition,
-                    "aliases": c.aliases,
-                    "sources": [asdict(s) for s in c.sources],
-                },
-            }
-        )
-
-    # Very light structure: group by source kind.
+        data = {
+            "definition": c.definition,
+            "aliases": c.aliases,
+            "sources": [asdict(s) for s in c.sources],
+        }
+        if analytics is not None:
+            data["analytics"] = analytics[c.id]
+        yield {
+            "id": c.id,
+            "kind": "concept",
+            "label": c.term,
+            "data": data,
+        }
+
+    # Very light structure: group by source kind (--rank adds centrality and clusters).
     kinds = sorted({s.kind for c in concepts for s in c.sources})
     for k in kinds:
-        nodes.append(
-            {
-                "id": f"source_kind:{k}",
-                "kind": "source_kind",
-                "label": k,
-                "data": None,
-            }
-        )
+        node_id = f"source_kind:{k}"
+        yield {
+            "id": node_id,
+            "kind": "source_kind",
+            "label": k,
+            "data": None if analytics is None else {"analytics": analytics[node_id]},
+        }
+
 
-    edges = []
+def iter_hypergraph_edges(concepts: List[Concept]) -> Iterator[dict]:
     edge_i = 0
     for c in concepts:
         for s in c.sources:
-            edges.append(
-                {
-                    "id": f"edge:derived_from:{edge_i}",
-                    "kind": "derived_from",
-                    "causes": [f"source_kind:{s.kind}"],
-                    "effects": [c.id],
-                    "data": {"path": s.path},
-                }
-            )
+            yield {
+                "id": f"edge:derived_from:{edge_i}",
+                "kind": "derived_from",
+                "causes": [f"source_kind:{s.kind}"],
+                "effects": [c.id],
+                "data": {"path": s.path},
+            }
             edge_i += 1
 
-    return {
-        "id": "nomenclature",
-        "nodes": nodes,
-        "hyperedges": edges,
-        "metadata": {
-            "run_id": run_id,
-            "generated_at": utc_now_iso(),
-            "source": "nomenclature_extractor",
-        },
-    }
+
+def hypergraph_members(
+    concepts: List[Concept],
+    run_id: str,
+    generated_at: Optional[str] = None,
+    analytics: Optional[Dict[str, dict]] = None,
+) -> List[Tuple[str, Any]]:
+    """Top-level hypergraph members with nodes/hyperedges as lazy streams."""
+    return [
+        ("id", "nomenclature"),
+        ("nodes", iter_hypergraph_nodes(concepts, analytics)),
+        ("hyperedges", iter_hypergraph_edges(concepts)),
+        (
+            "metadata",
+            {
+                "run_id": run_id,
+                "generated_at": generated_at or utc_now_iso(),
+                "source": "nomenclature_extractor",
+            },
+        ),
+    ]
+
+
+def build_hypergraph(concepts: List[Concept], run_id: str) -> dict:
+    return {k: list(v) if k in ("nodes", "hyperedges") else v for k, v in hypergraph_members(concepts, run_id)}
+
+
+def rank_concepts(concepts: List[Concept]) -> Dict[str, dict]:
+    """Per-node graph analytics for the nomenclature hypergraph, keyed by node id."""
+    g = csr_from_records(iter_hypergraph_nodes(concepts), iter_hypergraph_edges(concepts))
+    return analytics_by_id(g, analyze(g, member_kind="concept"))
 
 
-def render_glossary(concepts: List[Concept], run_id: str, engine_repo: str) -> str:
+def render_glossary(concepts: List[Concept], run_id: str, engine_repo: str, generated_at: Optional[str] = None) -> str:
     lines: List[str] = []
     lines.append("# Meta3 Nomenclature & Concepts")
     lines.append("")
-    lines.append(f"Generated: `{utc_now_iso()}`")
+    lines.append(f"Generated: `{generated_at or utc_now_iso()}`")
     lines.append(f"Run: `{run_id}`")
     lines.append(f"Engine repo: `{engine_repo}`")
     lines.append("")
@@ -495,135 +973,482 @@ def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--engine-repo", required=True)
     ap.add_argument("--out-dir", required=True)
-    ap.add_argument("--catalog", default="dist/meta3-engine-v0.5.0/config/capabilities.json")
+    ap.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        metavar="PATH_OR_GLOB",
+        help=f"Capability catalog relative to --engine-repo; repeatable, globs allowed (default: {DEFAULT_CATALOG})",
+    )
     ap.add_argument("--curation", default="concepts/curation.json")
+    ap.add_argument(
+        "--cache-dir",
+        default="tmp/nomenclature_cache",
+        help="Per-source extraction cache (relative paths resolve against --out-dir)",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Parse every source; do not read or write the cache")
+    ap.add_argument("--rebuild-cache", action="store_true", help="Ignore cached entries and re-parse every source")
+    ap.add_argument(
+        "--sources",
+        nargs="+",
+        action="extend",
+        type=parse_source_spec,
+        default=[],
+        metavar="KIND=PATH",
+        help="System docs to scan, relative to --engine-repo (replaces the default doc set)",
+    )
+    ap.add_argument(
+        "--source-glob",
+        action="append",
+        type=parse_source_spec,
+        default=[],
+        metavar="KIND=GLOB",
+        help="Glob of system docs relative to --engine-repo, e.g. system_prompt=**/SYSTEM_PROMPT.md (repeatable)",
+    )
+    ap.add_argument("--jobs", type=int, default=1, help="Parse documents in a process pool of this size")
+    ap.add_argument(
+        "--deterministic",
+        action="store_true",
+        help=(
+            "Derive run_id from input content hashes and timestamps from SOURCE_DATE_EPOCH (default 0), "
+            "leave unchanged outputs untouched and print a changed_files=[...] line"
+        ),
+    )
+    ap.add_argument(
+        "--format",
+        choices=FORMATS + ("binary",),
+        default="pretty",
+        help=(
+            "JSON layout for concepts.json and the hypergraph (ndjson = one record per line); "
+            "binary writes the hypergraph as graphs/nomenclature.hypergraph.m3hg and concepts.json compact"
+        ),
+    )
+    ap.add_argument(
+        "--db-out",
+        default="",
+        help="Also keep a SQLite/FTS5 concept database here, updated incrementally (see tools/concept_db.py; relative to --out-dir)",
+    )
+    ap.add_argument(
+        "--curation-report",
+        default="",
+        help="Write per-rule allow/deny hit counts here (relative paths resolve against --out-dir)",
+    )
+    ap.add_argument(
+        "--cluster",
+        choices=("off", "propose", "apply"),
+        default="off",
+        help="Near-duplicate concept clustering: propose writes a report only, apply also folds members into aliases",
+    )
+    ap.add_argument(
+        "--cluster-threshold",
+        type=float,
+        default=DEFAULT_CLUSTER_THRESHOLD,
+        help="Trigram Jaccard similarity needed to link two differently-normalized terms",
+    )
+    ap.add_argument(
+        "--cluster-report",
+        default="tmp/concept_clusters.json",
+        help="Where --cluster writes its review report (relative paths resolve against --out-dir)",
+    )
+    ap.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Also write the viewer analytics sidecar next to the hypergraph (see tools/graph_sidecar.py)",
+    )
+    ap.add_argument(
+        "--rank",
+        action="store_true",
+        help="Add PageRank/degree/component/cluster to node data.analytics and order the glossary by PageRank",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Stay running: poll inputs (mtime/size) and regenerate outputs on change, reusing parsed sources",
+    )
+    ap.add_argument("--watch-interval", type=float, default=0.5, help="Seconds between --watch polls")
+    ap.add_argument("--metrics-out", default="", help="Write per-stage metrics (receipt-style JSON) to this path")
+    ap.add_argument("--profile", default="", metavar="DIR", help="Dump a cProfile run and per-stage tracemalloc snapshots here")
     args = ap.parse_args()
+    if args.watch and args.profile:
+        ap.error("--profile cannot be combined with --watch")
+    if args.watch:
+        return watch(args)
+
+    metrics = RunMetrics("extract_nomenclature", enabled=bool(args.metrics_out), profile_dir=Path(args.profile) if args.profile else None)
+    status = 1
+    try:
+        status = run(args, metrics)
+    finally:
+        metrics.finish(Path(args.metrics_out) if args.metrics_out else None, status)
+    return status
+
+
+class WatchState:
+    """What --watch keeps between refreshes: parsed sources and the compiled curation."""
+
+    def __init__(self, cache: ExtractionCache) -> None:
+        self.cache = cache
+        self.render = RenderMemo()
+        self.curation_stamp: Optional[Tuple[int, int]] = None
+        self.curation: Dict[str, Any] = {}
+        self.rules: Optional[Tuple[RuleSet, RuleSet]] = None
 
+
+def watched_inputs(args: argparse.Namespace) -> List[Path]:
+    """Every file a run reads; globs are re-resolved so new matches trigger a refresh."""
+    engine_repo = Path(args.engine_repo)
+    paths = [p for p, _ in resolve_catalogs(engine_repo, args.catalog)]
+    paths += [p for p, _ in resolve_doc_sources(engine_repo, args.sources, args.source_glob)]
+    paths.append(Path(args.out_dir) / args.curation)
+    return paths
+
+
+def watch(args: argparse.Namespace) -> int:
+    """Poll inputs and re-run on change; one `watch_refresh` line per run on stdout."""
+    out_dir = Path(args.out_dir)
+    state = WatchState(ExtractionCache(None if args.no_cache else out_dir / args.cache_dir, rebuild=args.rebuild_cache))
+    stamps: Dict[Path, Optional[Tuple[int, int]]] = {}
+    refreshes = 0
+    try:
+        while True:
+            current = {p: file_stamp(p) for p in watched_inputs(args)}
+            changed = [p for p in current if stamps.get(p, ()) != current[p]]
+            if changed:
+                stamps = current
+                refreshes += 1
+                t0 = time.perf_counter()
+                metrics = RunMetrics("extract_nomenclature", enabled=bool(args.metrics_out))
+                status = 1
+                try:
+                    status = run(args, metrics, state)
+                except Exception as e:
+                    # Keep watching: an input caught mid-save is retried on its next change.
+                    print(f"watch_error={type(e).__name__}: {e}", file=sys.stderr)
+                finally:
+                    metrics.finish(Path(args.metrics_out) if args.metrics_out else None, status)
+                print(
+                    f"watch_refresh={refreshes} status={status} changed_inputs={len(changed)}"
+                    f" duration_ms={(time.perf_counter() - t0) * 1000:.1f}",
+                    flush=True,
+                )
+            time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        print(f"watch_stopped refreshes={refreshes}")
+        return 0
+
+
+def run(args: argparse.Namespace, metrics: RunMetrics, state: Optional[WatchState] = None) -> int:
     engine_repo = Path(args.engine_repo)
     out_dir = Path(args.out_dir)
     out_concepts = out_dir / "concepts" / "concepts.json"
     out_glossary = out_dir / "concepts" / "glossary.md"
     out_graph = out_dir / "graphs" / "nomenclature.hypergraph.json"
+    json_format = args.format
+    if args.format == "binary":
+        out_graph = out_graph.with_suffix(BINARY_SUFFIX)
+        json_format = "compact"
+    if state is not None:
+        cache = state.cache
+        cache.hits = cache.misses = 0
+    else:
+        cache = ExtractionCache(None if args.no_cache else out_dir / args.cache_dir, rebuild=args.rebuild_cache)
+
+    catalogs = resolve_catalogs(engine_repo, args.catalog)
+    catalog_paths = {p for p, _ in catalogs}
+    sources: List[Tuple[Path, str]] = [(p, "capability_catalog") for p, _ in catalogs]
+    sources.extend(
+        (p, kind)
+        for p, kind in resolve_doc_sources(engine_repo, args.sources, args.source_glob)
+        if p not in catalog_paths
+    )
 
-    sources: List[Tuple[Path, str]] = []
-    sources.append((engine_repo / args.catalog, "capability_catalog"))
-    sources.append((engine_repo / "meta3-causal-kernel" / "SYSTEM_PROMPT.md", "system_prompt"))
-    sources.append((engine_repo / "meta3-graph-core" / "SYSTEM_REPORT.md", "system_report"))
-    sources.append((engine_repo / "meta3-graph-core" / "SYSTEM_PROMPT.md", "graph_core_prompt"))
-
-    concepts: Dict[str, Concept] = {}
+    concepts = ConceptAccumulator()
     catalog_types: Set[str] = set()
 
-    # 1) Capabilities catalog -> capability names and types as concepts
-    cat_path = engine_repo / args.catalog
-    if cat_path.exists():
-        catalog_types = extract_catalog_types(cat_path)
-        for term, desc in extract_from_capabilities_catalog(cat_path):
-            t = normalize_term(term)
-            if not t:
-                continue
-            merge_concept(
-                concepts,
-                t,
-                desc,
-                SourceRef(path=str(Path(args.catalog)), kind="capability_catalog"),
-            )
+    present_catalogs = [(p, label) for p, label in catalogs if p.exists()]
+    # Catalogs are also scanned as text, like any doc (backticked/heading/table terms).
+    present = [(p, kind) for p, kind in sources if p.exists()]
+    tasks: List[Tuple[str, Path]] = [("catalog", p) for p, _ in present_catalogs]
+    tasks += [("markdown", p) for p, _ in present]
+    # Several catalogs are decoded side by side even without --jobs.
+    jobs = max(args.jobs, min(len(present_catalogs), os.cpu_count() or 1))
+    with metrics.stage("sources") as st:
+        extracted = extract_sources(cache, tasks, jobs=jobs)
+        # Under --watch, --rebuild-cache only applies to the first refresh.
+        cache.rebuild = False
+        st.count("sources", len(tasks))
+        st.count("cache_hits", cache.hits)
+        st.count("cache_misses", cache.misses)
+    docs = extracted[len(present_catalogs) :]
+    added = 0
+
+    # 1) Capabilities catalogs -> capability names and types as concepts
+    with metrics.stage("catalog") as st:
+        kept = seen = 0
+        for (_, label), catalog in zip(present_catalogs, extracted):
+            catalog_types.update(catalog["types"])
+            sid = concepts.source(label, "capability_catalog")
+            for term, desc in catalog["entries"]:
+                t = normalize_term(term)
+                if not t:
+                    continue
+                concepts.add(t, desc, sid)
+                kept += 1
+            seen += len(catalog["entries"])
+        st.count("catalogs", len(present_catalogs))
+        st.count("terms_seen", seen)
+        st.count("terms_normalized", kept)
+        st.count("terms_dropped", seen - kept)
+        added += kept
 
     # 2) System docs -> headings + backticked terms
-    for p, kind in sources:
-        if not p.exists():
-            continue
-        txt = read_text(p)
-        # Prefer direct "term — description" patterns when present.
-        for term, desc in extract_inline_definitions(txt):
+    with metrics.stage("docs") as st:
+        kept = seen = 0
+        for (p, kind), doc in zip(present, docs):
+            sid = concepts.source(str(p.relative_to(engine_repo)), kind)
+            seen += sum(len(doc[k]) for k in ("inline_definitions", "table_terms", "headings", "backticked"))
+            # Prefer direct "term — description" patterns when present.
+            for term, desc in doc["inline_definitions"]:
+                t = normalize_term(term)
+                if not t:
+                    continue
+                concepts.add(t, first_sentence(desc), sid)
+                kept += 1
+            # Pull terminology from tables (e.g., semantic capability interface).
+            for term, desc in doc["table_terms"]:
+                t = normalize_term(term)
+                if not t:
+                    continue
+                concepts.add(t, first_sentence(desc), sid)
+                kept += 1
+            for h in doc["headings"]:
+                t = normalize_term(h)
+                if not t:
+                    continue
+                concepts.add(t, "", sid)
+                kept += 1
+            for bt in doc["backticked"]:
+                t = normalize_term(bt)
+                if not t:
+                    continue
+                concepts.add(t, "", sid)
+                kept += 1
+        st.count("documents", len(docs))
+        st.count("terms_seen", seen)
+        st.count("terms_normalized", kept)
+        st.count("terms_dropped", seen - kept)
+        added += kept
+
+    with metrics.stage("merge") as st:
+        # 3) Minimal curation rules: unify some common aliases
+        alias_map = {
+            "Hypergraph": ["State Hypergraph", "hypergraph"],
+            "Receipts": ["receipt", "UTIR", "immutable evidence"],
+            "UTIR": ["receipts", "artifact stream"],
+            "LeJIT": ["JIT Verification", "Just-In-Time verification"],
+        }
+        curation_sid = concepts.source("(curation)", "curation")
+        for term, aliases in alias_map.items():
             t = normalize_term(term)
             if not t:
                 continue
-            merge_concept(concepts, t, first_sentence(desc), SourceRef(path=str(p.relative_to(engine_repo)), kind=kind))
-        # Pull terminology from tables (e.g., semantic capability interface).
-        for term, desc in extract_markdown_table_terms(txt):
-            t = normalize_term(term)
-            if not t:
-                continue
-            merge_concept(concepts, t, first_sentence(desc), SourceRef(path=str(p.relative_to(engine_repo)), kind=kind))
-        for h in extract_markdown_headings(txt):
-            t = normalize_term(h)
-            if not t:
-                continue
-            merge_concept(concepts, t, "", SourceRef(path=str(p.relative_to(engine_repo)), kind=kind))
-        for bt in extract_backticked_terms(txt):
-            t = normalize_term(bt)
-            if not t:
-                continue
-            merge_concept(concepts, t, "", SourceRef(path=str(p.relative_to(engine_repo)), kind=kind))
-
-    # 3) Minimal curation rules: unify some common aliases
-    alias_map = {
-        "Hypergraph": ["State Hypergraph", "hypergraph"],
-        "Receipts": ["receipt", "UTIR", "immutable evidence"],
-        "UTIR": ["receipts", "artifact stream"],
-        "LeJIT": ["JIT Verification", "Just-In-Time verification"],
-    }
-    for term, aliases in alias_map.items():
-        t = normalize_term(term)
-        if not t:
-            continue
-        merge_concept(
-            concepts,
-            t,
-            "",
-            SourceRef(path="(curation)", kind="curation"),
-            aliases=aliases,
-        )
+            concepts.add(t, "", curation_sid, aliases=aliases)
+            added += 1
 
-    # Deterministic order
-    concept_list = sorted(concepts.values(), key=lambda c: c.id)
+        # Deterministic order
+        concept_list = concepts.finalize()
+        st.count("occurrences", added)
+        st.count("concepts", len(concept_list))
+        st.count("merged", added - len(concept_list))
 
-    run_id = f"nomenclature-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+    curation_path = out_dir / args.curation
+    curation_stamp = file_stamp(curation_path)
+    if state is not None and state.rules is not None and state.curation_stamp == curation_stamp:
+        curation, curation_rules = state.curation, state.rules
+        for rule_set in curation_rules:
+            for rule in rule_set.rules:
+                rule.hits = 0
+    else:
+        curation = load_curation(curation_path)
+        try:
+            curation_rules = compile_curation(curation)
+        except ValueError as e:
+            print(f"curation: {e}", file=sys.stderr)
+            return 2
+        if state is not None:
+            state.curation_stamp, state.curation, state.rules = curation_stamp, curation, curation_rules
+
+    input_sha256: Optional[str] = None
+    if args.deterministic:
+        input_sha256 = input_digest(
+            cache,
+            [(kind, str(p.relative_to(engine_repo)), p) for p, kind in sources]
+            + [("curation", str(Path(args.curation)), curation_path)],
+            {
+                "engine_repo": str(engine_repo),
+                # A single catalog keeps the pre-multi-catalog setting (and so the run_id).
+                "catalog": args.catalog[0] if len(args.catalog) == 1 else (args.catalog or DEFAULT_CATALOG),
+                "cluster": args.cluster,
+                "cluster_threshold": args.cluster_threshold,
+                **({"rank": True} if args.rank else {}),
+            },
+        )
+        run_id = f"nomenclature-{input_sha256[:16]}"
+        generated_at = source_date_iso()
+        metrics.info.update(deterministic=True, input_sha256=input_sha256)
+    else:
+        run_id = f"nomenclature-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+        generated_at = utc_now_iso()
 
     out_concepts.parent.mkdir(parents=True, exist_ok=True)
     out_glossary.parent.mkdir(parents=True, exist_ok=True)
     out_graph.parent.mkdir(parents=True, exist_ok=True)
 
-    curation_path = out_dir / args.curation
-    curation = load_curation(curation_path)
-    concept_list = apply_curation(concept_list, curation)
-    if curation:
-        concept_list = ensure_seed_terms(concept_list, curation)
-    concept_list = apply_taxonomy(concept_list, catalog_types)
-
-    payload = {
-        "version": "v1",
-        "run_id": run_id,
-        "generated_at": utc_now_iso(),
-        "engine_repo": str(engine_repo),
-        "curation": {
-            "path": str(Path(args.curation)),
-            "applied": bool(curation),
-        },
-        "inputs": [
-            {"path": str(p.relative_to(engine_repo)) if p.exists() else str(p), "kind": kind, "exists": p.exists()}
-            for (p, kind) in sources
-        ],
-        "concepts": [
+    with metrics.stage("curation") as st:
+        concept_list = apply_curation(concept_list, curation, stats=st.counts, rules=curation_rules)
+        st.count("rules", sum(len(r) for r in curation_rules))
+        st.count("unused_rules", sum(1 for r in curation_rules for rule in r.rules if not rule.hits))
+        if curation:
+            before = len(concept_list)
+            concept_list = ensure_seed_terms(concept_list, curation)
+            st.count("seeded", len(concept_list) - before)
+        concept_list = apply_taxonomy(concept_list, catalog_types)
+        st.count("concepts", len(concept_list))
+
+    # Optional near-duplicate clustering, over the curated set: denied terms never
+    # join a cluster, and curated terms win as representatives.
+    cluster_report: Optional[Dict[str, Any]] = None
+    if args.cluster != "off":
+        with metrics.stage("cluster") as st:
+            curated = set(curated_terms(curation))
+            curated |= {str(t).strip() for t in curation.get("definitions") or {}}
+            concept_list, cluster_report = cluster_concepts(
+                concept_list, args.cluster_threshold, curated, apply=args.cluster == "apply"
+            )
+            if args.cluster == "apply":
+                # A representative can inherit a member's catalog-type definition.
+                concept_list = apply_taxonomy(concept_list, catalog_types)
+            st.count("clusters", cluster_report["clusters"])
+            st.count("merged", cluster_report["merged"])
+
+    node_analytics: Optional[Dict[str, dict]] = None
+    glossary_concepts = concept_list
+    if args.rank:
+        with metrics.stage("rank") as st:
+            node_analytics = rank_concepts(concept_list)
+            # Highest PageRank first; ties keep the usual order.
+            order = {c.id: i for i, c in enumerate(concept_list)}
+            glossary_concepts = sorted(concept_list, key=lambda c: (-node_analytics[c.id]["pagerank"], order[c.id]))
+            st.count("components", len({a["component"] for a in node_analytics.values()}))
+            st.count("clusters", len({a["cluster"] for a in node_analytics.values() if a["cluster"] >= 0}))
+
+    concept_members: List[Tuple[str, Any]] = [
+        ("version", "v1"),
+        ("run_id", run_id),
+        ("generated_at", generated_at),
+        *([("input_sha256", input_sha256)] if input_sha256 else []),
+        ("engine_repo", str(engine_repo)),
+        (
+            "curation",
             {
-                "id": c.id,
-                "term": c.term,
-                "definition": c.definition,
-                "category": getattr(c, "category", "concept"),
-                "aliases": c.aliases,
-                "sources": [asdict(s) for s in c.sources],
-            }
-            for c in concept_list
-        ],
-    }
-    out_concepts.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
-    out_glossary.write_text(render_glossary(concept_list, run_id, str(engine_repo)), encoding="utf-8")
-    out_graph.write_text(json.dumps(build_hypergraph(concept_list, run_id), indent=2) + "\n", encoding="utf-8")
+                "path": str(Path(args.curation)),
+                "applied": bool(curation),
+            },
+        ),
+        *(
+            [("clustering", {k: cluster_report[k] for k in ("mode", "threshold", "clusters", "merged")})]
+            if cluster_report is not None
+            else []
+        ),
+        (
+            "inputs",
+            [
+                {"path": str(p.relative_to(engine_repo)) if p.exists() else str(p), "kind": kind, "exists": p.exists()}
+                for (p, kind) in sources
+            ],
+        ),
+        (
+            "concepts",
+            (
+                {
+                    "id": c.id,
+                    "term": c.term,
+                    "definition": c.definition,
+                    "category": getattr(c, "category", "concept"),
+                    "aliases": c.aliases,
+                    "sources": [asdict(s) for s in c.sources],
+                }
+                for c in concept_list
+            ),
+        ),
+    ]
+    changed: List[Path] = []
+    render = render_item
+    if state is not None:
+        render = state.render
+        render.new_generation()
+
+    def emit(stage: str, path: Path, write: Callable[[Path], None]) -> None:
+        with metrics.stage(stage) as st:
+            # Deterministic and --watch runs render to a sibling temp file and only replace
+            # outputs whose bytes differ, so readers never see a half-written file.
+            if not args.deterministic and state is None:
+                write(path)
+                changed.append(path)
+            else:
+                tmp = path.with_name(f".{path.name}.tmp")
+                write(tmp)
+                if replace_if_changed(tmp, path):
+                    changed.append(path)
+            st.count("changed", int(bool(changed) and changed[-1] == path))
+            st.count("bytes", path.stat().st_size)
+
+    emit("write_concepts", out_concepts, lambda p: write_json_document(p, concept_members, json_format, render))
+    emit(
+        "write_glossary",
+        out_glossary,
+        lambda p: p.write_text(render_glossary(glossary_concepts, run_id, str(engine_repo), generated_at), encoding="utf-8"),
+    )
+    if args.format == "binary":
+        emit("write_graph", out_graph, lambda p: write_bin_document(p, hypergraph_members(concept_list, run_id, generated_at, node_analytics)))
+    else:
+        emit(
+            "write_graph",
+            out_graph,
+            lambda p: write_json_document(p, hypergraph_members(concept_list, run_id, generated_at, node_analytics), json_format, render),
+        )
+    if args.sidecar:
+        emit("write_sidecar", sidecar_path(out_graph), lambda p: build_sidecar(out_graph, p))
+
+    summary_extra = ""
+    if args.db_out:
+        db_path = out_dir / args.db_out
+        with metrics.stage("write_db") as st:
+            db_stats = write_concept_db(db_path, concept_list, {"run_id": run_id, "generated_at": generated_at})
+            for key, n in db_stats.items():
+                st.count(key, n)
+        if db_stats["inserted"] or db_stats["updated"] or db_stats["deleted"]:
+            changed.append(db_path)
+        summary_extra += f" db={db_path} db_changed={db_stats['inserted'] + db_stats['updated'] + db_stats['deleted']}"
+    if cluster_report is not None:
+        report_path = out_dir / args.cluster_report
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(cluster_report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        summary_extra += f" clusters={cluster_report['clusters']} merged={cluster_report['merged']} cluster_report={report_path}"
+    if args.curation_report:
+        report_path = out_dir / args.curation_report
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        allow_rules, deny_rules = curation_rules
+        report = {"version": "v1", "allow": allow_rules.report(), "deny": deny_rules.report()}
+        report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        summary_extra += f" curation_report={report_path}"
 
     print(
         f"nomenclature_ok=1 concepts={len(concept_list)} out_concepts={out_concepts} out_glossary={out_glossary} out_graph={out_graph}"
+        f" cache_hits={cache.hits} cache_misses={cache.misses}{summary_extra}"
     )
+    if args.deterministic:
+        print("changed_files=" + json.dumps([str(p) for p in changed]))
     return 0
 
 
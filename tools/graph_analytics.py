@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Bulk analytics for Meta3 hypergraphs over an array-backed (CSR) projection.
+
+A graph is loaded once into flat arrays: node ids/kinds/labels, the cause -> effect
+projection as (src, dst) pair arrays (one pair per cause x effect of every
+hyperedge; endpoints that are not nodes are dropped) and source memberships
+(hyperedge effects grouped by `data.path`, or by the hyperedge itself when it
+has none). From those:
+
+  degree      in/out pair counts per node
+  pagerank    power iteration over the projection (dangling mass spread uniformly)
+  component   weakly connected component, numbered in order of first node
+  cluster     source co-occurrence cluster: nodes linked by sharing a source,
+              ignoring sources with more than `max_source_size` members (a
+              catalog that yields everything says nothing about relatedness);
+              -1 for nodes that are no source's member
+
+NumPy is used when installed (bincount/argsort kernels; components by
+min-label hooking with pointer jumping). Without it the same results come
+from array-module CSR loops and union-find. .m3hg graphs are read in bulk from
+the string table and CSR endpoint arrays, without decoding records.
+
+Usage:
+  python3 tools/graph_analytics.py GRAPH [--out analytics.json] [--annotate OUT] [--top 20]
+      [--member-kind concept] [--max-source-size 50] [--damping 0.85] [--no-numpy]
+
+GRAPH may be pretty/compact JSON, NDJSON or binary .m3hg. `--annotate` writes
+the graph again with `data.analytics` ({pagerank, degree, component, cluster})
+on every node.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from graph_io import FORMATS, iter_document, write_json_document
+from hypergraph_bin import EDGE_FIELDS, NODE_FIELDS, NONE, SUFFIX, BinaryHypergraph, is_binary, write_bin_document
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+def _sig(x: float) -> float:
+    # Six significant digits: stable across backends and summation order.
+    return float(f"{x:.6g}")
+
+
+@dataclass
+class CSRGraph:
+    """Nodes plus the cause -> effect projection and source memberships as flat arrays."""
+
+    ids: List[Any] = field(default_factory=list)
+    kinds: List[Any] = field(default_factory=list)
+    labels: List[Any] = field(default_factory=list)
+    src: array = field(default_factory=lambda: array("I"))
+    dst: array = field(default_factory=lambda: array("I"))
+    # One entry per (source group, member node). Pair/membership arrays are
+    # array("I") or, from the NumPy .m3hg loader, uint32 ndarrays.
+    mem_group: array = field(default_factory=lambda: array("I"))
+    mem_node: array = field(default_factory=lambda: array("I"))
+    n_groups: int = 0
+    n_edges: int = 0
+
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+
+class _Builder:
+    """Accumulates a CSRGraph from node/edge records (edges may precede nodes)."""
+
+    def __init__(self) -> None:
+        self.g = CSRGraph()
+        self.index: Dict[Any, int] = {}
+        self.groups: Dict[str, int] = {}
+        self.pending: List[dict] = []
+        self.nodes_done = False
+
+    def node(self, node: Any) -> None:
+        if not isinstance(node, dict):
+            node = {}
+        nid = node.get("id")
+        self.index.setdefault(nid, len(self.g.ids))
+        self.g.ids.append(nid)
+        self.g.kinds.append(node.get("kind"))
+        self.g.labels.append(node.get("label"))
+
+    def edge(self, edge: Any) -> None:
+        if not self.nodes_done:
+            self.pending.append(edge)
+        else:
+            self._project(edge)
+
+    def _project(self, edge: Any) -> None:
+        g = self.g
+        i = g.n_edges
+        g.n_edges += 1
+        if not isinstance(edge, dict):
+            return
+        get = self.index.get
+        effects = [b for b in map(get, edge.get("effects") or ()) if b is not None]
+        for a in map(get, edge.get("causes") or ()):
+            if a is not None:
+                for b in effects:
+                    g.src.append(a)
+                    g.dst.append(b)
+        if effects:
+            data = edge.get("data")
+            path = data.get("path") if isinstance(data, dict) else None
+            key = f"path:{path}" if isinstance(path, str) else f"edge:{i}"
+            gid = self.groups.setdefault(key, len(self.groups))
+            for b in effects:
+                g.mem_group.append(gid)
+                g.mem_node.append(b)
+
+    def finish_nodes(self) -> None:
+        if not self.nodes_done:
+            self.nodes_done = True
+            for e in self.pending:
+                self._project(e)
+            self.pending = []
+
+    def done(self) -> CSRGraph:
+        self.finish_nodes()
+        self.g.n_groups = len(self.groups)
+        return self.g
+
+
+def csr_from_records(nodes: Iterable[Any], edges: Iterable[Any]) -> CSRGraph:
+    """CSRGraph from in-memory node and hyperedge records."""
+    b = _Builder()
+    for n in nodes:
+        b.node(n)
+    b.finish_nodes()
+    for e in edges:
+        b.edge(e)
+    return b.done()
+
+
+def _load_json(path: Path) -> CSRGraph:
+    b = _Builder()
+    nodes_seen = False
+    for rec, key, value in iter_document(path):
+        if key == "nodes":
+            nodes_seen = True
+            if rec == "item":
+                if b.nodes_done:
+                    raise ValueError(f"{path}: a second nodes array is not supported")
+                b.node(value)
+        elif rec == "item" and key == "hyperedges":
+            # Hyperedges streamed before `nodes` wait in the builder until the index exists.
+            if nodes_seen:
+                b.finish_nodes()
+            b.edge(value)
+    return b.done()
+
+
+def _load_binary(path: Path) -> CSRGraph:
+    """Bulk .m3hg reader: ids are matched by interned string index, data decoded once per distinct string."""
+    g = CSRGraph()
+    with BinaryHypergraph(path) as bg:
+        strs = bg.string_table()
+        rows = list(bg.node_rows())
+        node_of = array("l", [-1]) * bg.n_strings
+        for i, (sid, kind, label, _, _) in enumerate(rows):
+            g.ids.append(strs[sid] if sid != NONE else None)
+            g.kinds.append(strs[kind] if kind != NONE else None)
+            g.labels.append(strs[label] if label != NONE else None)
+            if sid != NONE and node_of[sid] < 0:
+                node_of[sid] = i
+        cp, ci = bg.cause_ptr.tolist(), bg.cause_idx.tolist()
+        ep, ei = bg.effect_ptr.tolist(), bg.effect_idx.tolist()
+        path_group: Dict[int, int] = {}  # data string -> group id, -1 when it has no path
+        paths: Dict[str, int] = {}
+        n_groups = 0
+        for i, (_, _, data, _, _) in enumerate(bg.edge_rows()):
+            effects = [b for b in (node_of[s] for s in ei[ep[i] : ep[i + 1]]) if b >= 0]
+            if not effects:
+                continue
+            for a in (node_of[s] for s in ci[cp[i] : cp[i + 1]]):
+                if a >= 0:
+                    for b in effects:
+                        g.src.append(a)
+                        g.dst.append(b)
+            gid = path_group.get(data)
+            if gid is None:
+                d = json.loads(strs[data]) if data != NONE else None
+                p = d.get("path") if isinstance(d, dict) else None
+                if isinstance(p, str):
+                    gid = paths.get(p)
+                    if gid is None:
+                        gid = paths[p] = n_groups
+                        n_groups += 1
+                else:
+                    gid = -1
+                path_group[data] = gid
+            if gid < 0:
+                gid = n_groups
+                n_groups += 1
+            for b in effects:
+                g.mem_group.append(gid)
+                g.mem_node.append(b)
+        g.n_groups = n_groups
+        g.n_edges = bg.n_edges
+    return g
+
+
+def _load_binary_np(path: Path) -> CSRGraph:
+    """_load_binary with the cause x effect expansion and group mapping done in NumPy."""
+    g = CSRGraph()
+    with BinaryHypergraph(path) as bg:
+        strs = bg.string_table()
+        nt = np.frombuffer(bg.node_table, dtype=np.uint32).reshape(-1, NODE_FIELDS).astype(np.int64)
+        et = np.frombuffer(bg.edge_table, dtype=np.uint32).reshape(-1, EDGE_FIELDS).astype(np.int64)
+        text = lambda i: strs[i] if i != NONE else None  # noqa: E731
+        g.ids = [text(i) for i in nt[:, 0].tolist()]
+        g.kinds = [text(i) for i in nt[:, 1].tolist()]
+        g.labels = [text(i) for i in nt[:, 2].tolist()]
+        n, n_edges = len(nt), len(et)
+        node_of = np.full(bg.n_strings + 1, -1, dtype=np.int64)
+        sids = np.where(nt[:, 0] == NONE, bg.n_strings, nt[:, 0])
+        node_of[sids[::-1]] = np.arange(n - 1, -1, -1)  # first node with an id wins
+        node_of[bg.n_strings] = -1
+        cp = np.frombuffer(bg.cause_ptr, dtype=np.uint64).astype(np.int64)
+        ep = np.frombuffer(bg.effect_ptr, dtype=np.uint64).astype(np.int64)
+        ci = node_of[np.frombuffer(bg.cause_idx, dtype=np.uint32)]
+        ei = node_of[np.frombuffer(bg.effect_idx, dtype=np.uint32)]
+        nc, ne = np.diff(cp), np.diff(ep)
+
+        # Every cause x effect pair, cause-major within each edge.
+        cnt = nc * ne
+        edge_of = np.repeat(np.arange(n_edges), cnt)
+        k = np.arange(int(cnt.sum())) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        per = ne[edge_of]
+        a = ci[cp[edge_of] + k // per]
+        b = ei[ep[edge_of] + k % per]
+        ok = (a >= 0) & (b >= 0)
+        g.src = a[ok].astype(np.uint32)
+        g.dst = b[ok].astype(np.uint32)
+
+        # Source groups: one per distinct data.path, else one per edge.
+        uniq, inverse = np.unique(et[:, 2], return_inverse=True)
+        paths: Dict[str, int] = {}
+        group_of = np.full(len(uniq), -1, dtype=np.int64)
+        for j, sid in enumerate(uniq.tolist()):
+            d = json.loads(strs[sid]) if sid != NONE else None
+            p = d.get("path") if isinstance(d, dict) else None
+            if isinstance(p, str):
+                group_of[j] = paths.setdefault(p, len(paths))
+        edge_group = group_of[inverse.reshape(-1)]
+        edge_group = np.where(edge_group < 0, len(paths) + np.arange(n_edges), edge_group)
+        eff_edge = np.repeat(np.arange(n_edges), ne)
+        ok = ei >= 0
+        g.mem_group = edge_group[eff_edge[ok]].astype(np.uint32)
+        g.mem_node = ei[ok].astype(np.uint32)
+        g.n_groups = len(paths) + n_edges
+        g.n_edges = n_edges
+    return g
+
+
+def load_csr(path: Path, use_numpy: bool = True) -> CSRGraph:
+    if is_binary(path):
+        return _load_binary_np(path) if use_numpy and HAVE_NUMPY else _load_binary(path)
+    return _load_json(path)
+
+
+# --- kernels -----------------------------------------------------------------
+
+
+def _csr(n: int, keys: Sequence[int], vals: Sequence[int]) -> Tuple[array, array]:
+    """Group vals by key (counting sort): (indptr[n + 1], indices)."""
+    counts = array("Q", bytes(8 * (n + 1)))
+    for k in keys:
+        counts[k + 1] += 1
+    indptr = array("Q", accumulate(counts))
+    fill = array("Q", indptr[:n])
+    out = array("I", bytes(4 * len(vals)))
+    for k, v in zip(keys, vals):
+        out[fill[k]] = v
+        fill[k] += 1
+    return indptr, out
+
+
+def _find(parent: array, x: int) -> int:
+    root = x
+    while parent[root] != root:
+        root = parent[root]
+    while parent[x] != root:
+        parent[x], x = root, parent[x]
+    return root
+
+
+def _roots_py(n: int, src: Sequence[int], dst: Sequence[int]) -> array:
+    """Union-find; every node's root is the smallest index in its component."""
+    parent = array("I", range(n))
+    for a, b in zip(src, dst):
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return array("I", (_find(parent, i) for i in range(n)))
+
+
+def _roots_np(n: int, src, dst):
+    """Min-label hooking with pointer jumping; same roots as _roots_py."""
+    lab = np.arange(n, dtype=np.int64)
+    if not len(src):
+        return lab
+    while True:
+        ls, ld = lab[src], lab[dst]
+        m = np.minimum(ls, ld)
+        diff = ls != ld
+        if not diff.any():
+            return lab
+        np.minimum.at(lab, ls[diff], m[diff])
+        np.minimum.at(lab, ld[diff], m[diff])
+        while True:
+            nxt = lab[lab]
+            if np.array_equal(nxt, lab):
+                break
+            lab = nxt
+
+
+def _number(roots: Sequence[int], mask: Optional[Sequence[bool]] = None) -> Tuple[List[int], List[int]]:
+    """Dense ids in order of first node (roots are minimal indices) and their sizes; masked-out nodes get -1."""
+    ids: Dict[int, int] = {}
+    sizes: List[int] = []
+    out: List[int] = []
+    for i, r in enumerate(roots):
+        if mask is not None and not mask[i]:
+            out.append(-1)
+            continue
+        c = ids.get(r)
+        if c is None:
+            c = ids[r] = len(sizes)
+            sizes.append(0)
+        sizes[c] += 1
+        out.append(c)
+    return out, sizes
+
+
+def _number_np(roots, mask=None) -> Tuple[List[int], List[int]]:
+    sel = roots if mask is None else roots[mask]
+    uniq, inverse, counts = np.unique(sel, return_inverse=True, return_counts=True)
+    if mask is None:
+        return inverse.tolist(), counts.tolist()
+    out = np.full(len(roots), -1, dtype=np.int64)
+    out[mask] = inverse
+    return out.tolist(), counts.tolist()
+
+
+@dataclass
+class Analytics:
+    backend: str
+    indeg: List[int]
+    outdeg: List[int]
+    pagerank: List[float]
+    iterations: int
+    component: List[int]
+    component_sizes: List[int]
+    cluster: List[int]
+    cluster_sizes: List[int]
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def _pagerank_py(n: int, src: array, dst: array, outdeg: Sequence[int], damping: float, max_iter: int, tol: float) -> Tuple[List[float], int]:
+    indptr, sources = _csr(n, dst, src)  # in-adjacency
+    rank = [1.0 / n] * n
+    inv = [1.0 / d if d else 0.0 for d in outdeg]
+    dangling = [i for i in range(n) if not outdeg[i]]
+    it = 0
+    for it in range(1, max_iter + 1):
+        contrib = [r * w for r, w in zip(rank, inv)]
+        base = (1.0 - damping) / n + damping * sum(rank[i] for i in dangling) / n
+        get = contrib.__getitem__
+        new = [base + damping * sum(map(get, sources[indptr[v] : indptr[v + 1]])) for v in range(n)]
+        err = sum(abs(a - b) for a, b in zip(new, rank))
+        rank = new
+        if err < tol:
+            break
+    return rank, it
+
+
+def _pagerank_np(n: int, src, dst, outdeg, damping: float, max_iter: int, tol: float):
+    rank = np.full(n, 1.0 / n)
+    inv = np.divide(1.0, outdeg, out=np.zeros(n), where=outdeg > 0)
+    dangling = outdeg == 0
+    it = 0
+    for it in range(1, max_iter + 1):
+        base = (1.0 - damping) / n + damping * rank[dangling].sum() / n
+        new = base + damping * np.bincount(dst, weights=(rank * inv)[src], minlength=n)
+        err = np.abs(new - rank).sum()
+        rank = new
+        if err < tol:
+            break
+    return rank, it
+
+
+def analyze(
+    g: CSRGraph,
+    damping: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1e-9,
+    member_kind: Optional[str] = None,
+    max_source_size: int = 50,
+    use_numpy: bool = True,
+) -> Analytics:
+    """Degree, PageRank, components and source co-occurrence clusters for g."""
+    n = g.n
+    t0 = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    def mark(name: str) -> None:
+        nonlocal t0
+        now = time.perf_counter()
+        timings[name] = round(now - t0, 6)
+        t0 = now
+
+    # Memberships that count: right member kind, group not a hub.
+    keep_kind = None if member_kind is None else [k == member_kind for k in g.kinds]
+    if n == 0:
+        return Analytics("none", [], [], [], 0, [], [], [], [], timings)
+
+    if use_numpy and HAVE_NUMPY:
+        src = np.frombuffer(g.src, dtype=np.uint32).astype(np.int64)
+        dst = np.frombuffer(g.dst, dtype=np.uint32).astype(np.int64)
+        outdeg = np.bincount(src, minlength=n)
+        indeg = np.bincount(dst, minlength=n)
+        mark("degree")
+        rank, iters = _pagerank_np(n, src, dst, outdeg, damping, max_iter, tol)
+        mark("pagerank")
+        component, comp_sizes = _number_np(_roots_np(n, src, dst))
+        mark("components")
+        mg = np.frombuffer(g.mem_group, dtype=np.uint32).astype(np.int64)
+        mn = np.frombuffer(g.mem_node, dtype=np.uint32).astype(np.int64)
+        if keep_kind is not None:
+            sel = np.asarray(keep_kind, dtype=bool)[mn]
+            mg, mn = mg[sel], mn[sel]
+        member = np.zeros(n, dtype=bool)
+        member[mn] = True
+        # Drop duplicate memberships before sizing groups, then hubs.
+        pairs = np.unique(mg * n + mn)
+        mg, mn = pairs // n, pairs % n
+        sizes = np.bincount(mg, minlength=g.n_groups)
+        small = sizes[mg] <= max_source_size
+        # Groups become virtual nodes n + gid; roots stay real nodes (smaller indices).
+        roots = _roots_np(n + g.n_groups, mn[small], mg[small] + n)[:n]
+        cluster, cluster_sizes = _number_np(roots, member)
+        mark("clusters")
+        return Analytics(
+            "numpy", indeg.tolist(), outdeg.tolist(), rank.tolist(), iters,
+            component, comp_sizes, cluster, cluster_sizes, timings,
+        )
+
+    outdeg_a = array("I", bytes(4 * n))
+    indeg_a = array("I", bytes(4 * n))
+    for a in g.src:
+        outdeg_a[a] += 1
+    for b in g.dst:
+        indeg_a[b] += 1
+    mark("degree")
+    rank_l, iters = _pagerank_py(n, g.src, g.dst, outdeg_a, damping, max_iter, tol)
+    mark("pagerank")
+    component, comp_sizes = _number(_roots_py(n, g.src, g.dst))
+    mark("components")
+    seen = set()
+    group_members: List[List[int]] = [[] for _ in range(g.n_groups)]
+    member = [False] * n
+    for gid, v in zip(g.mem_group, g.mem_node):
+        if keep_kind is not None and not keep_kind[v]:
+            continue
+        member[v] = True
+        if (gid, v) not in seen:
+            seen.add((gid, v))
+            group_members[gid].append(v)
+    del seen
+    parent = array("I", range(n))
+    for ms in group_members:
+        if 1 < len(ms) <= max_source_size:
+            head = _find(parent, ms[0])
+            for v in ms[1:]:
+                r = _find(parent, v)
+                if r != head:
+                    parent[max(r, head)] = min(r, head)
+                    head = min(r, head)
+    cluster, cluster_sizes = _number([_find(parent, i) for i in range(n)], member)
+    mark("clusters")
+    return Analytics(
+        "python", indeg_a.tolist(), outdeg_a.tolist(), rank_l, iters,
+        component, comp_sizes, cluster, cluster_sizes, timings,
+    )
+
+
+def node_analytics(a: Analytics, i: int) -> Dict[str, Any]:
+    """The `data.analytics` block for node i."""
+    return {
+        "pagerank": _sig(a.pagerank[i]),
+        "degree": a.indeg[i] + a.outdeg[i],
+        "component": a.component[i],
+        "cluster": a.cluster[i],
+    }
+
+
+def analytics_by_id(g: CSRGraph, a: Analytics) -> Dict[Any, Dict[str, Any]]:
+    return {nid: node_analytics(a, i) for i, nid in enumerate(g.ids)}
+
+
+def report(g: CSRGraph, a: Analytics, top: int) -> Dict[str, Any]:
+    order = sorted(range(g.n), key=lambda i: (-a.pagerank[i], i))[:top]
+    cluster_order = sorted(range(len(a.cluster_sizes)), key=lambda c: (-a.cluster_sizes[c], c))[:top]
+    members: Dict[int, List[Any]] = {c: [] for c in cluster_order}
+    for i, c in enumerate(a.cluster):
+        if c in members and len(members[c]) < 10:
+            members[c].append(g.ids[i])
+    return {
+        "version": "graph_analytics_v1",
+        "backend": a.backend,
+        "nodes": g.n,
+        "hyperedges": g.n_edges,
+        "pairs": len(g.src),
+        "pagerank_iterations": a.iterations,
+        "components": {"count": len(a.component_sizes), "largest": max(a.component_sizes, default=0)},
+        "clusters": {"count": len(a.cluster_sizes), "largest": max(a.cluster_sizes, default=0)},
+        "top_pagerank": [
+            {"id": g.ids[i], "kind": g.kinds[i], "label": g.labels[i], **node_analytics(a, i)} for i in order
+        ],
+        "top_clusters": [{"cluster": c, "size": a.cluster_sizes[c], "sample": members[c]} for c in cluster_order],
+        "timings": a.timings,
+    }
+
+
+def annotated_members(path: Path, by_id: Dict[Any, Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """Re-stream a graph's members with data.analytics set on every node."""
+    records = iter_document(path)
+    pending: List[Tuple[str, str, Any]] = []
+
+    def annotate(node: Any) -> Any:
+        if isinstance(node, dict) and node.get("id") in by_id:
+            data = node.get("data")
+            node["data"] = {**(data if isinstance(data, dict) else {}), "analytics": by_id[node["id"]]}
+        return node
+
+    def items(key: str) -> Iterator[Any]:
+        for rec in records:
+            if rec[0] == "item" and rec[1] == key:
+                yield annotate(rec[2]) if key == "nodes" else rec[2]
+            else:
+                pending.append(rec)
+                return
+
+    while True:
+        rec = pending.pop() if pending else next(records, None)
+        if rec is None:
+            return
+        kind, key, value = rec
+        if kind == "value":
+            yield key, [annotate(v) for v in value] if key == "nodes" and isinstance(value, list) else value
+        elif kind == "array":
+            yield key, items(key)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="PageRank, components and source co-occurrence clusters for a hypergraph")
+    ap.add_argument("graph")
+    ap.add_argument("--out", default="", help="Write the JSON report here (default: stdout summary only)")
+    ap.add_argument("--annotate", default="", help="Write the graph with data.analytics on every node (.m3hg suffix -> binary)")
+    ap.add_argument("--format", choices=FORMATS, default="pretty", help="JSON layout for --annotate")
+    ap.add_argument("--top", type=int, default=20, help="Nodes / clusters listed in the report")
+    ap.add_argument("--damping", type=float, default=0.85)
+    ap.add_argument("--iterations", type=int, default=100, help="PageRank iteration cap")
+    ap.add_argument("--tol", type=float, default=1e-9, help="PageRank L1 convergence threshold")
+    ap.add_argument("--member-kind", default=None, help="Only cluster nodes of this kind (e.g. concept)")
+    ap.add_argument("--max-source-size", type=int, default=50, help="Ignore sources with more members when clustering")
+    ap.add_argument("--no-numpy", action="store_true", help="Use the pure-Python kernels even if NumPy is installed")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    path = Path(args.graph)
+    g = load_csr(path, use_numpy=not args.no_numpy)
+    t_load = time.perf_counter() - t0
+    a = analyze(
+        g, args.damping, args.iterations, args.tol, args.member_kind, args.max_source_size, use_numpy=not args.no_numpy
+    )
+    a.timings = {"load": round(t_load, 6), **a.timings}
+    doc = report(g, a, args.top)
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(doc, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if args.annotate:
+        dst = Path(args.annotate)
+        members = annotated_members(path, analytics_by_id(g, a))
+        if dst.suffix == SUFFIX:
+            write_bin_document(dst, members)
+        else:
+            write_json_document(dst, members, args.format)
+    print(
+        f"graph_analytics_ok=1 backend={a.backend} nodes={g.n} pairs={len(g.src)} iterations={a.iterations}"
+        f" components={doc['components']['count']} clusters={doc['clusters']['count']}"
+        f" duration_ms={int((time.perf_counter() - t0) * 1000)}" + (f" out={args.out}" if args.out else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
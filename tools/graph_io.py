@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON document I/O for Meta3 artifacts (hypergraphs, concepts.json).
+
+A document is an ordered list of top-level members. Members whose value is an
+iterator (e.g. a generator of nodes) are streamed to the file one item at a time,
+so the full array never exists in memory; every other value is written whole.
+
+Formats:
+  - pretty  : byte-identical to `json.dumps(doc, indent=2) + "\\n"`
+  - compact : `json.dumps(doc, separators=(",", ":")) + "\\n"`
+  - ndjson  : one JSON object per line:
+                {"key": K, "value": V}   top-level member
+                {"key": K, "array": true} start of a streamed array
+                {"key": K, "item": X}    one element of that array
+"""
+
+from __future__ import annotations
+
+import filecmp
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Tuple
+
+
+FORMATS = ("pretty", "compact", "ndjson")
+
+Member = Tuple[str, Any]
+
+
+def _is_stream(value: Any) -> bool:
+    return hasattr(value, "__next__")
+
+
+def render_item(value: Any, fmt: str) -> str:
+    """Serialize one array element the way JsonDocumentWriter.item would (for item_raw)."""
+    if fmt == "pretty":
+        return json.dumps(value, indent=2).replace("\n", "\n    ")
+    return json.dumps(value, separators=(",", ":"))
+
+
+class RenderMemo:
+    """
+    render_item that remembers pretty renderings by the item's compact JSON.
+
+    Pretty output goes through json's pure-Python indent encoder while the compact
+    key comes from the C encoder, so re-writing a document whose items mostly did
+    not change (e.g. --watch refreshes) skips most of the encoding. Call
+    new_generation() before each write; entries unused for a whole generation drop.
+    """
+
+    def __init__(self) -> None:
+        self._memo: Dict[str, str] = {}
+        self._prev: Dict[str, str] = {}
+
+    def new_generation(self) -> None:
+        self._prev, self._memo = self._memo, {}
+
+    def __call__(self, value: Any, fmt: str) -> str:
+        if fmt != "pretty":
+            return render_item(value, fmt)
+        key = json.dumps(value, separators=(",", ":"))
+        text = self._memo.get(key)
+        if text is None:
+            text = self._prev.pop(key, None) or render_item(value, fmt)
+            self._memo[key] = text
+        return text
+
+
+class JsonDocumentWriter:
+    """Incremental writer for one top-level JSON object in any of FORMATS."""
+
+    def __init__(self, fp, fmt: str = "pretty", render: Callable[[Any, str], str] = render_item) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format: {fmt}")
+        self.fp = fp
+        self.fmt = fmt
+        self.render = render
+        self._members = 0
+        self._items = 0
+        self._array_key = ""
+        if fmt != "ndjson":
+            self.fp.write("{")
+
+    def _dumps(self, value: Any, indent_prefix: str) -> str:
+        if self.fmt == "pretty":
+            return json.dumps(value, indent=2).replace("\n", "\n" + indent_prefix)
+        return json.dumps(value, separators=(",", ":"))
+
+    def _open_member(self, key: str) -> None:
+        if self.fmt == "pretty":
+            self.fp.write(("," if self._members else "") + "\n  " + json.dumps(key) + ": ")
+        else:
+            self.fp.write(("," if self._members else "") + json.dumps(key) + ":")
+        self._members += 1
+
+    def member(self, key: str, value: Any) -> None:
+        if self.fmt == "ndjson":
+            self.fp.write(json.dumps({"key": key, "value": value}, separators=(",", ":")) + "\n")
+            return
+        self._open_member(key)
+        self.fp.write(self._dumps(value, "  "))
+
+    def begin_array(self, key: str) -> None:
+        self._array_key = key
+        self._items = 0
+        if self.fmt == "ndjson":
+            self.fp.write(json.dumps({"key": key, "array": True}, separators=(",", ":")) + "\n")
+            return
+        self._open_member(key)
+        self.fp.write("[")
+
+    def item(self, value: Any) -> None:
+        self.item_raw(self.render(value, self.fmt))
+
+    def item_raw(self, text: str) -> None:
+        """Write one array element already serialized in this writer's format."""
+        if self.fmt == "ndjson":
+            self.fp.write('{"key":' + json.dumps(self._array_key) + ',"item":' + text + "}\n")
+        elif self.fmt == "pretty":
+            self.fp.write(("," if self._items else "") + "\n    " + text)
+        else:
+            self.fp.write(("," if self._items else "") + text)
+        self._items += 1
+
+    def end_array(self) -> None:
+        if self.fmt == "pretty" and self._items:
+            self.fp.write("\n  ")
+        if self.fmt != "ndjson":
+            self.fp.write("]")
+
+    def close(self) -> None:
+        if self.fmt == "pretty":
+            self.fp.write("\n}\n" if self._members else "}\n")
+        elif self.fmt == "compact":
+            self.fp.write("}\n")
+
+
+def write_json_document(
+    path: Path, members: Iterable[Member], fmt: str = "pretty", render: Callable[[Any, str], str] = render_item
+) -> None:
+    """Write members to path; iterator-valued members are streamed item by item."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fp:
+        w = JsonDocumentWriter(fp, fmt, render)
+        for key, value in members:
+            if _is_stream(value):
+                w.begin_array(key)
+                for item in value:
+                    w.item(item)
+                w.end_array()
+            else:
+                w.member(key, value)
+        w.close()
+
+
+def replace_if_changed(tmp: Path, path: Path) -> bool:
+    """Move tmp over path unless path already holds the same bytes; returns whether path changed."""
+    if path.exists() and filecmp.cmp(tmp, path, shallow=False):
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+# First record of an NDJSON document, as JsonDocumentWriter renders it.
+_NDJSON_HEAD = re.compile(r'\{"key":\s*"(?:[^"\\]|\\.)*",\s*"(?:value|array|item)":')
+_NDJSON_PROBE = 4096
+
+
+def is_ndjson(path: Path) -> bool:
+    """Sniff a bounded prefix (a compact document is one long line; never read it whole)."""
+    with path.open("r", encoding="utf-8") as fp:
+        head = fp.read(_NDJSON_PROBE)
+    # An empty file is an NDJSON document without records.
+    return not head or _NDJSON_HEAD.match(head) is not None
+
+
+def iter_ndjson_document(path: Path) -> Iterator[Tuple[str, str, Any]]:
+    """Yield ("value", key, value) and ("item", key, element) records in file order."""
+    with path.open("r", encoding="utf-8") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            key = rec["key"]
+            if "item" in rec:
+                yield "item", key, rec["item"]
+            elif "value" in rec:
+                yield "value", key, rec["value"]
+            else:
+                yield "array", key, None
+
+
+def load_json_document(path: Path) -> Dict[str, Any]:
+    """Load a document written in any of FORMATS (or a binary .m3hg hypergraph) into a plain dict."""
+    from hypergraph_bin import BinaryHypergraph, is_binary
+
+    if is_binary(path):
+        with BinaryHypergraph(path) as g:
+            return g.to_document()
+    if not is_ndjson(path):
+        return json.loads(path.read_text(encoding="utf-8"))
+    doc: Dict[str, Any] = {}
+    for rec, key, value in iter_ndjson_document(path):
+        if rec == "value":
+            doc[key] = value
+        elif rec == "array":
+            doc[key] = []
+        else:
+            arr: List[Any] = doc.setdefault(key, [])
+            arr.append(value)
+    return doc
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class _JsonStream:
+    """Pull-style tokenizer over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, fp, chunk_size: int = 1 << 20) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> None:
+        data = self.fp.read(size)
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos : self.pos + 1]
+            self._fill(self.chunk_size)
+
+    def take(self, expected: str) -> str:
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"malformed JSON: expected one of {expected!r}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        size = self.chunk_size
+        while True:
+            self.peek()
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = -1
+            # A number ending at (or just before an exponent/fraction at) the buffer
+            # edge may be truncated; only accept it once more input proves otherwise.
+            if end >= 0 and (
+                self.eof
+                or (end < len(self.buf) and not (isinstance(value, (int, float)) and self.buf[end] in _NUMBER_CHARS))
+            ):
+                self.pos = end
+                return value
+            self._fill(size)
+            size *= 2
+
+    def array_items(self) -> Iterator[Any]:
+        """Decode the elements of the array starting here, consuming its closing bracket."""
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        ws, scan = _WS.match, _DECODER.scan_once
+        while True:
+            # Fast path: decode straight out of the buffer while each element and its
+            # separator lie inside it. An element at the buffer edge (or a bare number,
+            # which may be truncated there) goes through value(), which refills.
+            buf, pos = self.buf, self.pos
+            n = len(buf)
+            while True:
+                start = ws(buf, pos).end()
+                try:
+                    value, end = scan(buf, start)
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                sep = ws(buf, end).end()
+                if sep >= n or isinstance(value, (int, float)):
+                    break
+                pos = sep + 1
+                ch = buf[sep]
+                if ch == ",":
+                    yield value
+                elif ch == "]":
+                    self.pos = pos
+                    yield value
+                    return
+                else:
+                    raise ValueError(f"malformed JSON: expected one of ',]', got {ch!r}")
+            self.pos = start
+            yield self.value()
+            if self.take(",]") == "]":
+                return
+
+
+def iter_json_document(path: Path, stream_keys: Collection[str]) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Incrementally parse a pretty/compact JSON object, yielding the same records as
+    iter_ndjson_document. Arrays under stream_keys are decoded element by element,
+    so only one element is resident at a time.
+    """
+    with path.open("r", encoding="utf-8") as fp:
+        js = _JsonStream(fp)
+        js.take("{")
+        if js.peek() == "}":
+            return
+        while True:
+            key = js.value()
+            js.take(":")
+            if key in stream_keys and js.peek() == "[":
+                yield "array", key, None
+                for item in js.array_items():
+                    yield "item", key, item
+            else:
+                yield "value", key, js.value()
+            if js.take(",}") == "}":
+                return
+
+
+def iter_json_array(path: Path, key: str) -> Iterator[Any]:
+    """
+    Stream the elements of a top-level JSON array, or of the array under `key` in a
+    top-level object (other members are decoded and dropped); only one element is
+    resident at a time. Yields nothing if `key` is missing or not an array.
+    """
+    with path.open("r", encoding="utf-8") as fp:
+        js = _JsonStream(fp)
+        if js.peek() == "[":
+            yield from js.array_items()
+            return
+        js.take("{")
+        if js.peek() == "}":
+            return
+        while True:
+            name = js.value()
+            js.take(":")
+            if name == key and js.peek() == "[":
+                yield from js.array_items()
+                return
+            js.value()
+            if js.take(",}") == "}":
+                return
+
+
+def iter_document(path: Path, stream_keys: Collection[str] = ("nodes", "hyperedges")) -> Iterator[Tuple[str, str, Any]]:
+    """Record stream for a document in any of FORMATS or .m3hg (see iter_ndjson_document)."""
+    from hypergraph_bin import is_binary, iter_bin_document
+
+    if is_binary(path):
+        return iter_bin_document(path)
+    if is_ndjson(path):
+        return iter_ndjson_document(path)
+    return iter_json_document(path, stream_keys)
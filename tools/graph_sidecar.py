@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Precomputed viewer analytics for a Meta3 hypergraph (`<graph>.sidecar.bin`).
+
+The HTML viewers' build() scans every hyperedge at startup to project cause x
+effect pairs and derive indeg/outdeg/degree, the merge-node count, maxTurn and
+the initial force layout. This stage does the same scan once, offline, with the
+viewer's exact formulas, and stores the results as typed arrays the page can
+wrap without parsing:
+
+  magic "M3SC", u32 version, u32 header length, header JSON (space-padded so the
+  first array starts 8-byte aligned), then little-endian arrays at the offsets
+  listed in header["arrays"] ({"dtype": "u32"|"f32", "offset", "length"}).
+
+Node arrays (length = nodes, in file order):
+  indeg, outdeg, degree  u32   pair counts, as in the viewer's Maps
+  turn                   f32   data.turn, else data.index, else 0
+  x, y                   f32   layout seed: ang = i*0.37 + t*0.8, rad = 40 + t*70 + (i%7)*18
+  mass, r                f32   nodeMass() and the clamped draw radius
+  component              u32   weakly connected component (ids in order of first node)
+Pair arrays (length = pairs, one per drawable cause -> effect projection):
+  src, dst               u32   node indices (last node with the id, like the viewer's simIndex)
+  edge                   u32   hyperedge index
+  weight                 f32   edgeWeight()
+Component arrays: component_size u32.
+
+The header also carries merge_nodes, max_turn and the graph's byte size and
+sha256 so a viewer can fall back to its own scan when the sidecar is stale.
+
+Usage:
+  python3 tools/graph_sidecar.py GRAPH [--out PATH]
+  python3 tools/graph_sidecar.py GRAPH --print     (header only, as JSON)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from graph_io import iter_document
+from hypergraph_bin import NONE, BinaryHypergraph, is_binary
+
+MAGIC = b"M3SC"
+VERSION = 1
+_PREAMBLE = struct.Struct("<4sII")
+
+# Mirrors BASE_MASS in the viewer template.
+BASE_MASS = {
+    "run": 120,
+    "goal": 100,
+    "turn": 70,
+    "thought": 60,
+    "tool_call": 55,
+    "tool_result": 45,
+    "artifact_path": 80,
+    "other": 40,
+}
+
+_NODE_ARRAYS = (
+    ("indeg", "u32"),
+    ("outdeg", "u32"),
+    ("degree", "u32"),
+    ("turn", "f32"),
+    ("x", "f32"),
+    ("y", "f32"),
+    ("mass", "f32"),
+    ("r", "f32"),
+    ("component", "u32"),
+)
+_PAIR_ARRAYS = (("src", "u32"), ("dst", "u32"), ("edge", "u32"), ("weight", "f32"))
+_CODES = {"u32": "I", "f32": "f"}
+
+
+def sidecar_path(graph: Path) -> Path:
+    """graphs/x.hypergraph.json -> graphs/x.hypergraph.sidecar.bin (same for .ndjson/.m3hg)."""
+    return graph.with_suffix(".sidecar.bin")
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def node_turn(node: dict) -> float:
+    d = node.get("data")
+    if isinstance(d, dict):
+        if _is_number(d.get("turn")):
+            return d["turn"]
+        if _is_number(d.get("index")):
+            return d["index"]
+    return 0
+
+
+def _js_length(value: Any) -> int:
+    # String(text).length counts UTF-16 code units.
+    if isinstance(value, str):
+        return len(value.encode("utf-16-le")) // 2
+    return len(json.dumps(value)) if value is not None else 0
+
+
+def _text_boost(node: dict) -> float:
+    d = node.get("data")
+    text = (d.get("full_text") or d.get("text") or "") if isinstance(d, dict) else ""
+    return math.log1p(_js_length(text) / 120) * 35
+
+
+def edge_weight(edge: dict) -> float:
+    w = 1.0
+    kind = edge.get("kind")
+    if kind == "tool_effect":
+        w += 0.8
+    if kind == "invocation":
+        w += 0.5
+    if kind == "turn_exec":
+        w += 0.3
+    d = edge.get("data")
+    if isinstance(d, dict) and d.get("allowed") is False:
+        w += 1.4
+    effects = edge.get("effects")
+    w += min(max(len(effects) * 0.15 if isinstance(effects, list) else 0, 0), 1.2)
+    return w
+
+
+@dataclass
+class GraphSidecar:
+    nodes: int = 0
+    hyperedges: int = 0
+    merge_nodes: int = 0
+    max_turn: float = 0
+    graph: Dict[str, Any] = field(default_factory=dict)
+    arrays: Dict[str, array] = field(default_factory=dict)
+
+    @property
+    def pairs(self) -> int:
+        return len(self.arrays["src"])
+
+    @property
+    def components(self) -> int:
+        return len(self.arrays["component_size"])
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "version": "sidecar_v1",
+            "graph": self.graph,
+            "nodes": self.nodes,
+            "hyperedges": self.hyperedges,
+            "pairs": self.pairs,
+            "components": self.components,
+            "merge_nodes": self.merge_nodes,
+            "max_turn": self.max_turn,
+        }
+
+
+def _find(parent: array, x: int) -> int:
+    root = x
+    while parent[root] != root:
+        root = parent[root]
+    while parent[x] != root:
+        parent[x], x = root, parent[x]
+    return root
+
+
+@dataclass
+class _Scan:
+    """Per-node inputs and projected pairs collected from one pass over a graph."""
+
+    surviving: array = field(default_factory=lambda: array("I"))  # last node index with the same id
+    base_mass: array = field(default_factory=lambda: array("d"))  # BASE_MASS[kind] + text boost
+    turns: array = field(default_factory=lambda: array("d"))
+    src: array = field(default_factory=lambda: array("I"))
+    dst: array = field(default_factory=lambda: array("I"))
+    edge: array = field(default_factory=lambda: array("I"))
+    weight: array = field(default_factory=lambda: array("f"))
+    n_edges: int = 0
+
+    def add_node(self, node: dict) -> None:
+        self.base_mass.append(BASE_MASS.get(node.get("kind") or "other", BASE_MASS["other"]) + _text_boost(node))
+        self.turns.append(node_turn(node))
+
+    def add_pair(self, a: int, b: int, i: int, w: float) -> None:
+        self.src.append(a)
+        self.dst.append(b)
+        self.edge.append(i)
+        self.weight.append(w)
+
+
+def _scan_json(path: Path) -> _Scan:
+    """Stream a JSON/NDJSON graph; hyperedges seen before `nodes` are buffered."""
+    scan = _Scan()
+    index: Dict[str, int] = {}
+    ids: List[Any] = []
+    pending: List[Tuple[int, dict]] = []
+    nodes_seen = False
+
+    def project(i: int, he: dict) -> None:
+        effects = [index.get(t) if isinstance(t, str) else None for t in he.get("effects") or []]
+        w = edge_weight(he)
+        for c in he.get("causes") or []:
+            a = index.get(c) if isinstance(c, str) else None
+            if a is None:
+                continue
+            for b in effects:
+                if b is not None:
+                    scan.add_pair(a, b, i, w)
+
+    for rec, key, value in iter_document(path):
+        if key == "nodes":
+            nodes_seen = True
+            if rec == "item" and isinstance(value, dict):
+                nid = value.get("id")
+                if isinstance(nid, str):
+                    # Later duplicates win, like `new Map(nodes.map(...))`.
+                    index[nid] = len(ids)
+                ids.append(nid)
+                scan.add_node(value)
+        elif rec == "item" and key == "hyperedges":
+            if isinstance(value, dict):
+                if nodes_seen:
+                    project(scan.n_edges, value)
+                else:
+                    pending.append((scan.n_edges, value))
+            scan.n_edges += 1
+    for i, he in pending:
+        project(i, he)
+    scan.surviving = array("I", (index.get(nid, i) if isinstance(nid, str) else i for i, nid in enumerate(ids)))
+    return scan
+
+
+def _scan_binary(path: Path) -> _Scan:
+    """Same as _scan_json for .m3hg, matching ids by interned string index; edge payloads stay encoded."""
+    scan = _Scan()
+    with BinaryHypergraph(path) as g:
+        index: Dict[int, int] = {}
+        for i in range(g.n_nodes):
+            sid = g.node_id(i)
+            if sid != NONE:
+                index[sid] = i
+            scan.add_node(g.node(i))
+        scan.surviving = array("I", (index.get(g.node_id(i), i) for i in range(g.n_nodes)))
+        # Weight depends on kind, data.allowed and the effect count; kind/data strings are interned.
+        base_w: Dict[Tuple[int, int], float] = {}
+        cp, ci, ep, ei = g.cause_ptr, g.cause_idx, g.effect_ptr, g.effect_idx
+        for i in range(g.n_edges):
+            refs = g.edge_refs(i)
+            w = base_w.get(refs)
+            if w is None:
+                kind, data = refs
+                w = base_w[refs] = edge_weight(
+                    {
+                        "kind": None if kind == NONE else g.string(kind),
+                        "data": None if data == NONE else json.loads(g.string(data)),
+                    }
+                )
+            e0, e1 = ep[i], ep[i + 1]
+            w += min((e1 - e0) * 0.15, 1.2)
+            effects = [index.get(t) for t in ei[e0:e1]]
+            for c in ci[cp[i] : cp[i + 1]]:
+                a = index.get(c)
+                if a is None:
+                    continue
+                for b in effects:
+                    if b is not None:
+                        scan.add_pair(a, b, i, w)
+        scan.n_edges = g.n_edges
+    return scan
+
+
+def compute_sidecar(path: Path) -> GraphSidecar:
+    scan = _scan_binary(path) if is_binary(path) else _scan_json(path)
+    n = len(scan.turns)
+    surviving, src, dst = scan.surviving, scan.src, scan.dst
+    indeg = array("I", bytes(4 * n))
+    outdeg = array("I", bytes(4 * n))
+    parent = array("I", range(n))
+    for a, b in zip(src, dst):
+        outdeg[a] += 1
+        indeg[b] += 1
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    out = {name: array(_CODES[dtype]) for name, dtype in _NODE_ARRAYS}
+    comp_ids: Dict[int, int] = {}
+    comp_size = array("I")
+    merge_nodes = 0
+    max_turn: float = 0
+    for i in range(n):
+        s = surviving[i]
+        deg = indeg[s] + outdeg[s]
+        t = scan.turns[i]
+        mass = scan.base_mass[i] + math.log1p(deg) * 18
+        ang = i * 0.37 + t * 0.8
+        rad = 40 + t * 70 + (i % 7) * 18
+        cid = comp_ids.setdefault(_find(parent, i), len(comp_ids))
+        if cid == len(comp_size):
+            comp_size.append(0)
+        comp_size[cid] += 1
+        out["indeg"].append(indeg[s])
+        out["outdeg"].append(outdeg[s])
+        out["degree"].append(deg)
+        out["turn"].append(t)
+        out["x"].append(math.cos(ang) * rad)
+        out["y"].append(math.sin(ang) * rad)
+        out["mass"].append(mass)
+        out["r"].append(min(max(2.5 + math.sqrt(mass) * 0.35, 3), 22))
+        out["component"].append(cid)
+        merge_nodes += indeg[s] >= 2
+        max_turn = max(max_turn, t)
+    out.update(src=src, dst=dst, edge=scan.edge, weight=scan.weight, component_size=comp_size)
+    return GraphSidecar(
+        nodes=n,
+        hyperedges=scan.n_edges,
+        merge_nodes=merge_nodes,
+        max_turn=max_turn,
+        graph={"name": path.name, "bytes": path.stat().st_size, "sha256": _file_sha256(path)},
+        arrays=out,
+    )
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _array_layout() -> Iterator[Tuple[str, str]]:
+    yield from _NODE_ARRAYS
+    yield from _PAIR_ARRAYS
+    yield ("component_size", "u32")
+
+
+def write_sidecar(sc: GraphSidecar, path: Path) -> None:
+    header = sc.header()
+    header["arrays"] = {}
+    # Offsets depend on the header length, so lay out with a provisional header and
+    # grow the padding budget until the encoded header fits.
+    budget = 0
+    while True:
+        offset = _align(_PREAMBLE.size + budget)
+        for name, dtype in _array_layout():
+            a = sc.arrays[name]
+            header["arrays"][name] = {"dtype": dtype, "offset": offset, "length": len(a)}
+            offset = _align(offset + len(a) * a.itemsize)
+        text = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        if len(text) <= budget:
+            break
+        budget = len(text)
+    first = header["arrays"]["indeg"]["offset"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, first - _PREAMBLE.size))
+        f.write(text.ljust(first - _PREAMBLE.size, b" "))
+        for name, _ in _array_layout():
+            a = sc.arrays[name]
+            f.seek(header["arrays"][name]["offset"])
+            if sys.byteorder != "little":
+                a = array(a.typecode, a)
+                a.byteswap()
+            a.tofile(f)
+        f.truncate(offset)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def read_sidecar(path: Path) -> Tuple[Dict[str, Any], Dict[str, array]]:
+    """(header, arrays) from a sidecar file."""
+    data = path.read_bytes()
+    magic, version, hlen = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a v{VERSION} graph sidecar: {path}")
+    header = json.loads(data[_PREAMBLE.size : _PREAMBLE.size + hlen])
+    arrays: Dict[str, array] = {}
+    for name, spec in header["arrays"].items():
+        a = array(_CODES[spec["dtype"]])
+        a.frombytes(data[spec["offset"] : spec["offset"] + spec["length"] * a.itemsize])
+        if sys.byteorder != "little":
+            a.byteswap()
+        arrays[name] = a
+    return header, arrays
+
+
+def build_sidecar(graph: Path, out: Optional[Path] = None) -> GraphSidecar:
+    sc = compute_sidecar(graph)
+    write_sidecar(sc, out or sidecar_path(graph))
+    return sc
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Precompute viewer analytics for a hypergraph")
+    ap.add_argument("graph")
+    ap.add_argument("--out", default="", help="Sidecar path (default: GRAPH with suffix .sidecar.bin)")
+    ap.add_argument("--print", action="store_true", help="Print the header of an existing sidecar instead")
+    args = ap.parse_args()
+
+    graph = Path(args.graph)
+    out = Path(args.out) if args.out else sidecar_path(graph)
+    if args.print:
+        header, _ = read_sidecar(out)
+        print(json.dumps(header, indent=2))
+        return 0
+    sc = build_sidecar(graph, out)
+    print(
+        f"sidecar_ok=1 nodes={sc.nodes} hyperedges={sc.hyperedges} pairs={sc.pairs} components={sc.components}"
+        f" merge_nodes={sc.merge_nodes} max_turn={sc.max_turn} bytes={out.stat().st_size} out={out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
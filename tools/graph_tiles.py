@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Split a Meta3 hypergraph into lazily loadable tiles for the viewers.
+
+Nodes are partitioned into shards by one of:
+  kind       one shard per node kind
+  subgraph   one shard per `SUBGRAPH:` node of a merge_hypergraphs.py output (a node
+             belongs to the SUBGRAPH node that precedes it in `nodes`); the run and
+             SUBGRAPH nodes themselves form the "root" shard
+  community  label propagation over the cause -> effect projection; communities
+             smaller than --min-community are packed into shared "misc" shards
+Shards above --max-shard-nodes are split into chunks in node order.
+
+A hyperedge whose endpoints all fall in one shard is stored in that shard. Edges
+spanning shards go to the boundary index instead: every shard they touch gets a
+copy in its boundary file, together with the shard of each remote endpoint, so a
+viewer that loads a shard can fetch its neighbours on demand.
+
+Layout under --out:
+  manifest.json          graph id/metadata/counts, shards [{id, file, boundary,
+                         nodes, hyperedges, boundary_edges, kinds}], roots (shard
+                         indices to load for first paint), links [[a, b, edges]]
+  shards/NNNN.json       Meta3 hypergraph document (id, nodes, hyperedges, metadata)
+  boundary/NNNN.json     {"shard", "hyperedges": [...], "remote": {node id: shard}}
+
+Roots are the shards holding `run`/`subgraph` nodes, else the shard with the most
+boundary links, so first paint needs the manifest plus a bounded amount of data.
+
+Usage:
+  python3 tools/graph_tiles.py GRAPH --out DIR [--by kind|subgraph|community]
+      [--max-shard-nodes 5000] [--min-community 16] [--format compact|pretty|ndjson]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from graph_io import FORMATS, JsonDocumentWriter, iter_document, render_item
+
+ROOT_KINDS = ("run", "subgraph")
+MODES = ("kind", "subgraph", "community")
+
+
+def _endpoints(edge: dict) -> Iterator[str]:
+    for key in ("causes", "effects"):
+        for n in edge.get(key) or []:
+            if isinstance(n, str):
+                yield n
+
+
+def label_propagation(n: int, src: array, dst: array, iterations: int = 10) -> List[int]:
+    """
+    Community label per node: each node repeatedly adopts the most common label among
+    its neighbours (ties -> smallest label), visiting nodes in index order, so the
+    result is deterministic. Stops early once a sweep changes nothing.
+    """
+    # Undirected CSR adjacency.
+    deg = array("I", bytes(4 * (n + 1)))
+    for a, b in zip(src, dst):
+        if a != b:
+            deg[a + 1] += 1
+            deg[b + 1] += 1
+    for i in range(n):
+        deg[i + 1] += deg[i]
+    adj = array("I", bytes(4 * deg[n]))
+    fill = array("I", deg[:n])
+    for a, b in zip(src, dst):
+        if a != b:
+            adj[fill[a]] = b
+            fill[a] += 1
+            adj[fill[b]] = a
+            fill[b] += 1
+    del fill
+
+    labels = list(range(n))
+    for _ in range(iterations):
+        changed = 0
+        for i in range(n):
+            lo, hi = deg[i], deg[i + 1]
+            if lo == hi:
+                continue
+            counts = Counter(labels[j] for j in adj[lo:hi])
+            best = max(counts.values())
+            label = min(l for l, c in counts.items() if c == best)
+            if label != labels[i]:
+                labels[i] = label
+                changed += 1
+        if not changed:
+            break
+    return labels
+
+
+class Partition:
+    """Node index -> shard index, plus shard ids and the node ids' index."""
+
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.kinds: List[str] = []
+        self.shard_of = array("I")
+        self.shard_ids: List[str] = []
+
+    def chunk(self, groups: Dict[str, List[int]], max_nodes: int) -> None:
+        """Assign shards from ordered {group id: node indices}, splitting groups above max_nodes."""
+        self.shard_of = array("I", bytes(4 * len(self.kinds)))
+        for gid, members in groups.items():
+            step = max_nodes if max_nodes > 0 else max(1, len(members))
+            parts = range(0, len(members), step)
+            for k in parts:
+                sid = len(self.shard_ids)
+                self.shard_ids.append(gid if len(parts) == 1 else f"{gid}#{k // step}")
+                for i in members[k : k + step]:
+                    self.shard_of[i] = sid
+
+
+def partition(
+    path: Path,
+    by: str,
+    max_nodes: int = 5000,
+    min_community: int = 16,
+    iterations: int = 10,
+) -> Partition:
+    part = Partition()
+    groups: Dict[str, List[int]] = defaultdict(list)
+    src, dst = array("I"), array("I")
+    pending: List[dict] = []
+    subgraph = "root"
+
+    def project(edge: dict) -> None:
+        causes = [part.index.get(c) for c in edge.get("causes") or [] if isinstance(c, str)]
+        for t in edge.get("effects") or []:
+            b = part.index.get(t) if isinstance(t, str) else None
+            if b is None:
+                continue
+            for a in causes:
+                if a is not None:
+                    src.append(a)
+                    dst.append(b)
+
+    for rec, key, value in iter_document(path):
+        if rec == "item" and key == "nodes":
+            i = len(part.kinds)
+            node = value if isinstance(value, dict) else {}
+            nid, kind = node.get("id"), str(node.get("kind") or "other")
+            if isinstance(nid, str):
+                part.index.setdefault(nid, i)
+            part.kinds.append(kind)
+            if by == "kind":
+                groups[f"kind:{kind}"].append(i)
+            elif by == "subgraph":
+                if isinstance(nid, str) and nid.startswith("SUBGRAPH:"):
+                    subgraph = f"subgraph:{nid[len('SUBGRAPH:'):]}"
+                    groups["root"].append(i)
+                elif kind in ROOT_KINDS:
+                    if kind == "subgraph":
+                        subgraph = f"subgraph:{nid}"
+                    groups["root"].append(i)
+                else:
+                    groups[subgraph].append(i)
+        elif rec == "item" and key == "hyperedges" and isinstance(value, dict) and by == "community":
+            if part.kinds:
+                project(value)
+            else:
+                pending.append(value)
+    for edge in pending:
+        project(edge)
+
+    if by == "community":
+        labels = label_propagation(len(part.kinds), src, dst, iterations)
+        del src, dst
+        members: Dict[int, List[int]] = defaultdict(list)
+        for i, label in enumerate(labels):
+            members[label].append(i)
+        misc: List[int] = []
+        for label in sorted(members, key=lambda l: (-len(members[l]), l)):
+            if len(members[label]) >= min_community:
+                groups[f"community:{len(groups)}"] = members[label]
+            else:
+                misc.extend(members[label])
+        if misc:
+            groups["community:misc"] = sorted(misc)
+    elif by == "subgraph" and "root" in groups:
+        groups = {"root": groups.pop("root"), **groups}
+    part.chunk(groups, max_nodes)
+    return part
+
+
+def _shard_file(i: int, fmt: str) -> str:
+    return f"{i:04d}.{'ndjson' if fmt == 'ndjson' else 'json'}"
+
+
+def export_tiles(
+    path: Path,
+    out: Path,
+    by: str = "subgraph",
+    max_nodes: int = 5000,
+    min_community: int = 16,
+    iterations: int = 10,
+    fmt: str = "compact",
+) -> Dict[str, Any]:
+    """Partition `path` and write manifest, shards and boundary files under `out`; returns the manifest."""
+    part = partition(path, by, max_nodes, min_community, iterations)
+    n_shards = len(part.shard_ids)
+    nodes: List[List[str]] = [[] for _ in range(n_shards)]
+    edges: List[List[str]] = [[] for _ in range(n_shards)]
+    boundary: List[List[str]] = [[] for _ in range(n_shards)]
+    remote: List[Dict[str, int]] = [{} for _ in range(n_shards)]
+    kinds: List[Counter] = [Counter() for _ in range(n_shards)]
+    links: Counter = Counter()
+    orphans: List[str] = []
+    graph_id: Any = None
+    metadata: Any = None
+    n_nodes = n_edges = n_boundary = 0
+
+    for rec, key, value in iter_document(path):
+        if rec == "item" and key == "nodes":
+            s = part.shard_of[n_nodes]
+            nodes[s].append(render_item(value, fmt))
+            kinds[s][part.kinds[n_nodes]] += 1
+            n_nodes += 1
+        elif rec == "item" and key == "hyperedges":
+            n_edges += 1
+            text = render_item(value, fmt)
+            ends = {}
+            if isinstance(value, dict):
+                for nid in _endpoints(value):
+                    i = part.index.get(nid)
+                    if i is not None:
+                        ends[nid] = part.shard_of[i]
+            touched = sorted(set(ends.values()))
+            if not touched:
+                orphans.append(text)
+            elif len(touched) == 1:
+                edges[touched[0]].append(text)
+            else:
+                n_boundary += 1
+                for s in touched:
+                    boundary[s].append(text)
+                    remote[s].update((nid, t) for nid, t in ends.items() if t != s)
+                for k, a in enumerate(touched):
+                    for b in touched[k + 1 :]:
+                        links[(a, b)] += 1
+        elif rec == "value" and key == "id":
+            graph_id = value
+        elif rec == "value" and key == "metadata":
+            metadata = value
+
+    root_shards = sorted({part.shard_of[i] for i, k in enumerate(part.kinds) if k in ROOT_KINDS})
+    if not root_shards and n_shards:
+        hub: Counter = Counter()
+        for (a, b), c in links.items():
+            hub[a] += c
+            hub[b] += c
+        root_shards = [min(range(n_shards), key=lambda s: (-hub[s], s))]
+    if orphans:
+        if not root_shards:
+            # No nodes at all: the orphans get an edges-only root shard.
+            part.shard_ids.append("root")
+            for per_shard in (nodes, edges, boundary):
+                per_shard.append([])
+            remote.append({})
+            kinds.append(Counter())
+            root_shards = [n_shards]
+            n_shards += 1
+        # Edges with no known endpoint still need a home; keep them with the first root.
+        edges[root_shards[0]].extend(orphans)
+
+    for sub in ("shards", "boundary"):
+        d = out / sub
+        d.mkdir(parents=True, exist_ok=True)
+        for old in d.glob("[0-9]*.*json"):
+            old.unlink()
+    shards = []
+    for s, sid in enumerate(part.shard_ids):
+        name = _shard_file(s, fmt)
+        with (out / "shards" / name).open("w", encoding="utf-8") as fp:
+            w = JsonDocumentWriter(fp, fmt)
+            w.member("id", f"{graph_id}/{sid}" if graph_id is not None else sid)
+            for section, items in (("nodes", nodes[s]), ("hyperedges", edges[s])):
+                w.begin_array(section)
+                for text in items:
+                    w.item_raw(text)
+                w.end_array()
+            w.member("metadata", {"shard": sid, "index": s, "manifest": "../manifest.json"})
+            w.close()
+        with (out / "boundary" / name).open("w", encoding="utf-8") as fp:
+            w = JsonDocumentWriter(fp, fmt)
+            w.member("shard", sid)
+            w.begin_array("hyperedges")
+            for text in boundary[s]:
+                w.item_raw(text)
+            w.end_array()
+            w.member("remote", remote[s])
+            w.close()
+        shards.append(
+            {
+                "id": sid,
+                "file": f"shards/{name}",
+                "boundary": f"boundary/{name}",
+                "nodes": len(nodes[s]),
+                "hyperedges": len(edges[s]),
+                "boundary_edges": len(boundary[s]),
+                "kinds": dict(sorted(kinds[s].items())),
+            }
+        )
+        nodes[s] = edges[s] = boundary[s] = []
+
+    manifest = {
+        "version": "tiles_v1",
+        "id": graph_id,
+        "source": path.name,
+        "by": by,
+        "format": fmt,
+        "nodes": n_nodes,
+        "hyperedges": n_edges,
+        "boundary_edges": n_boundary,
+        "roots": root_shards,
+        "shards": shards,
+        "links": [[a, b, c] for (a, b), c in sorted(links.items())],
+        "metadata": metadata,
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return manifest
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Split a hypergraph into lazily loadable viewer tiles")
+    ap.add_argument("graph")
+    ap.add_argument("--out", required=True, help="Tile directory (manifest.json, shards/, boundary/)")
+    ap.add_argument("--by", choices=MODES, default="subgraph")
+    ap.add_argument("--max-shard-nodes", type=int, default=5000, help="Split larger shards into chunks (0 = never)")
+    ap.add_argument("--min-community", type=int, default=16, help="Smaller communities share 'misc' shards")
+    ap.add_argument("--iterations", type=int, default=10, help="Label propagation sweeps for --by community")
+    ap.add_argument("--format", choices=FORMATS, default="compact", help="Layout of shard and boundary files")
+    args = ap.parse_args()
+
+    out = Path(args.out)
+    m = export_tiles(
+        Path(args.graph), out, args.by, args.max_shard_nodes, args.min_community, args.iterations, args.format
+    )
+    largest = max((s["nodes"] for s in m["shards"]), default=0)
+    print(
+        f"tiles_ok=1 by={args.by} shards={len(m['shards'])} roots={len(m['roots'])} largest_shard={largest}"
+        f" boundary_edges={m['boundary_edges']} out={out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Compact binary container for Meta3 hypergraphs (`.m3hg`).
+
+Layout (little-endian, sections 8-byte aligned):
+  header    magic "M3HG", format version, counts, section offsets, and string
+            indices for the graph id, metadata JSON and extra top-level JSON
+  strings   u64 offsets[n_strings + 1] + one UTF-8 blob; every id, kind, label and
+            JSON-encoded `data` value is interned once
+  nodes     u32 x 5 per node: id, kind, label, data, extra
+  edges     u32 x 5 per edge: id, kind, data, extra, flags
+  causes    CSR: u64 ptr[n_edges + 1] + u32 string index per cause
+  effects   CSR: u64 ptr[n_edges + 1] + u32 string index per effect
+
+NONE (0xFFFFFFFF) marks an absent field. `extra` holds any non-schema keys as a
+JSON object. Edge `flags` bits 0/1 mark `causes`/`effects` that are absent or not
+a list of string ids (the latter travel in `extra`); such edges decode without
+an empty list in their place, so JSON -> .m3hg -> JSON keeps every member.
+
+Files are opened with mmap and decoded lazily, so loading is O(1) and only the
+records actually touched are materialized.
+
+Usage:
+  python3 tools/hypergraph_bin.py convert IN OUT [--format pretty|compact|ndjson]
+  python3 tools/hypergraph_bin.py info PATH
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from graph_io import FORMATS, iter_document, write_json_document
+
+MAGIC = b"M3HG"
+VERSION = 1
+NONE = 0xFFFFFFFF
+SUFFIX = ".m3hg"
+
+# magic, version, n_strings, n_nodes, n_edges, n_causes, n_effects,
+# 9 section offsets, graph id, metadata, extra
+_HEADER = struct.Struct("<4sIQQQQQ9QIII")
+_NODE_FIELDS = NODE_FIELDS = 5
+_EDGE_FIELDS = EDGE_FIELDS = 5
+NO_CAUSES = 1
+NO_EFFECTS = 2
+_NODE_KEYS = ("id", "kind", "label", "data")
+_EDGE_KEYS = ("id", "kind", "causes", "effects", "data")
+
+
+def is_binary(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+class BinaryHypergraphWriter:
+    """
+    Builds an .m3hg file. Mirrors JsonDocumentWriter (member / begin_array / item /
+    item_raw / end_array / close) so streaming producers can target either format;
+    records are kept as packed arrays and written out on close().
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._index: Dict[str, int] = {}
+        self._offsets = array("Q", [0])
+        self._blob = bytearray()
+        self._nodes = array("I")
+        self._edges = array("I")
+        self._cause_ptr = array("Q", [0])
+        self._cause_idx = array("I")
+        self._effect_ptr = array("Q", [0])
+        self._effect_idx = array("I")
+        self._graph_id = NONE
+        self._metadata = NONE
+        self._extra: Dict[str, Any] = {}
+        self._section = ""
+
+    def intern(self, s: str) -> int:
+        i = self._index.get(s)
+        if i is None:
+            i = self._index[s] = len(self._offsets) - 1
+            self._blob += s.encode("utf-8")
+            self._offsets.append(len(self._blob))
+        return i
+
+    def _str_or_none(self, value: Any) -> int:
+        return self.intern(value) if isinstance(value, str) else NONE
+
+    def _json_or_none(self, obj: dict, key: str) -> int:
+        return self.intern(_dumps(obj[key])) if key in obj else NONE
+
+    def _endpoints(self, values: List[str], idx: array, ptr: array) -> None:
+        idx.extend(self.intern(v) for v in values)
+        ptr.append(len(idx))
+
+    def member(self, key: str, value: Any) -> None:
+        if key == "id" and isinstance(value, str):
+            self._graph_id = self.intern(value)
+        elif key == "metadata":
+            self._metadata = self.intern(_dumps(value))
+        elif key in ("nodes", "hyperedges") and isinstance(value, list):
+            self.begin_array(key)
+            for v in value:
+                self.item(v)
+            self.end_array()
+        else:
+            self._extra[key] = value
+
+    def begin_array(self, key: str) -> None:
+        if key not in ("nodes", "hyperedges"):
+            raise ValueError(f"binary hypergraphs only stream nodes/hyperedges, not {key!r}")
+        self._section = key
+
+    def item(self, value: dict) -> None:
+        if self._section == "nodes":
+            extra = {k: v for k, v in value.items() if k not in _NODE_KEYS or (k != "data" and not isinstance(v, str))}
+            self._nodes.extend(
+                (
+                    self._str_or_none(value.get("id")),
+                    self._str_or_none(value.get("kind")),
+                    self._str_or_none(value.get("label")),
+                    self._json_or_none(value, "data"),
+                    self.intern(_dumps(extra)) if extra else NONE,
+                )
+            )
+        else:
+            flags = 0
+            for key, bit in (("causes", NO_CAUSES), ("effects", NO_EFFECTS)):
+                ends = value.get(key)
+                if not isinstance(ends, list) or not all(isinstance(v, str) for v in ends):
+                    flags |= bit
+            extra = {
+                k: v
+                for k, v in value.items()
+                if k not in _EDGE_KEYS
+                or (k in ("id", "kind") and not isinstance(v, str))
+                or (k == "causes" and flags & NO_CAUSES)
+                or (k == "effects" and flags & NO_EFFECTS)
+            }
+            self._edges.extend(
+                (
+                    self._str_or_none(value.get("id")),
+                    self._str_or_none(value.get("kind")),
+                    self._json_or_none(value, "data"),
+                    self.intern(_dumps(extra)) if extra else NONE,
+                    flags,
+                )
+            )
+            self._endpoints([] if flags & NO_CAUSES else value["causes"], self._cause_idx, self._cause_ptr)
+            self._endpoints([] if flags & NO_EFFECTS else value["effects"], self._effect_idx, self._effect_ptr)
+
+    def item_raw(self, text: str) -> None:
+        self.item(json.loads(text))
+
+    def end_array(self) -> None:
+        self._section = ""
+
+    def close(self) -> None:
+        extra = self.intern(_dumps(self._extra)) if self._extra else NONE
+        sections = [
+            self._offsets,
+            bytes(self._blob),
+            self._nodes,
+            self._edges,
+            self._cause_ptr,
+            self._cause_idx,
+            self._effect_ptr,
+            self._effect_idx,
+        ]
+        if sys.byteorder != "little":
+            for s in sections:
+                if isinstance(s, array):
+                    s.byteswap()
+        offsets: List[int] = []
+        pos = _HEADER.size
+        for s in sections:
+            pos = (pos + 7) & ~7
+            offsets.append(pos)
+            pos += len(s) * (s.itemsize if isinstance(s, array) else 1)
+        offsets.append(pos)  # end of file
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(self._offsets) - 1,
+            len(self._nodes) // _NODE_FIELDS,
+            len(self._edges) // _EDGE_FIELDS,
+            len(self._cause_idx),
+            len(self._effect_idx),
+            *offsets,
+            self._graph_id,
+            self._metadata,
+            extra,
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("wb") as f:
+            f.write(header)
+            for off, s in zip(offsets, sections):
+                f.write(b"\0" * (off - f.tell()))
+                f.write(s if isinstance(s, bytes) else s.tobytes())
+
+
+def write_bin_document(path: Path, members: Iterable[Tuple[str, Any]]) -> None:
+    """Binary counterpart of graph_io.write_json_document for hypergraph members."""
+    w = BinaryHypergraphWriter(path)
+    for key, value in members:
+        if hasattr(value, "__next__"):
+            w.begin_array(key)
+            for item in value:
+                w.item(item)
+            w.end_array()
+        else:
+            w.member(key, value)
+    w.close()
+
+
+class BinaryHypergraph:
+    """Read-only, mmap-backed view of an .m3hg file. Records decode on access."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = _HEADER.unpack_from(self._mm, 0)
+        magic, version = fields[0], fields[1]
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"not an M3HG v{VERSION} file: {path}")
+        self.n_strings, self.n_nodes, self.n_edges, n_causes, n_effects = fields[2:7]
+        off = fields[7:16]
+        self._graph_id, self._metadata, self._extra = fields[16:19]
+        self._str_offsets = self._view(off[0], self.n_strings + 1, "Q")
+        self._blob_start = off[1]
+        self._nodes = self._view(off[2], self.n_nodes * _NODE_FIELDS, "I")
+        self._edges = self._view(off[3], self.n_edges * _EDGE_FIELDS, "I")
+        self.cause_ptr = self._view(off[4], self.n_edges + 1, "Q")
+        self.cause_idx = self._view(off[5], n_causes, "I")
+        self.effect_ptr = self._view(off[6], self.n_edges + 1, "Q")
+        self.effect_idx = self._view(off[7], n_effects, "I")
+
+    def _view(self, offset: int, count: int, code: str):
+        size = struct.calcsize(code)
+        raw = memoryview(self._mm)[offset : offset + count * size]
+        if sys.byteorder == "little":
+            return raw.cast(code)
+        arr = array(code, raw.tobytes())
+        arr.byteswap()
+        raw.release()
+        return arr
+
+    def close(self) -> None:
+        for name in ("_str_offsets", "_nodes", "_edges", "cause_ptr", "cause_idx", "effect_ptr", "effect_idx"):
+            v = self.__dict__.pop(name, None)
+            if isinstance(v, memoryview):
+                v.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinaryHypergraph":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def string(self, i: int) -> str:
+        start = self._blob_start + self._str_offsets[i]
+        end = self._blob_start + self._str_offsets[i + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def _json(self, i: int) -> Any:
+        return json.loads(self.string(i))
+
+    @property
+    def graph_id(self) -> Optional[str]:
+        return None if self._graph_id == NONE else self.string(self._graph_id)
+
+    @property
+    def has_metadata(self) -> bool:
+        return self._metadata != NONE
+
+    @property
+    def metadata(self) -> Any:
+        return None if self._metadata == NONE else self._json(self._metadata)
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        return {} if self._extra == NONE else self._json(self._extra)
+
+    def node_id(self, i: int) -> int:
+        """String index of node i's id (NONE if the id is absent)."""
+        return self._nodes[i * _NODE_FIELDS]
+
+    def _opt_string(self, i: int) -> Optional[str]:
+        return None if i == NONE else self.string(i)
+
+    def node_header(self, i: int) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """(id, kind, label) of node i without decoding its data."""
+        base = i * _NODE_FIELDS
+        return self._opt_string(self._nodes[base]), self._opt_string(self._nodes[base + 1]), self._opt_string(self._nodes[base + 2])
+
+    def edge_kind(self, i: int) -> Optional[str]:
+        return self._opt_string(self._edges[i * _EDGE_FIELDS + 1])
+
+    def edge_refs(self, i: int) -> Tuple[int, int]:
+        """String indices of edge i's kind and JSON-encoded data (NONE if absent)."""
+        base = i * _EDGE_FIELDS
+        return self._edges[base + 1], self._edges[base + 2]
+
+    def string_table(self) -> List[str]:
+        """Every interned string, decoded in one pass (for whole-graph scans)."""
+        offs = self._str_offsets.tolist()
+        blob = self._mm[self._blob_start : self._blob_start + offs[-1]]
+        return [blob[offs[i] : offs[i + 1]].decode("utf-8") for i in range(self.n_strings)]
+
+    @property
+    def node_table(self):
+        """Flat u32 buffer of NODE_FIELDS string indices per node (see node_rows)."""
+        return self._nodes
+
+    @property
+    def edge_table(self):
+        """Flat u32 buffer of EDGE_FIELDS values per edge (see edge_rows)."""
+        return self._edges
+
+    def node_rows(self) -> Iterator[Tuple[int, ...]]:
+        """(id, kind, label, data, extra) string indices per node, NONE if absent."""
+        rows = self._nodes.tolist()
+        return (tuple(rows[b : b + _NODE_FIELDS]) for b in range(0, len(rows), _NODE_FIELDS))
+
+    def edge_rows(self) -> Iterator[Tuple[int, ...]]:
+        """(id, kind, data, extra, flags) per edge: string indices (NONE if absent), then flags."""
+        rows = self._edges.tolist()
+        return (tuple(rows[b : b + _EDGE_FIELDS]) for b in range(0, len(rows), _EDGE_FIELDS))
+
+    def node(self, i: int) -> Dict[str, Any]:
+        base = i * _NODE_FIELDS
+        nid, kind, label, data, extra = self._nodes[base : base + _NODE_FIELDS]
+        out: Dict[str, Any] = {}
+        if nid != NONE:
+            out["id"] = self.string(nid)
+        if kind != NONE:
+            out["kind"] = self.string(kind)
+        if label != NONE:
+            out["label"] = self.string(label)
+        if data != NONE:
+            out["data"] = self._json(data)
+        if extra != NONE:
+            out.update(self._json(extra))
+        return out
+
+    def causes(self, i: int) -> List[str]:
+        return [self.string(s) for s in self.cause_idx[self.cause_ptr[i] : self.cause_ptr[i + 1]]]
+
+    def effects(self, i: int) -> List[str]:
+        return [self.string(s) for s in self.effect_idx[self.effect_ptr[i] : self.effect_ptr[i + 1]]]
+
+    def edge(self, i: int) -> Dict[str, Any]:
+        base = i * _EDGE_FIELDS
+        eid, kind, data, extra, flags = self._edges[base : base + _EDGE_FIELDS]
+        out: Dict[str, Any] = {}
+        if eid != NONE:
+            out["id"] = self.string(eid)
+        if kind != NONE:
+            out["kind"] = self.string(kind)
+        if not flags & NO_CAUSES:
+            out["causes"] = self.causes(i)
+        if not flags & NO_EFFECTS:
+            out["effects"] = self.effects(i)
+        if data != NONE:
+            out["data"] = self._json(data)
+        if extra != NONE:
+            out.update(self._json(extra))
+        return out
+
+    def iter_nodes(self) -> Iterator[Dict[str, Any]]:
+        return (self.node(i) for i in range(self.n_nodes))
+
+    def iter_edges(self) -> Iterator[Dict[str, Any]]:
+        return (self.edge(i) for i in range(self.n_edges))
+
+    def to_document(self) -> Dict[str, Any]:
+        doc: Dict[str, Any] = {}
+        if self.graph_id is not None:
+            doc["id"] = self.graph_id
+        doc["nodes"] = list(self.iter_nodes())
+        doc["hyperedges"] = list(self.iter_edges())
+        if self._metadata != NONE:
+            doc["metadata"] = self.metadata
+        doc.update(self.extra)
+        return doc
+
+
+def iter_bin_document(path: Path) -> Iterator[Tuple[str, str, Any]]:
+    """Record stream matching graph_io.iter_document, read from an .m3hg file."""
+    with BinaryHypergraph(path) as g:
+        if g.graph_id is not None:
+            yield "value", "id", g.graph_id
+        yield "array", "nodes", None
+        for n in g.iter_nodes():
+            yield "item", "nodes", n
+        yield "array", "hyperedges", None
+        for e in g.iter_edges():
+            yield "item", "hyperedges", e
+        if g.has_metadata:
+            yield "value", "metadata", g.metadata
+        for k, v in g.extra.items():
+            yield "value", k, v
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Convert between JSON and binary (.m3hg) hypergraphs")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="JSON/NDJSON -> .m3hg, or .m3hg -> JSON (by OUT suffix)")
+    conv.add_argument("input")
+    conv.add_argument("output")
+    conv.add_argument("--format", choices=FORMATS, default="pretty", help="JSON layout when writing JSON")
+    info = sub.add_parser("info", help="Print counts for an .m3hg file")
+    info.add_argument("path")
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        with BinaryHypergraph(Path(args.path)) as g:
+            print(
+                f"m3hg_ok=1 id={g.graph_id} nodes={g.n_nodes} hyperedges={g.n_edges} "
+                f"strings={g.n_strings} causes={len(g.cause_idx)} effects={len(g.effect_idx)}"
+            )
+        return 0
+
+    src, dst = Path(args.input), Path(args.output)
+
+    def members() -> Iterator[Tuple[str, Any]]:
+        # Re-group the flat record stream into (key, value | item stream) members.
+        records = iter_document(src)
+        pending: List[Tuple[str, str, Any]] = []
+
+        def items(key: str) -> Iterator[Any]:
+            for rec in records:
+                if rec[0] == "item" and rec[1] == key:
+                    yield rec[2]
+                else:
+                    pending.append(rec)
+                    return
+
+        while True:
+            rec = pending.pop() if pending else next(records, None)
+            if rec is None:
+                return
+            kind, key, value = rec
+            if kind == "value":
+                yield key, value
+            elif kind == "array":
+                yield key, items(key)
+
+    if dst.suffix == SUFFIX:
+        write_bin_document(dst, members())
+    else:
+        write_json_document(dst, members(), args.format)
+    print(f"convert_ok=1 in={src} out={dst} bytes={dst.stat().st_size}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
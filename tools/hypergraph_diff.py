@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Structural diff and patch between two versions of a Meta3 hypergraph.
+
+Nodes are matched by id. Hyperedges are matched by content key (kind, causes,
+effects) — duplicates pair up in order — because edge ids such as
+`edge:derived_from:{i}` are positional and shift whenever an earlier edge is
+inserted. One streaming pass over each graph with hash lookups gives the
+removed / added / changed sets in O(nodes + edges). Only hashes of the base
+records are kept: a (vanishingly unlikely) key collision pairs two edges, which
+then differ in content and are reported as changed with the full target record,
+so patches stay correct. When both graphs are .m3hg the hashes are taken over
+the undecoded string table and only added/changed records are decoded.
+
+Patch (`hypergraph_patch_v1`, compact JSON):
+  base, target   sha256 / bytes / counts of both files; target also records its format
+  members        target top-level keys in order; `values` holds every non-array member
+  nodes, hyperedges
+    removed      base ids no longer present
+    added        new records, in target order
+    changed      [target position, record] for matched records whose content differs
+    order        target order as runs over the base: [base index, count] copies
+                 matched records, a bare count takes the next `added` records
+  hyperedges.ids / renamed
+                 how unchanged matched edges get their target id: "kept" (base id)
+                 or "positional" (base id with its trailing `:N` replaced by the
+                 target position), plus [position, id] exceptions
+
+Applying a patch streams the base once and writes the target in its recorded
+format; when the base is the one the patch was made from, the output is
+byte-identical to the target (checked against target.sha256).
+
+Usage:
+  python3 tools/hypergraph_diff.py diff BASE TARGET --out PATCH
+  python3 tools/hypergraph_diff.py apply BASE PATCH --out GRAPH [--format pretty|compact|ndjson|binary] [--force]
+  python3 tools/hypergraph_diff.py stat PATCH
+
+BASE/TARGET may be pretty/compact JSON, NDJSON or binary .m3hg.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from graph_io import FORMATS, is_ndjson, iter_document, write_json_document
+from hypergraph_bin import NONE, BinaryHypergraph, is_binary, write_bin_document
+
+PATCH_VERSION = "hypergraph_patch_v1"
+SECTIONS = ("nodes", "hyperedges")
+PATCH_FORMATS = FORMATS + ("binary",)
+
+Run = Union[List[int], int]
+
+_KEY_FIELDS = frozenset(("id", "kind", "causes", "effects"))
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def detect_format(path: Path) -> str:
+    if is_binary(path):
+        return "binary"
+    if is_ndjson(path):
+        return "ndjson"
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(2)
+    return "pretty" if head == "{\n" else "compact"
+
+
+def node_fingerprint(node: Dict[str, Any]) -> int:
+    # repr keeps key order, so a reordered record (which serializes differently) differs.
+    return hash(repr(node))
+
+
+def edge_key(edge: Dict[str, Any]) -> int:
+    return hash((edge.get("kind"), tuple(edge.get("causes") or ()), tuple(edge.get("effects") or ())))
+
+
+def edge_fingerprint(edge: Dict[str, Any], key: int) -> int:
+    """Content hash ignoring the id; kind/causes/effects enter through `key`."""
+    return hash((key, tuple(edge), repr([v for k, v in edge.items() if k not in _KEY_FIELDS])))
+
+
+def positional_id(base_id: Any, pos: int) -> Optional[str]:
+    if not isinstance(base_id, str) or ":" not in base_id:
+        return None
+    return f"{base_id.rsplit(':', 1)[0]}:{pos}"
+
+
+class _Order:
+    """Builds the run list for a section while the target streams by."""
+
+    def __init__(self) -> None:
+        self.runs: List[Run] = []
+
+    def copy(self, base_i: int) -> None:
+        last = self.runs[-1] if self.runs else None
+        if isinstance(last, list) and last[0] + last[1] == base_i:
+            last[1] += 1
+        else:
+            self.runs.append([base_i, 1])
+
+    def add(self) -> None:
+        if self.runs and isinstance(self.runs[-1], int):
+            self.runs[-1] += 1
+        else:
+            self.runs.append(1)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _scan(path: Path, raw: bool) -> Iterator[Tuple[str, str, Any]]:
+    """
+    iter_document records, except that each nodes/hyperedges "array" record
+    carries a loader and its items become (match key, fingerprint, id, payload)
+    tuples; loader(payload) is the full record. With `raw` (an .m3hg file) the
+    hashes come from the undecoded string table and payloads are record indices,
+    so only added/changed records are ever decoded; raw fingerprints are only
+    comparable with other raw fingerprints.
+    """
+    if raw:
+        return _scan_binary(path)
+    return _scan_json(path)
+
+
+def _scan_json(path: Path) -> Iterator[Tuple[str, str, Any]]:
+    for rec, key, value in iter_document(path):
+        if key not in SECTIONS:
+            yield rec, key, value
+        elif rec == "array":
+            yield rec, key, _identity
+        elif rec != "item":
+            yield rec, key, value
+        elif not isinstance(value, dict):
+            # Malformed items keep their slot so indices match the base stream.
+            yield rec, key, (None, 0, None, value)
+        elif key == "nodes":
+            nid = value.get("id")
+            yield rec, key, (nid, node_fingerprint(value), nid, value)
+        else:
+            k = edge_key(value)
+            yield rec, key, (k, edge_fingerprint(value, k), value.get("id"), value)
+
+
+def _scan_binary(path: Path) -> Iterator[Tuple[str, str, Any]]:
+    # Member order mirrors hypergraph_bin.iter_bin_document.
+    with BinaryHypergraph(path) as g:
+        strs = g.string_table()
+        if g.graph_id is not None:
+            yield "value", "id", g.graph_id
+        yield "array", "nodes", g.node
+        for i, row in enumerate(g.node_rows()):
+            texts = tuple([strs[x] if x != NONE else None for x in row])
+            yield "item", "nodes", (texts[0], hash(texts), texts[0], i)
+        yield "array", "hyperedges", g.edge
+        cp, ci = g.cause_ptr.tolist(), g.cause_idx.tolist()
+        ep, ei = g.effect_ptr.tolist(), g.effect_idx.tolist()
+        for i, (eid, kind, data, extra, flags) in enumerate(g.edge_rows()):
+            k = hash(
+                (
+                    strs[kind] if kind != NONE else None,
+                    tuple([strs[x] for x in ci[cp[i] : cp[i + 1]]]),
+                    tuple([strs[x] for x in ei[ep[i] : ep[i + 1]]]),
+                )
+            )
+            fp = hash((k, data != NONE and strs[data], extra != NONE and strs[extra], flags))
+            yield "item", "hyperedges", (k, fp, strs[eid] if eid != NONE else None, i)
+        if g.has_metadata:
+            yield "value", "metadata", g.metadata
+        for k, v in g.extra.items():
+            yield "value", k, v
+
+
+class _BaseIndex:
+    """Per-section lookup tables built from one pass over the base graph."""
+
+    def __init__(self) -> None:
+        self.node_at: Dict[Any, int] = {}
+        self.node_fp: List[int] = []
+        # Edge key hash -> base index, or a deque of indices for duplicate keys.
+        self.edge_at: Dict[int, Union[int, Deque[int]]] = {}
+        self.edge_ids: List[Any] = []
+        self.edge_fp: List[int] = []
+
+    def load(self, path: Path, raw: bool) -> None:
+        for rec, key, value in _scan(path, raw):
+            if rec != "item" or key not in SECTIONS:
+                continue
+            k, fp, ident, _ = value
+            if key == "nodes":
+                if k is not None:
+                    self.node_at[k] = len(self.node_fp)
+                self.node_fp.append(fp)
+                continue
+            i = len(self.edge_fp)
+            if k is not None:
+                q = self.edge_at.get(k)
+                if q is None:
+                    self.edge_at[k] = i
+                elif isinstance(q, int):
+                    self.edge_at[k] = deque((q, i))
+                else:
+                    q.append(i)
+            self.edge_ids.append(ident)
+            self.edge_fp.append(fp)
+
+    def take_edge(self, key: int) -> Optional[int]:
+        """Next unmatched base edge with this key (duplicates pair up in order)."""
+        q = self.edge_at.get(key)
+        if q is None:
+            return None
+        if isinstance(q, int):
+            del self.edge_at[key]
+            return q
+        i = q.popleft()
+        if not q:
+            del self.edge_at[key]
+        return i
+
+
+def diff_hypergraphs(base: Path, target: Path) -> Dict[str, Any]:
+    """Patch taking `base` to `target`."""
+    raw = is_binary(base) and is_binary(target)
+    idx = _BaseIndex()
+    idx.load(base, raw)
+
+    members: List[str] = []
+    values: Dict[str, Any] = {}
+    nodes: Dict[str, Any] = {"removed": [], "added": [], "changed": []}
+    edges: Dict[str, Any] = {"removed": [], "added": [], "changed": []}
+    node_order, edge_order = _Order(), _Order()
+    node_seen: Set[int] = set()
+    edge_seen = bytearray(len(idx.edge_fp))
+    kept_ex: List[List[Any]] = []
+    pos_ex: List[List[Any]] = []
+    n_pos = e_pos = 0
+    pending_array: Dict[str, List[Any]] = {}
+
+    load: Dict[str, Any] = {}
+    for rec, key, value in _scan(target, raw):
+        if rec != "item" and key not in members:
+            members.append(key)
+        if rec == "value":
+            values[key] = value
+            continue
+        if key not in SECTIONS:
+            # A non-section array streamed from NDJSON: keep it whole.
+            if rec == "array":
+                pending_array[key] = values[key] = []
+            else:
+                pending_array[key].append(value)
+            continue
+        if rec == "array":
+            load[key] = value
+            continue
+        k, fp, tid, payload = value
+        if key == "nodes":
+            i = idx.node_at.get(k) if k is not None else None
+            if i is None or i in node_seen:
+                nodes["added"].append(load[key](payload))
+                node_order.add()
+            else:
+                node_seen.add(i)
+                node_order.copy(i)
+                if fp != idx.node_fp[i]:
+                    nodes["changed"].append([n_pos, load[key](payload)])
+            n_pos += 1
+        else:
+            i = idx.take_edge(k) if k is not None else None
+            if i is None:
+                edges["added"].append(load[key](payload))
+                edge_order.add()
+            else:
+                edge_seen[i] = 1
+                edge_order.copy(i)
+                if fp != idx.edge_fp[i]:
+                    edges["changed"].append([e_pos, load[key](payload)])
+                else:
+                    bid = idx.edge_ids[i]
+                    if tid != bid:
+                        kept_ex.append([e_pos, tid])
+                    if tid != positional_id(bid, e_pos):
+                        pos_ex.append([e_pos, tid])
+            e_pos += 1
+
+    nodes["removed"] = [nid for nid, i in idx.node_at.items() if i not in node_seen]
+    edges["removed"] = [idx.edge_ids[i] for i in range(len(edge_seen)) if not edge_seen[i] and idx.edge_ids[i] is not None]
+    nodes["order"] = node_order.runs
+    edges["order"] = edge_order.runs
+    if len(pos_ex) < len(kept_ex):
+        edges["ids"], edges["renamed"] = "positional", pos_ex
+    else:
+        edges["ids"], edges["renamed"] = "kept", kept_ex
+
+    return {
+        "version": PATCH_VERSION,
+        "base": {
+            "sha256": file_sha256(base),
+            "bytes": base.stat().st_size,
+            "nodes": len(idx.node_fp),
+            "hyperedges": len(idx.edge_fp),
+        },
+        "target": {
+            "sha256": file_sha256(target),
+            "bytes": target.stat().st_size,
+            "nodes": n_pos,
+            "hyperedges": e_pos,
+            "format": detect_format(target),
+        },
+        "members": members,
+        "values": values,
+        "nodes": nodes,
+        "hyperedges": edges,
+    }
+
+
+def _retained(runs: List[Run]) -> Set[int]:
+    """Base indices referenced after the stream has already moved past them."""
+    out: Set[int] = set()
+    hi = 0
+    for run in runs:
+        if isinstance(run, list):
+            b, n = run
+            if b < hi:
+                out.update(range(b, min(b + n, hi)))
+            hi = max(hi, b + n)
+    return out
+
+
+class _BaseReader:
+    """
+    Serves base records by (section, index) from a single forward pass. Records
+    that a later run needs out of order — or a section read before the one
+    stored ahead of it — are kept; everything else is dropped once passed.
+    """
+
+    def __init__(self, path: Path, retain: Dict[str, Set[int]]) -> None:
+        self.records = iter_document(path)
+        self.retain = retain
+        self.next_i = {s: 0 for s in SECTIONS}
+        self.kept: Dict[str, Dict[int, Any]] = {s: {} for s in SECTIONS}
+        self.ahead: Dict[str, Deque[Any]] = {s: deque() for s in SECTIONS}
+
+    def _pull(self, section: str) -> Any:
+        if self.ahead[section]:
+            return self.ahead[section].popleft()
+        for rec, key, value in self.records:
+            if rec != "item" or key not in SECTIONS:
+                continue
+            if key == section:
+                return value
+            self.ahead[key].append(value)
+        raise ValueError(f"base graph has fewer {section} than the patch expects")
+
+    def get(self, section: str, i: int) -> Any:
+        kept = self.kept[section]
+        if i in kept:
+            return kept.pop(i)
+        retain = self.retain[section]
+        while self.next_i[section] <= i:
+            j = self.next_i[section]
+            value = self._pull(section)
+            self.next_i[section] = j + 1
+            if j == i:
+                return value
+            if j in retain:
+                kept[j] = value
+        raise ValueError(f"base {section}[{i}] requested twice")
+
+
+def _iter_section(patch: Dict[str, Any], section: str, base: _BaseReader) -> Iterator[Any]:
+    sec = patch[section]
+    added = iter(sec["added"])
+    changed = {pos: rec for pos, rec in sec["changed"]}
+    renamed = {pos: tid for pos, tid in sec.get("renamed", ())}
+    positional = sec.get("ids") == "positional"
+    pos = 0
+    for run in sec["order"]:
+        if isinstance(run, int):
+            for _ in range(run):
+                yield next(added)
+                pos += 1
+            continue
+        b, n = run
+        for i in range(b, b + n):
+            value = base.get(section, i)
+            if pos in changed:
+                value = changed[pos]
+            elif section == "hyperedges":
+                tid = renamed.get(pos)
+                if tid is None and positional:
+                    tid = positional_id(value.get("id"), pos)
+                if tid is not None and tid != value.get("id"):
+                    value = dict(value)
+                    value["id"] = tid
+            yield value
+            pos += 1
+
+
+def apply_patch(base: Path, patch: Dict[str, Any], out: Path, fmt: Optional[str] = None, force: bool = False) -> bool:
+    """
+    Write the patched graph to `out` (default format: the target's). Raises
+    ValueError if `base` is not the patch's base (unless force). Returns whether
+    the output is byte-identical to the recorded target.
+    """
+    if patch.get("version") != PATCH_VERSION:
+        raise ValueError(f"unsupported patch version: {patch.get('version')!r}")
+    if not force and file_sha256(base) != patch["base"]["sha256"]:
+        raise ValueError(f"{base} is not the base this patch was made from (sha256 mismatch)")
+    fmt = fmt or patch["target"]["format"]
+    retain = {s: _retained(patch[s]["order"]) for s in SECTIONS}
+    reader = _BaseReader(base, retain)
+
+    def members() -> Iterator[Tuple[str, Any]]:
+        for key in patch["members"]:
+            if key in SECTIONS:
+                yield key, _iter_section(patch, key, reader)
+            else:
+                yield key, patch["values"][key]
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "binary":
+        write_bin_document(out, members())
+    else:
+        write_json_document(out, members(), fmt)
+    return fmt == patch["target"]["format"] and file_sha256(out) == patch["target"]["sha256"]
+
+
+def patch_stats(patch: Dict[str, Any]) -> Dict[str, int]:
+    n, e = patch["nodes"], patch["hyperedges"]
+    return {
+        "nodes_added": len(n["added"]),
+        "nodes_removed": len(n["removed"]),
+        "nodes_changed": len(n["changed"]),
+        "edges_added": len(e["added"]),
+        "edges_removed": len(e["removed"]),
+        "edges_changed": len(e["changed"]),
+        "edges_renamed": len(e.get("renamed", ())),
+    }
+
+
+def _fmt_stats(stats: Dict[str, int]) -> str:
+    return " ".join(f"{k}={v}" for k, v in stats.items())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Diff / patch Meta3 hypergraph versions")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("diff", help="Write a patch taking BASE to TARGET")
+    d.add_argument("base")
+    d.add_argument("target")
+    d.add_argument("--out", required=True, help="Patch file to write")
+    a = sub.add_parser("apply", help="Apply PATCH to BASE")
+    a.add_argument("base")
+    a.add_argument("patch")
+    a.add_argument("--out", required=True, help="Graph to write")
+    a.add_argument("--format", choices=PATCH_FORMATS, default=None, help="Output format (default: the target's)")
+    a.add_argument("--force", action="store_true", help="Apply even if BASE's sha256 differs from the patch's base")
+    s = sub.add_parser("stat", help="Print a patch's change counts")
+    s.add_argument("patch")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.cmd == "diff":
+        patch = diff_hypergraphs(Path(args.base), Path(args.target))
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(patch, separators=(",", ":")) + "\n", encoding="utf-8")
+        print(
+            f"hypergraph_diff_ok=1 {_fmt_stats(patch_stats(patch))} patch_bytes={out.stat().st_size}"
+            f" target_bytes={patch['target']['bytes']} duration_ms={int((time.perf_counter() - t0) * 1000)}"
+        )
+        return 0
+
+    patch = json.loads(Path(args.patch).read_text(encoding="utf-8"))
+    if args.cmd == "stat":
+        print(f"hypergraph_patch_ok=1 {_fmt_stats(patch_stats(patch))} base={patch['base']['sha256'][:12]} target={patch['target']['sha256'][:12]}")
+        return 0
+    try:
+        identical = apply_patch(Path(args.base), patch, Path(args.out), args.format, args.force)
+    except ValueError as e:
+        print(f"hypergraph_patch_ok=0 error={e}", file=sys.stderr)
+        return 1
+    print(
+        f"hypergraph_patch_ok=1 out={args.out} target_match={int(identical)}"
+        f" duration_ms={int((time.perf_counter() - t0) * 1000)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Indexed, in-process store for Meta3 hypergraphs (nodes + hyperedges + metadata).
+
+Indexes built once at load time:
+  - node id -> node, kind -> node ids, sorted (label, id) pairs for prefix lookup
+  - cause -> effects and effect -> causes adjacency (hyperedges projected pairwise)
+  - node -> incident edges, (edge kind, node) -> incident edges
+
+After indexing, neighbor and "edges of kind X touching node Y" lookups are dict
+hits instead of scans over `hyperedges`.
+
+Usage (one JSON result per line on stdout):
+  python3 tools/hypergraph_store.py GRAPH stats
+  python3 tools/hypergraph_store.py GRAPH node ID
+  python3 tools/hypergraph_store.py GRAPH kind KIND [--limit N]
+  python3 tools/hypergraph_store.py GRAPH prefix TEXT [--limit N]
+  python3 tools/hypergraph_store.py GRAPH neighbors ID [--direction out|in|both]
+  python3 tools/hypergraph_store.py GRAPH khop ID --k 2 [--direction out|in|both]
+  python3 tools/hypergraph_store.py GRAPH edges ID [--kind KIND]
+
+GRAPH may be pretty/compact JSON, NDJSON or binary .m3hg. Binary graphs are
+indexed straight from the mmap'd string table and CSR arrays; node and edge
+payloads are only decoded for the records a query returns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from graph_io import iter_document
+from hypergraph_bin import BinaryHypergraph, is_binary
+
+
+class HypergraphStore:
+    def __init__(self) -> None:
+        self.graph_id: Optional[str] = None
+        self.metadata: Any = None
+        # Node id -> node dict, or record index into self._bin for .m3hg-backed stores.
+        self.nodes: Dict[str, Union[dict, int]] = {}
+        self.edges: List[dict] = []
+        self.n_edges = 0
+        self.by_kind: Dict[str, List[str]] = defaultdict(list)
+        self.successors: Dict[str, Set[str]] = defaultdict(set)
+        self.predecessors: Dict[str, Set[str]] = defaultdict(set)
+        self.incident: Dict[str, List[int]] = defaultdict(list)
+        self.incident_by_kind: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self._edge_kinds: Dict[str, int] = defaultdict(int)
+        self._labels: List[Tuple[str, str]] = []
+        self._labels_sorted = True
+        self._bin: Optional[BinaryHypergraph] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "HypergraphStore":
+        if is_binary(path):
+            return cls.load_binary(path)
+        store = cls()
+        for rec, key, value in iter_document(path):
+            if rec == "item" and key == "nodes" and isinstance(value, dict):
+                store.add_node(value)
+            elif rec == "item" and key == "hyperedges" and isinstance(value, dict):
+                store.add_edge(value)
+            elif rec == "value" and key == "id":
+                store.graph_id = value
+            elif rec == "value" and key == "metadata":
+                store.metadata = value
+        return store
+
+    @classmethod
+    def load_binary(cls, path: Path) -> "HypergraphStore":
+        """Index an .m3hg file without decoding node/edge payloads; records decode on access."""
+        g = BinaryHypergraph(path)
+        store = cls()
+        store._bin = g
+        store.graph_id = g.graph_id
+        store.metadata = g.metadata
+        for i in range(g.n_nodes):
+            nid, kind, label = g.node_header(i)
+            store._index_node(nid, i, kind, label)
+        for i in range(g.n_edges):
+            store._index_edge(i, g.edge_kind(i), g.causes(i), g.effects(i))
+        return store
+
+    def close(self) -> None:
+        if self._bin is not None:
+            self._bin.close()
+            self._bin = None
+
+    def __enter__(self) -> "HypergraphStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add_node(self, node: dict) -> None:
+        self._index_node(node.get("id"), node, node.get("kind"), node.get("label"))
+
+    def add_edge(self, edge: dict) -> None:
+        if self._bin is not None:
+            raise ValueError("binary-backed store is read-only")
+        self.edges.append(edge)
+        causes = [c for c in edge.get("causes") or [] if isinstance(c, str)]
+        effects = [e for e in edge.get("effects") or [] if isinstance(e, str)]
+        self._index_edge(self.n_edges, edge.get("kind"), causes, effects)
+
+    def _index_node(self, nid: Any, row: Union[dict, int], kind: Any, label: Any) -> None:
+        if not isinstance(nid, str) or nid in self.nodes:
+            return
+        self.nodes[nid] = row
+        self.by_kind[str(kind or "")].append(nid)
+        self._labels.append((str(label or "").lower(), nid))
+        self._labels_sorted = False
+
+    def _index_edge(self, i: int, kind: Any, causes: List[str], effects: List[str]) -> None:
+        kind = str(kind or "")
+        self.n_edges += 1
+        self._edge_kinds[kind] += 1
+        for c in causes:
+            self.successors[c].update(effects)
+        for e in effects:
+            self.predecessors[e].update(causes)
+        for n in dict.fromkeys(causes + effects):
+            self.incident[n].append(i)
+            self.incident_by_kind[(kind, n)].append(i)
+
+    # Lookups
+
+    def node(self, nid: str) -> Optional[dict]:
+        row = self.nodes.get(nid)
+        if isinstance(row, int):
+            return self._bin.node(row)
+        return row
+
+    def edge(self, i: int) -> dict:
+        return self._bin.edge(i) if self._bin is not None else self.edges[i]
+
+    def nodes_of_kind(self, kind: str) -> List[str]:
+        return self.by_kind.get(kind, [])
+
+    def label_prefix(self, prefix: str, limit: int = 0) -> List[str]:
+        """Node ids whose label starts with prefix (case-insensitive), in label order."""
+        if not self._labels_sorted:
+            self._labels.sort()
+            self._labels_sorted = True
+        p = prefix.lower()
+        out: List[str] = []
+        for label, nid in self._labels[bisect_left(self._labels, (p, "")) :]:
+            if not label.startswith(p) or (limit and len(out) >= limit):
+                break
+            out.append(nid)
+        return out
+
+    def neighbors(self, nid: str, direction: str = "both") -> Set[str]:
+        out: Set[str] = set()
+        if direction in ("out", "both"):
+            out |= self.successors.get(nid, set())
+        if direction in ("in", "both"):
+            out |= self.predecessors.get(nid, set())
+        return out
+
+    def k_hop(self, nid: str, k: int, direction: str = "both") -> Dict[str, int]:
+        """Nodes reachable within k hops, mapped to their hop distance (start excluded)."""
+        dist: Dict[str, int] = {nid: 0}
+        frontier = [nid]
+        for hop in range(1, k + 1):
+            nxt: List[str] = []
+            for n in frontier:
+                for m in self.neighbors(n, direction):
+                    if m not in dist:
+                        dist[m] = hop
+                        nxt.append(m)
+            if not nxt:
+                break
+            frontier = nxt
+        del dist[nid]
+        return dist
+
+    def edges_touching(self, nid: str, kind: Optional[str] = None) -> List[dict]:
+        idx = self.incident.get(nid, []) if kind is None else self.incident_by_kind.get((kind, nid), [])
+        return [self.edge(i) for i in idx]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.graph_id,
+            "nodes": len(self.nodes),
+            "hyperedges": self.n_edges,
+            "node_kinds": {k: len(v) for k, v in sorted(self.by_kind.items())},
+            "edge_kinds": dict(sorted(self._edge_kinds.items())),
+        }
+
+
+def _emit(rows: Iterable[Any]) -> None:
+    for r in rows:
+        sys.stdout.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Query a Meta3 hypergraph through in-memory indexes")
+    ap.add_argument("graph")
+    ap.add_argument("--timing", action="store_true", help="Report index and query time on stderr")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("node").add_argument("id")
+    q = sub.add_parser("kind")
+    q.add_argument("kind")
+    q.add_argument("--limit", type=int, default=0)
+    q = sub.add_parser("prefix")
+    q.add_argument("text")
+    q.add_argument("--limit", type=int, default=0)
+    q = sub.add_parser("neighbors")
+    q.add_argument("id")
+    q.add_argument("--direction", choices=("out", "in", "both"), default="both")
+    q = sub.add_parser("khop")
+    q.add_argument("id")
+    q.add_argument("--k", type=int, default=2)
+    q.add_argument("--direction", choices=("out", "in", "both"), default="both")
+    q = sub.add_parser("edges")
+    q.add_argument("id")
+    q.add_argument("--kind", default=None)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    store = HypergraphStore.load(Path(args.graph))
+    t1 = time.perf_counter()
+
+    if args.cmd == "stats":
+        rows: List[Any] = [store.stats()]
+    elif args.cmd == "node":
+        n = store.node(args.id)
+        rows = [n] if n is not None else []
+    elif args.cmd == "kind":
+        ids = store.nodes_of_kind(args.kind)
+        rows = ids[: args.limit] if args.limit else ids
+    elif args.cmd == "prefix":
+        rows = [{"id": nid, "label": (store.node(nid) or {}).get("label")} for nid in store.label_prefix(args.text, args.limit)]
+    elif args.cmd == "neighbors":
+        rows = sorted(store.neighbors(args.id, args.direction))
+    elif args.cmd == "khop":
+        rows = [{"id": nid, "hops": d} for nid, d in sorted(store.k_hop(args.id, args.k, args.direction).items(), key=lambda x: (x[1], x[0]))]
+    else:
+        rows = store.edges_touching(args.id, args.kind)
+    t2 = time.perf_counter()
+
+    _emit(rows)
+    store.close()
+    if args.timing:
+        print(f"index_s={t1 - t0:.3f} query_us={(t2 - t1) * 1e6:.1f} results={len(rows)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
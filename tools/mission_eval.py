@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Score mission_ref bridges in a merged hypergraph (precision/recall), writing eval.json.
+
+Expected bridges pair every code-side `file` node (data.repo + data.path) with each
+mission `FILE:<abs path>` node whose path ends in `/<repo>/<path>`; actual bridges
+are the (cause, effect) pairs of the merged graph's `mission_ref` hyperedges.
+Node ids are interned to integers and each pair packed into one int, so expected
+and actual are plain int sets and correct/missing/extra are set operations. The
+mission side is matched by looking up each path's `/` suffixes that start at a
+known repo name, so building the expected set is linear in the number of files.
+
+The output keeps the engine evaluator's eval.json schema (counts, precision,
+recall, missing_sample, extra_sample, seconds); `seconds` is measured, and
+`timings` adds the per-phase wall times. `--lists-out` writes the complete
+missing/extra lists. Inputs are streamed (graph_io), so merged graphs with
+millions of bridges never need a full json.loads.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from graph_io import iter_document
+
+MISSION_FILE_PREFIX = "FILE:"
+PAIR_SHIFT = 32
+
+
+class Interner:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __call__(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+def iter_items(path: Path, key: str) -> Iterator[Any]:
+    """Elements of a top-level array member, streamed."""
+    for rec, k, value in iter_document(path, stream_keys=(key,)):
+        if k != key:
+            continue
+        if rec == "item":
+            yield value
+        elif rec == "value" and isinstance(value, list):
+            yield from value
+
+
+class Phases:
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.last = self.t0
+        self.timings: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.timings[name] = round(now - self.last, 6)
+        self.last = now
+
+    def total(self) -> float:
+        return round(time.perf_counter() - self.t0, 6)
+
+
+def load_hyper_files(path: Path) -> Tuple[Dict[str, List[str]], int, Set[str]]:
+    """({"repo/path": [node ids]}, file count, repos) for the code-side file nodes."""
+    by_key: Dict[str, List[str]] = {}
+    repos: Set[str] = set()
+    count = 0
+    for node in iter_items(path, "nodes"):
+        if not isinstance(node, dict) or node.get("kind") != "file":
+            continue
+        data = node.get("data") or {}
+        repo, rel = data.get("repo"), data.get("path")
+        count += 1
+        if not isinstance(repo, str) or not isinstance(rel, str) or not repo or not rel:
+            continue
+        repos.add(repo)
+        by_key.setdefault(f"{repo}/{rel.strip('/')}", []).append(str(node["id"]))
+    return by_key, count, repos
+
+
+def load_mission_nodes(path: Path) -> Tuple[List[str], Set[str]]:
+    """(FILE: node ids, all node ids) of a mission graph."""
+    files: List[str] = []
+    ids: Set[str] = set()
+    for node in iter_items(path, "nodes"):
+        if not isinstance(node, dict):
+            continue
+        nid = str(node.get("id", ""))
+        ids.add(nid)
+        if nid.startswith(MISSION_FILE_PREFIX):
+            files.append(nid)
+    return files, ids
+
+
+def expected_pairs(
+    by_key: Dict[str, List[str]], repos: Set[str], mission_files: List[str], hyper: Interner, mission: Interner
+) -> Set[int]:
+    out: Set[int] = set()
+    for mid in mission_files:
+        parts = mid[len(MISSION_FILE_PREFIX) :].strip("/").split("/")
+        m = None
+        # Only suffixes starting at a known repo component can be a repo+path key.
+        for i in range(len(parts) - 1):
+            if parts[i] not in repos:
+                continue
+            hits = by_key.get("/".join(parts[i:]))
+            if hits:
+                if m is None:
+                    m = mission(mid)
+                for hid in hits:
+                    out.add(hyper(hid) << PAIR_SHIFT | m)
+    return out
+
+
+def load_merged(
+    path: Path, hyper: Interner, mission: Interner, mission_ids: Set[str]
+) -> Tuple[Set[int], int, int]:
+    """(actual pair set, mission_ref edge count, mission nodes included) from the merged graph."""
+    actual: Set[int] = set()
+    edges = included = 0
+    for rec, key, value in iter_document(path):
+        if rec != "item" or not isinstance(value, dict):
+            continue
+        if key == "nodes":
+            if str(value.get("id", "")) in mission_ids:
+                included += 1
+        elif key == "hyperedges" and value.get("kind") == "mission_ref":
+            edges += 1
+            causes = [hyper(str(c)) for c in value.get("causes") or []]
+            for e in value.get("effects") or []:
+                m = mission(str(e))
+                for h in causes:
+                    actual.add(h << PAIR_SHIFT | m)
+    return actual, edges, included
+
+
+def describe(pairs: Set[int], hyper: Interner, mission: Interner, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    mask = (1 << PAIR_SHIFT) - 1
+    named = sorted((hyper.names[p >> PAIR_SHIFT], mission.names[p & mask]) for p in pairs)
+    if limit is not None:
+        named = named[:limit]
+    return [{"hyper": h, "mission": m} for h, m in named]
+
+
+def evaluate(hyper_path: Path, mission_path: Path, merged_path: Path, sample: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(eval.json document, full missing/extra lists)."""
+    phases = Phases()
+    by_key, hyper_file_count, repos = load_hyper_files(hyper_path)
+    phases.mark("load_hyper")
+    mission_files, mission_ids = load_mission_nodes(mission_path)
+    phases.mark("load_mission")
+
+    hyper, mission = Interner(), Interner()
+    expected = expected_pairs(by_key, repos, mission_files, hyper, mission)
+    phases.mark("expected")
+    actual, _, included = load_merged(merged_path, hyper, mission, mission_ids)
+    phases.mark("load_merged")
+
+    correct = len(expected & actual)
+    missing = expected - actual
+    extra = actual - expected
+    precision = correct / len(actual) if actual else (1.0 if not expected else 0.0)
+    recall = correct / len(expected) if expected else 1.0
+    phases.mark("compare")
+
+    lists = {"missing": describe(missing, hyper, mission), "extra": describe(extra, hyper, mission)}
+    phases.mark("report")
+    doc = {
+        "hyper_file_count": hyper_file_count,
+        "mission_file_count": len(mission_files),
+        "mission_included_count": included,
+        "repo_count": len(repos),
+        "expected_bridges": len(expected),
+        "actual_bridges": len(actual),
+        "correct_bridges": correct,
+        "precision": precision,
+        "recall": recall,
+        "missing_sample": lists["missing"][:sample],
+        "extra_sample": lists["extra"][:sample],
+        "seconds": phases.total(),
+        "timings": phases.timings,
+    }
+    return doc, lists
+
+
+def render_markdown(doc: Dict[str, Any]) -> str:
+    metrics = {k: doc[k] for k in ("expected_bridges", "actual_bridges", "precision", "recall")}
+    return (
+        "# Mission → Code Bridge — Evaluation\n\n"
+        "This report is generated by `tools/mission_eval.py`.\n\n"
+        "## Metrics\n\n"
+        f"```json\n{json.dumps(metrics, indent=2)}\n```\n\n"
+        "See `eval.json` for full details (samples, counts, and timings).\n"
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Precision/recall of mission_ref bridges in a merged hypergraph")
+    ap.add_argument("--hyper", required=True, help="Code-side hypergraph.json")
+    ap.add_argument("--mission", required=True, help="mission_graph.json")
+    ap.add_argument("--merged", required=True, help="merged.hypergraph.json")
+    ap.add_argument("--out", required=True, help="eval.json to write")
+    ap.add_argument("--scope", default="full", help="Merge scope the graph was built with (recorded by the merge; accepted for CLI parity)")
+    ap.add_argument("--min-precision", type=float, default=0.0)
+    ap.add_argument("--min-recall", type=float, default=0.0)
+    ap.add_argument("--sample", type=int, default=20, help="Pairs kept in missing_sample / extra_sample")
+    ap.add_argument("--lists-out", default="", help="Also write the complete missing/extra lists here")
+    ap.add_argument("--md-out", default="", help="Also write a Markdown summary (eval.md) here")
+    args = ap.parse_args()
+
+    doc, lists = evaluate(Path(args.hyper), Path(args.mission), Path(args.merged), args.sample)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+    if args.lists_out:
+        Path(args.lists_out).write_text(json.dumps(lists, separators=(",", ":")) + "\n", encoding="utf-8")
+    if args.md_out:
+        Path(args.md_out).write_text(render_markdown(doc), encoding="utf-8")
+
+    failed = []
+    if doc["precision"] < args.min_precision:
+        failed.append(f"precision {doc['precision']:.6f} < {args.min_precision}")
+    if doc["recall"] < args.min_recall:
+        failed.append(f"recall {doc['recall']:.6f} < {args.min_recall}")
+    print(
+        f"mission_eval_ok={int(not failed)} precision={doc['precision']:.6f} recall={doc['recall']:.6f}"
+        f" expected={doc['expected_bridges']} actual={doc['actual_bridges']} correct={doc['correct_bridges']}"
+        f" seconds={doc['seconds']} out={out}"
+    )
+    for msg in failed:
+        print(f"gate failed: {msg}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Index receipt_v1 files into SQLite and query them across runs.
+
+  receipt_index.py ingest [PATH ...]          receipt.json files or directories (searched recursively)
+  receipt_index.py runs [--input SHA]        one line per indexed run
+  receipt_index.py query [--kind K] [--cmd TEXT] [--status N] [--ok 0|1] [--input SHA]
+  receipt_index.py history --cmd TEXT        a command's status/stdout_sha256/wall_s run by run
+  receipt_index.py diff RUN_A RUN_B          effects added/removed/changed between two runs
+
+--db DB (default tmp/receipt_index.sqlite) and --json go before or after the subcommand.
+
+A run is one distinct receipt: rows are keyed by the receipt's `input_sha256`
+plus the sha256 of the receipt file itself, so re-running the same UTIR (same
+input_sha256, receipt overwritten in place) accumulates one run per distinct
+outcome. Ingest is incremental: files whose (mtime, size) are unchanged since the
+last ingest are not re-read, and everything is written in one transaction.
+Effects are indexed on kind, cmd and status, so queries stay index lookups however
+many runs accumulate. RUN arguments are a run id, or an input_sha256 prefix
+(meaning its latest run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_DB = "tmp/receipt_index.sqlite"
+DEFAULT_RECEIPTS = "showcases/tribench/utir/receipts"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+  path TEXT PRIMARY KEY,
+  mtime_ns INTEGER NOT NULL,
+  size INTEGER NOT NULL,
+  run_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY,
+  input_sha256 TEXT NOT NULL,
+  receipt_sha256 TEXT NOT NULL,
+  version TEXT,
+  deterministic INTEGER,
+  path TEXT NOT NULL,
+  observed_at TEXT NOT NULL,
+  effects INTEGER NOT NULL,
+  failed INTEGER NOT NULL,
+  blocked INTEGER NOT NULL,
+  UNIQUE (input_sha256, receipt_sha256)
+);
+CREATE INDEX IF NOT EXISTS runs_input ON runs (input_sha256, observed_at);
+CREATE TABLE IF NOT EXISTS effects (
+  run_id INTEGER NOT NULL REFERENCES runs (id),
+  seq INTEGER NOT NULL,
+  kind TEXT,
+  op TEXT,
+  cmd TEXT,
+  ok INTEGER,
+  status INTEGER,
+  stdout_sha256 TEXT,
+  wall_s REAL,
+  cached INTEGER,
+  reason TEXT,
+  data TEXT NOT NULL,
+  PRIMARY KEY (run_id, seq)
+);
+CREATE INDEX IF NOT EXISTS effects_kind ON effects (kind);
+CREATE INDEX IF NOT EXISTS effects_cmd ON effects (cmd);
+CREATE INDEX IF NOT EXISTS effects_status ON effects (status);
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path))
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def iter_receipt_files(paths: Iterable[Path]) -> Iterator[Path]:
+    for p in paths:
+        if p.is_dir():
+            yield from sorted(p.rglob("receipt.json"))
+        elif p.is_file():
+            yield p
+
+
+def _bool(value: Any) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def effect_row(run_id: int, seq: int, effect: Dict[str, Any]) -> Tuple[Any, ...]:
+    status = effect.get("status")
+    return (
+        run_id,
+        seq,
+        effect.get("kind"),
+        effect.get("op"),
+        effect.get("cmd"),
+        _bool(effect.get("ok")),
+        status if isinstance(status, int) else None,
+        effect.get("stdout_sha256"),
+        effect.get("wall_s"),
+        _bool(effect.get("cached")),
+        effect.get("reason"),
+        json.dumps(effect, sort_keys=True),
+    )
+
+
+def ingest(db: sqlite3.Connection, files: Iterable[Path]) -> Dict[str, int]:
+    stats = {"files": 0, "new_runs": 0, "unchanged": 0, "known": 0, "skipped": 0, "effects": 0}
+    with db:
+        for path in files:
+            stats["files"] += 1
+            key = str(path.resolve())
+            st = path.stat()
+            row = db.execute("SELECT mtime_ns, size FROM files WHERE path = ?", (key,)).fetchone()
+            if row is not None and row == (st.st_mtime_ns, st.st_size):
+                stats["unchanged"] += 1
+                continue
+            raw = path.read_bytes()
+            try:
+                doc = json.loads(raw)
+            except ValueError:
+                doc = None
+            if not isinstance(doc, dict) or doc.get("version") != "receipt_v1" or not doc.get("input_sha256"):
+                stats["skipped"] += 1
+                continue
+            receipt_sha = hashlib.sha256(raw).hexdigest()
+            found = db.execute(
+                "SELECT id FROM runs WHERE input_sha256 = ? AND receipt_sha256 = ?", (doc["input_sha256"], receipt_sha)
+            ).fetchone()
+            if found is not None:
+                run_id = found[0]
+                stats["known"] += 1
+            else:
+                effects = [e for e in doc.get("effects") or [] if isinstance(e, dict)]
+                observed = datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat(timespec="seconds")
+                cur = db.execute(
+                    "INSERT INTO runs (input_sha256, receipt_sha256, version, deterministic, path, observed_at, effects, failed, blocked)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        doc["input_sha256"],
+                        receipt_sha,
+                        doc.get("version"),
+                        _bool(doc.get("deterministic")),
+                        key,
+                        observed,
+                        len(effects),
+                        sum(1 for e in effects if e.get("ok") is False),
+                        sum(1 for e in effects if e.get("kind") == "blocked"),
+                    ),
+                )
+                run_id = cur.lastrowid
+                db.executemany(
+                    "INSERT INTO effects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (effect_row(run_id, i, e) for i, e in enumerate(effects)),
+                )
+                stats["new_runs"] += 1
+                stats["effects"] += len(effects)
+            db.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, run_id) VALUES (?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, run_id),
+            )
+    return stats
+
+
+def prefix_range(prefix: str) -> List[str]:
+    """Bounds for `col >= ? AND col < ?` matching a hex-digest prefix through the index."""
+    return [prefix, prefix + "~"]
+
+
+def resolve_run(db: sqlite3.Connection, ref: str) -> int:
+    """A run id, or the latest run of the input_sha256 starting with ref."""
+    if ref.isdigit() and db.execute("SELECT 1 FROM runs WHERE id = ?", (int(ref),)).fetchone():
+        return int(ref)
+    rows = db.execute(
+        "SELECT id, input_sha256 FROM runs WHERE input_sha256 >= ? AND input_sha256 < ? ORDER BY observed_at DESC, id DESC",
+        prefix_range(ref),
+    ).fetchall()
+    inputs = {r[1] for r in rows}
+    if not rows:
+        raise KeyError(f"no run matches {ref!r}")
+    if len(inputs) > 1:
+        raise KeyError(f"{ref!r} matches {len(inputs)} inputs; use a longer prefix")
+    return rows[0][0]
+
+
+def effect_query(args: argparse.Namespace) -> Tuple[str, List[Any]]:
+    where: List[str] = []
+    params: List[Any] = []
+    if args.kind:
+        where.append("e.kind = ?")
+        params.append(args.kind)
+    if args.cmd:
+        # Exact commands hit the cmd index; `%` patterns fall back to LIKE.
+        where.append("e.cmd LIKE ?" if "%" in args.cmd else "e.cmd = ?")
+        params.append(args.cmd)
+    if args.status is not None:
+        where.append("e.status = ?")
+        params.append(args.status)
+    if args.ok is not None:
+        where.append("e.ok = ?")
+        params.append(args.ok)
+    if args.input:
+        where.append("r.input_sha256 >= ? AND r.input_sha256 < ?")
+        params += prefix_range(args.input)
+    sql = (
+        "SELECT e.run_id, r.input_sha256, r.observed_at, e.seq, e.kind, e.ok, e.status, e.stdout_sha256, e.wall_s,"
+        " e.cached, COALESCE(e.cmd, e.op) FROM effects e JOIN runs r ON r.id = e.run_id"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY r.observed_at DESC, e.run_id DESC, e.seq LIMIT ?"
+    return sql, params + [args.limit]
+
+
+def emit(rows: Sequence[Sequence[Any]], header: Sequence[str], as_json: bool) -> None:
+    if as_json:
+        for row in rows:
+            print(json.dumps(dict(zip(header, row))))
+        return
+    print("\t".join(header))
+    for row in rows:
+        print("\t".join("" if v is None else str(v) for v in row))
+
+
+def effect_identity(effect: Dict[str, Any]) -> Tuple[str, str]:
+    return str(effect.get("kind")), str(effect.get("cmd") if effect.get("cmd") is not None else effect.get("op"))
+
+
+def diff_runs(db: sqlite3.Connection, a: int, b: int) -> List[Tuple[str, str, str, str, str]]:
+    """(change, kind, cmd, before, after) for effects matched by (kind, cmd/op, occurrence)."""
+
+    def load(run_id: int) -> Dict[Tuple[str, str, int], Dict[str, Any]]:
+        out: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+        seen: Dict[Tuple[str, str], int] = {}
+        for (data,) in db.execute("SELECT data FROM effects WHERE run_id = ? ORDER BY seq", (run_id,)):
+            effect = json.loads(data)
+            ident = effect_identity(effect)
+            n = seen[ident] = seen.get(ident, 0) + 1
+            out[ident + (n,)] = effect
+        return out
+
+    def brief(effect: Dict[str, Any]) -> str:
+        parts = [f"{k}={effect[k]}" for k in ("ok", "status", "stdout_sha256", "reason") if k in effect]
+        return " ".join(parts)
+
+    before, after = load(a), load(b)
+    changes: List[Tuple[str, str, str, str, str]] = []
+    for key in list(before) + [k for k in after if k not in before]:
+        x, y = before.get(key), after.get(key)
+        if x is None:
+            changes.append(("added", key[0], key[1], "", brief(y)))
+        elif y is None:
+            changes.append(("removed", key[0], key[1], brief(x), ""))
+        elif brief(x) != brief(y):
+            changes.append(("changed", key[0], key[1], brief(x), brief(y)))
+    return changes
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Index receipt_v1 files into SQLite and query them")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    ap.add_argument("--json", action="store_true", help="Print JSON lines instead of TSV")
+    # The same options after the subcommand; SUPPRESS keeps them from resetting the top-level values.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=argparse.SUPPRESS, help="SQLite database")
+    common.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="Print JSON lines instead of TSV")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", parents=[common], help="Add new or changed receipts")
+    p.add_argument("paths", nargs="*", default=[DEFAULT_RECEIPTS])
+
+    p = sub.add_parser("runs", parents=[common], help="List indexed runs, newest first")
+    p.add_argument("--input", default="", help="input_sha256 prefix")
+    p.add_argument("--limit", type=int, default=50)
+
+    p = sub.add_parser("query", parents=[common], help="Find effects")
+    p.add_argument("--kind", default="", help="Effect kind (exec, blocked, ...)")
+    p.add_argument("--cmd", default="", help="Exact command, or a LIKE pattern containing %%")
+    p.add_argument("--status", type=int, default=None)
+    p.add_argument("--ok", type=int, choices=(0, 1), default=None)
+    p.add_argument("--input", default="", help="input_sha256 prefix")
+    p.add_argument("--limit", type=int, default=100)
+
+    p = sub.add_parser("history", parents=[common], help="One command across runs, oldest first")
+    p.add_argument("--cmd", required=True, help="Exact command, or a LIKE pattern containing %%")
+    p.add_argument("--limit", type=int, default=1000)
+
+    p = sub.add_parser("diff", parents=[common], help="Compare the effects of two runs")
+    p.add_argument("run_a")
+    p.add_argument("run_b")
+
+    args = ap.parse_args()
+    db = connect(Path(args.db))
+    try:
+        if args.command == "ingest":
+            stats = ingest(db, iter_receipt_files(Path(p) for p in args.paths))
+            total = db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            print("receipt_index_ok=1 " + " ".join(f"{k}={v}" for k, v in stats.items()) + f" runs={total} db={args.db}")
+        elif args.command == "runs":
+            sql = "SELECT id, input_sha256, observed_at, effects, failed, blocked, path FROM runs"
+            params: List[Any] = []
+            if args.input:
+                sql += " WHERE input_sha256 >= ? AND input_sha256 < ?"
+                params += prefix_range(args.input)
+            sql += " ORDER BY observed_at DESC, id DESC LIMIT ?"
+            rows = db.execute(sql, params + [args.limit]).fetchall()
+            emit(rows, ("run", "input_sha256", "observed_at", "effects", "failed", "blocked", "path"), args.json)
+        elif args.command == "query":
+            sql, params = effect_query(args)
+            header = ("run", "input_sha256", "observed_at", "seq", "kind", "ok", "status", "stdout_sha256", "wall_s", "cached", "cmd")
+            emit(db.execute(sql, params).fetchall(), header, args.json)
+        elif args.command == "history":
+            op = "LIKE" if "%" in args.cmd else "="
+            rows = db.execute(
+                "SELECT e.run_id, r.observed_at, e.ok, e.status, e.stdout_sha256, e.wall_s, e.cached FROM effects e"
+                f" JOIN runs r ON r.id = e.run_id WHERE e.cmd {op} ? ORDER BY r.observed_at, e.run_id, e.seq LIMIT ?",
+                (args.cmd, args.limit),
+            ).fetchall()
+            # Mark the runs where the command's output changed.
+            out: List[Tuple[Any, ...]] = []
+            prev: Optional[str] = None
+            for i, row in enumerate(rows):
+                out.append(row + (int(i > 0 and row[4] != prev),))
+                prev = row[4]
+            emit(out, ("run", "observed_at", "ok", "status", "stdout_sha256", "wall_s", "cached", "stdout_changed"), args.json)
+        else:
+            try:
+                a, b = resolve_run(db, args.run_a), resolve_run(db, args.run_b)
+            except KeyError as e:
+                print(f"diff: {e.args[0]}", file=sys.stderr)
+                return 2
+            changes = diff_runs(db, a, b)
+            emit(changes, ("change", "kind", "cmd", "before", "after"), args.json)
+            print(f"diff_ok=1 run_a={a} run_b={b} changes={len(changes)}", file=sys.stderr)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Per-stage run metrics for the Python tools, written as receipt-style JSON.
+
+The layout follows the engine's receipt_v1 (`version`, `deterministic`,
+`input_sha256`, `effects`) so a metrics file can sit next to the UTIR receipts;
+each pipeline stage is one effect of kind "stage":
+
+  {
+    "version": "metrics_v1",
+    "tool": "extract_nomenclature",
+    "cmd": "...", "ok": true, "status": 0,
+    "deterministic": false, "input_sha256": null,
+    "effects": [
+      {"kind": "stage", "op": "sources", "ok": true, "wall_s": 0.12, "cpu_s": 0.11,
+       "peak_rss_mb": 41.2, "bytes_read": 52311, "bytes_written": 0, "counts": {...}}
+    ],
+    "totals": {"wall_s": ..., "cpu_s": ..., "peak_rss_mb": ..., "bytes_read": ..., "bytes_written": ...}
+  }
+
+peak_rss_mb is the process high-water mark at the end of the stage; bytes are
+read/write syscall totals from /proc/self/io (null where unavailable). Work done in
+process-pool workers shows up in wall_s only.
+
+With a profile directory, the whole run is recorded with cProfile
+(`<tool>.prof`) and tracemalloc snapshots are dumped after every stage
+(`<tool>.<stage>.tracemalloc`), with the stage's Python allocation peak added
+to its effect as `py_peak_bytes`.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX
+    resource = None  # type: ignore[assignment]
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS.
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def io_counters() -> Optional[Dict[str, int]]:
+    try:
+        with open("/proc/self/io", "rb") as f:
+            raw = f.read()
+        fields = dict(line.split(b":", 1) for line in raw.splitlines() if b":" in line)
+        # rchar excludes this read; "probe" lets io_delta discount it from the next sample.
+        return {"read": int(fields[b"rchar"]), "written": int(fields[b"wchar"]), "probe": len(raw)}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def io_delta(before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]) -> Dict[str, Optional[int]]:
+    if not before or not after:
+        return {"bytes_read": None, "bytes_written": None}
+    return {
+        "bytes_read": after["read"] - before["read"] - before["probe"],
+        "bytes_written": after["written"] - before["written"],
+    }
+
+
+class Stage:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts: Dict[str, int] = {}
+
+    def count(self, key: str, n: int = 1) -> None:
+        self.counts[key] = self.counts.get(key, 0) + n
+
+
+class RunMetrics:
+    """Collects per-stage metrics; a disabled instance makes every call a cheap no-op."""
+
+    def __init__(self, tool: str, enabled: bool = True, profile_dir: Optional[Path] = None) -> None:
+        self.tool = tool
+        self.enabled = enabled or profile_dir is not None
+        self.profile_dir = profile_dir
+        self.effects: List[Dict[str, Any]] = []
+        self.info: Dict[str, Any] = {"deterministic": False, "input_sha256": None}
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        self._io0 = io_counters()
+        self._profiler = None
+        if profile_dir is not None:
+            import cProfile
+
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            tracemalloc.start()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        st = Stage(name)
+        if not self.enabled:
+            yield st
+            return
+        if self._profiler is not None:
+            tracemalloc.reset_peak()
+        t0, c0, io0 = time.perf_counter(), time.process_time(), io_counters()
+        ok = False
+        try:
+            yield st
+            ok = True
+        finally:
+            io1 = io_counters()
+            effect: Dict[str, Any] = {
+                "kind": "stage",
+                "op": name,
+                "ok": ok,
+                "wall_s": round(time.perf_counter() - t0, 6),
+                "cpu_s": round(time.process_time() - c0, 6),
+                "peak_rss_mb": peak_rss_mb(),
+                **io_delta(io0, io1),
+                "counts": st.counts,
+            }
+            if self._profiler is not None:
+                effect["py_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.take_snapshot().dump(str(self.profile_dir / f"{self.tool}.{name}.tracemalloc"))
+            self.effects.append(effect)
+
+    def document(self, status: int) -> Dict[str, Any]:
+        io1 = io_counters()
+        return {
+            "version": "metrics_v1",
+            "tool": self.tool,
+            "cmd": " ".join(sys.argv),
+            "ok": status == 0,
+            "status": status,
+            **self.info,
+            "effects": self.effects,
+            "totals": {
+                "wall_s": round(time.perf_counter() - self._t0, 6),
+                "cpu_s": round(time.process_time() - self._c0, 6),
+                "peak_rss_mb": peak_rss_mb(),
+                **io_delta(self._io0, io1),
+            },
+        }
+
+    def finish(self, path: Optional[Path], status: int) -> None:
+        """Stop profiling (dumping `<tool>.prof`) and write the metrics document to path, if given."""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(str(self.profile_dir / f"{self.tool}.prof"))
+            self._profiler = None
+            tracemalloc.stop()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.document(status), indent=2) + "\n", encoding="utf-8")
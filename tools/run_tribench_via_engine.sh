@@ -6,6 +6,10 @@ set -euo pipefail
 #
 # Usage:
 #   ENGINE_REPO=/path/to/meta3-engine-repo ./tools/run_tribench_via_engine.sh
+#
+# UTIR_RUNNER=local executes the UTIR with tools/utir_runner.py instead of the
+# meta3-graph-core binary; steps whose command and inputs are unchanged since the
+# last successful run are skipped (see libraries/receipts_utir.md).
 
 ENGINE_REPO="${ENGINE_REPO:-}"
 if [[ -z "$ENGINE_REPO" ]]; then
@@ -38,15 +42,6 @@ cat >"$UTIR_PATH" <<'JSON'
           "allow_network": false,
           "capture_output": true
         },
-        {
-          "type": "shell",
-          "command": "mkdir -p _export/meta3-canonical/showcases/tribench/nomenclature && cp -f _export/meta3-canonical/concepts/concepts.json _export/meta3-canonical/showcases/tribench/nomenclature/concepts.json && cp -f _export/meta3-canonical/concepts/glossary.md _export/meta3-canonical/showcases/tribench/nomenclature/glossary.md && cp -f _export/meta3-canonical/graphs/nomenclature.hypergraph.json _export/meta3-canonical/showcases/tribench/nomenclature/hypergraph.json",
-          "timeout": "300s",
-          "working_dir": ".",
-          "env": {},
-          "allow_network": false,
-          "capture_output": true
-        },
         {
           "type": "shell",
           "command": "mkdir -p _export/meta3-canonical/showcases/tribench/capability && cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin graph_capability_graph -- --catalog dist/meta3-engine-v0.5.0/config/capabilities.json --out _export/meta3-canonical/showcases/tribench/capability/hypergraph.json --run-id tribench-demo && cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin capability_report -- --catalog dist/meta3-engine-v0.5.0/config/capabilities.json --out _export/meta3-canonical/showcases/tribench/capability/capability_report.md --root .",
@@ -58,7 +53,7 @@ cat >"$UTIR_PATH" <<'JSON'
         },
         {
           "type": "shell",
-          "command": "mkdir -p _export/meta3-canonical/showcases/tribench/mission-bridge && cp -f tests/graph_core/fixtures/hyper_small.json _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json && cp -f tests/graph_core/fixtures/mission_small.json _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json && cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin merge_mission_hypergraph -- --hyper _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json --mission _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json --out _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json --scope full && python3 scripts/graph_core_eval.py --hyper _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json --mission _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json --merged _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json --scope full --min-precision 1.0 --min-recall 1.0 --out _export/meta3-canonical/showcases/tribench/mission-bridge/eval.json",
+          "command": "python3 _export/meta3-canonical/tools/artifact_store.py publish tests/graph_core/fixtures/hyper_small.json _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json && python3 _export/meta3-canonical/tools/artifact_store.py publish tests/graph_core/fixtures/mission_small.json _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json && cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin merge_mission_hypergraph -- --hyper _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json --mission _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json --out _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json --scope full && python3 scripts/graph_core_eval.py --hyper _export/meta3-canonical/showcases/tribench/mission-bridge/hypergraph.json --mission _export/meta3-canonical/showcases/tribench/mission-bridge/mission_graph.json --merged _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json --scope full --min-precision 1.0 --min-recall 1.0 --out _export/meta3-canonical/showcases/tribench/mission-bridge/eval.json",
           "timeout": "600s",
           "working_dir": ".",
           "env": {},
@@ -89,13 +84,31 @@ cat >"$UTIR_PATH" <<'JSON'
     },
     {
       "type": "shell",
-      "command": "python3 _export/meta3-canonical/tools/tribench/merge_hypergraphs.py --run-id tribench-demo --out _export/meta3-canonical/showcases/tribench/tribench.hypergraph.json --inputs _export/meta3-canonical/showcases/tribench/nomenclature/hypergraph.json _export/meta3-canonical/showcases/tribench/capability/hypergraph.json _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json",
+      "command": "python3 _export/meta3-canonical/tools/artifact_store.py publish _export/meta3-canonical/concepts/concepts.json _export/meta3-canonical/showcases/tribench/nomenclature/concepts.json && python3 _export/meta3-canonical/tools/artifact_store.py publish _export/meta3-canonical/concepts/glossary.md _export/meta3-canonical/showcases/tribench/nomenclature/glossary.md && python3 _export/meta3-canonical/tools/artifact_store.py publish _export/meta3-canonical/graphs/nomenclature.hypergraph.json _export/meta3-canonical/showcases/tribench/nomenclature/hypergraph.json",
+      "timeout": "300s",
+      "working_dir": ".",
+      "env": {},
+      "allow_network": false,
+      "capture_output": true
+    },
+    {
+      "type": "shell",
+      "command": "python3 _export/meta3-canonical/tools/tribench/merge_hypergraphs.py --sidecar --run-id tribench-demo --out _export/meta3-canonical/showcases/tribench/tribench.hypergraph.json --inputs _export/meta3-canonical/showcases/tribench/nomenclature/hypergraph.json _export/meta3-canonical/showcases/tribench/capability/hypergraph.json _export/meta3-canonical/showcases/tribench/mission-bridge/merged.hypergraph.json",
       "timeout": "60s",
       "working_dir": ".",
       "env": {},
       "allow_network": false,
       "capture_output": true
     },
+    {
+      "type": "shell",
+      "command": "python3 _export/meta3-canonical/tools/graph_tiles.py _export/meta3-canonical/showcases/tribench/tribench.hypergraph.json --out _export/meta3-canonical/showcases/tribench/tiles --by subgraph",
+      "timeout": "120s",
+      "working_dir": ".",
+      "env": {},
+      "allow_network": false,
+      "capture_output": true
+    },
     {
       "type": "shell",
       "command": "cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin render_hypergraph -- --in _export/meta3-canonical/showcases/tribench/tribench.hypergraph.json --out _export/meta3-canonical/showcases/tribench/tribench",
@@ -113,14 +126,21 @@ cd "$ENGINE_REPO"
 
 mkdir -p "$OUT/utir"
 
-GRAPH_SANDBOX_ROOT="$ENGINE_REPO" \
-CARGO_TARGET_DIR="$ENGINE_REPO/target" \
-cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin meta3-graph-core -- \
-  --receipt --deterministic --receipt-dir "_export/meta3-canonical/showcases/tribench/utir" \
-  < <(python3 -c 'import json; import sys; print(json.dumps(json.load(open(sys.argv[1], "r", encoding="utf-8"))))' "$UTIR_PATH")
+if [[ "${UTIR_RUNNER:-engine}" == "local" ]]; then
+  GRAPH_SANDBOX_ROOT="$ENGINE_REPO" \
+  CARGO_TARGET_DIR="$ENGINE_REPO/target" \
+  python3 "$ROOT/tools/utir_runner.py" "$UTIR_PATH" \
+    --deterministic --receipt-dir "_export/meta3-canonical/showcases/tribench/utir"
+else
+  GRAPH_SANDBOX_ROOT="$ENGINE_REPO" \
+  CARGO_TARGET_DIR="$ENGINE_REPO/target" \
+  cargo run --quiet --manifest-path meta3-graph-core/Cargo.toml --bin meta3-graph-core -- \
+    --receipt --deterministic --receipt-dir "_export/meta3-canonical/showcases/tribench/utir" \
+    < <(python3 -c 'import json; import sys; print(json.dumps(json.load(open(sys.argv[1], "r", encoding="utf-8"))))' "$UTIR_PATH")
+fi
 
-# Copy viewer entrypoints into docs for GitHub Pages.
-mkdir -p "$ROOT/docs/tribench"
-cp -f "$OUT/tribench/index.html" "$ROOT/docs/tribench/index.html"
+# Publish viewer entrypoints into docs for GitHub Pages (hardlinks via the artifact store).
+python3 "$ROOT/tools/artifact_store.py" publish "$OUT/tribench/index.html" "$ROOT/docs/tribench/index.html" >/dev/null
+python3 "$ROOT/tools/artifact_store.py" publish --tree "$OUT/tiles" "$ROOT/docs/tribench/tiles" >/dev/null
 
 echo "tribench_ok=1 out=$OUT"
@@ -1,14 +1,104 @@
 #!/usr/bin/env python3
+"""
+Merge per-track hypergraphs into one TriBench hypergraph.
+
+Inputs are decoded incrementally (optionally in a process pool, one input per
+worker) into per-input spool files of pre-rendered nodes/hyperedges. The merged
+document is then streamed out input by input, so only the id-dedup sets stay
+resident. Output order and collision handling match the original in-memory merge:
+run node, then per input its SUBGRAPH node and nodes; run_has_subgraph edge, then
+its hyperedges, with colliding edge ids prefixed by `{gid}:`.
+
+With `--dedup content`, exact duplicates are also collapsed: hyperedges by a hash
+of (kind, sorted causes, sorted effects, data) regardless of id, nodes by a hash of
+their full payload. Collapsed items are not re-emitted; the subgraphs that
+contributed them are recorded under `metadata.provenance` instead.
+"""
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import sys
+import tempfile
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph_io import FORMATS, JsonDocumentWriter, iter_document, render_item  # noqa: E402
+from graph_sidecar import build_sidecar, sidecar_path  # noqa: E402
+from hypergraph_bin import BinaryHypergraphWriter  # noqa: E402
+from run_metrics import RunMetrics  # noqa: E402
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def content_key(kind: str, item: dict) -> str:
+    """Hex digest identifying an element by content (edges ignore their id)."""
+    if kind == "hyperedges":
+        key = [
+            item.get("kind"),
+            sorted(_canonical(c) for c in (item.get("causes") or [])),
+            sorted(_canonical(e) for e in (item.get("effects") or [])),
+            item.get("data"),
+        ]
+    else:
+        key = item
+    return hashlib.blake2b(_canonical(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def spool_input(path: str, spool_dir: str, index: int, fmt: str, dedup: str = "id") -> Tuple[str, str, str]:
+    """
+    Decode one input graph into two spool files (nodes, hyperedges). Each line is
+    `<id as JSON>\\t<content key or empty>\\t<element rendered for fmt, newlines as
+    tabs>`; JSON text never contains raw tabs, so the separators are unambiguous.
+    Returns (gid, nodes, edges).
+    """
+    nodes_path = Path(spool_dir) / f"{index}.nodes"
+    edges_path = Path(spool_dir) / f"{index}.edges"
+    gid = None
+    with nodes_path.open("w", encoding="utf-8") as nf, edges_path.open("w", encoding="utf-8") as ef:
+        for rec, key, value in iter_document(Path(path)):
+            if rec == "value" and key == "id":
+                gid = value
+            if rec != "item" or not isinstance(value, dict):
+                continue
+            if key == "nodes":
+                out = nf
+            elif key == "hyperedges":
+                out = ef
+            else:
+                continue
+            vid = value.get("id")
+            if not vid:
+                continue
+            ckey = content_key(key, value) if dedup == "content" else ""
+            out.write(json.dumps(vid) + "\t" + ckey + "\t" + render_item(value, fmt).replace("\n", "\t") + "\n")
+    return str(gid or Path(path).stem), str(nodes_path), str(edges_path)
+
 
+def _spool_lines(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            vid, ckey, text = line.rstrip("\n").split("\t", 2)
+            yield vid, ckey, text.replace("\t", "\n")
 
-def load(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+
+def _rename(text: str, old_id: str, new_id: str, fmt: str) -> str:
+    """Swap the id of a pre-rendered element; splices text when "id" is the first key."""
+    head = '{"id":' if fmt != "pretty" else '{\n      "id": '
+    end = len(head) + len(old_id)
+    # The id must end there: a numeric id 1 is also a prefix of 10.
+    if text.startswith(head + old_id) and text[end : end + 1] in (",", "}", "\n"):
+        return head + new_id + text[end:]
+    e = json.loads(text)
+    e["id"] = json.loads(new_id)
+    return render_item(e, fmt)
 
 
 def main() -> int:
@@ -16,61 +106,185 @@ def main() -> int:
     ap.add_argument("--out", required=True)
     ap.add_argument("--run-id", required=True)
     ap.add_argument("--inputs", nargs="+", required=True)
+    ap.add_argument("--jobs", type=int, default=1, help="Decode inputs concurrently in a process pool of this size")
+    ap.add_argument(
+        "--format",
+        choices=FORMATS + ("binary",),
+        default="pretty",
+        help="Output layout; binary writes an .m3hg container (inputs may be JSON, NDJSON or .m3hg)",
+    )
+    ap.add_argument(
+        "--dedup",
+        choices=("id", "content"),
+        default="id",
+        help="id: drop repeated node ids, prefix repeated edge ids; content: also collapse exact duplicates",
+    )
+    ap.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Also write the viewer analytics sidecar next to --out (see tools/graph_sidecar.py)",
+    )
+    ap.add_argument("--metrics-out", default="", help="Write per-stage metrics (receipt-style JSON) to this path")
+    ap.add_argument("--profile", default="", metavar="DIR", help="Dump a cProfile run and per-stage tracemalloc snapshots here")
     args = ap.parse_args()
 
-    nodes: List[dict] = []
-    hyperedges: List[dict] = []
+    metrics = RunMetrics("merge_hypergraphs", enabled=bool(args.metrics_out), profile_dir=Path(args.profile) if args.profile else None)
+    status = 1
+    try:
+        status = run(args, metrics)
+    finally:
+        metrics.finish(Path(args.metrics_out) if args.metrics_out else None, status)
+    return status
+
+
+def run(args: argparse.Namespace, metrics: RunMetrics) -> int:
     seen_nodes: Set[str] = set()
     seen_edges: Set[str] = set()
+    # content key -> (kept element id as JSON, index of first contributing input)
+    node_content: Dict[str, Tuple[str, int]] = {}
+    edge_content: Dict[str, Tuple[str, int]] = {}
+    provenance: Dict[str, Dict[str, Set[int]]] = {"nodes": {}, "hyperedges": {}}
+    stats = {"nodes": 0, "hyperedges": 0, "nodes_collapsed": 0, "hyperedges_collapsed": 0, "node_id_conflicts": 0}
 
-    root_id = f"RUN:{args.run_id}"
-    nodes.append({"id": root_id, "kind": "run", "label": args.run_id, "data": None})
-    seen_nodes.add(root_id)
-
-    edge_i = 0
-    for p in args.inputs:
-        g = load(Path(p))
-        gid = g.get("id") or Path(p).stem
-        sub_id = f"SUBGRAPH:{gid}"
-        if sub_id not in seen_nodes:
-            nodes.append({"id": sub_id, "kind": "subgraph", "label": str(gid), "data": {"path": p}})
-            seen_nodes.add(sub_id)
-        hid = f"edge:run_has_subgraph:{edge_i}"
-        hyperedges.append({"id": hid, "kind": "run_has_subgraph", "causes": [root_id], "effects": [sub_id], "data": None})
-        edge_i += 1
-
-        for n in g.get("nodes", []):
-            nid = n.get("id")
-            if not nid or nid in seen_nodes:
-                continue
-            nodes.append(n)
-            seen_nodes.add(nid)
+    def collapse(section: str, kept: Tuple[str, int], i: int) -> None:
+        kept_id, first = kept
+        provenance[section].setdefault(kept_id, {first}).add(i)
+        stats[f"{section}_collapsed"] += 1
 
-        for e in g.get("hyperedges", []):
-            eid = e.get("id")
-            if not eid:
-                continue
-            # Avoid collisions by prefixing duplicates.
-            if eid in seen_edges:
-                eid = f"{gid}:{eid}"
-                e = dict(e)
-                e["id"] = eid
-            if eid in seen_edges:
-                continue
-            seen_edges.add(eid)
-            hyperedges.append(e)
-
-    out = {
-        "id": "tribench",
-        "nodes": nodes,
-        "hyperedges": hyperedges,
-        "metadata": {"run_id": args.run_id, "generated_at": "", "source": "tribench_merge"},
-    }
-    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
-    Path(args.out).write_text(json.dumps(out, indent=2) + "\n", encoding="utf-8")
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    binary = args.format == "binary"
+    # Binary output is assembled from compact JSON spools.
+    spool_fmt = "compact" if binary else args.format
+    with tempfile.TemporaryDirectory(prefix="tribench_merge_") as spool_dir:
+        pool: Optional[ProcessPoolExecutor] = None
+        if args.jobs > 1 and len(args.inputs) > 1:
+            pool = ProcessPoolExecutor(max_workers=min(args.jobs, len(args.inputs)))
+        try:
+            futures: List[Future] = []
+            spools: List[Tuple[str, str, str]] = []
+            if pool is not None:
+                futures = [
+                    pool.submit(spool_input, p, spool_dir, i, spool_fmt, args.dedup) for i, p in enumerate(args.inputs)
+                ]
+
+            def spooled(i: int) -> Tuple[str, str, str]:
+                while len(spools) <= i:
+                    j = len(spools)
+                    spools.append(
+                        futures[j].result()
+                        if pool is not None
+                        else spool_input(args.inputs[j], spool_dir, j, spool_fmt, args.dedup)
+                    )
+                return spools[i]
+
+            with nullcontext() if binary else out_path.open("w", encoding="utf-8") as fp:
+                w = BinaryHypergraphWriter(out_path) if binary else JsonDocumentWriter(fp, args.format)
+                w.member("id", "tribench")
+
+                # Inputs are decoded on first use, so the "nodes" stage also covers spooling them.
+                with metrics.stage("nodes") as st:
+                    w.begin_array("nodes")
+                    root_id = f"RUN:{args.run_id}"
+                    w.item({"id": root_id, "kind": "run", "label": args.run_id, "data": None})
+                    seen_nodes.add(json.dumps(root_id))
+                    stats["nodes"] += 1
+                    for i, p in enumerate(args.inputs):
+                        gid, nodes_spool, _ = spooled(i)
+                        sub_id = f"SUBGRAPH:{gid}"
+                        if json.dumps(sub_id) not in seen_nodes:
+                            w.item({"id": sub_id, "kind": "subgraph", "label": str(gid), "data": {"path": p}})
+                            seen_nodes.add(json.dumps(sub_id))
+                            stats["nodes"] += 1
+                        for nid, ckey, text in _spool_lines(nodes_spool):
+                            if ckey and ckey in node_content:
+                                collapse("nodes", node_content[ckey], i)
+                                continue
+                            if nid in seen_nodes:
+                                # Same id, different payload: first one wins, as in id mode.
+                                if ckey:
+                                    stats["node_id_conflicts"] += 1
+                                continue
+                            if ckey:
+                                node_content[ckey] = (nid, i)
+                            w.item_raw(text)
+                            seen_nodes.add(nid)
+                            stats["nodes"] += 1
+                    w.end_array()
+                    st.count("inputs", len(args.inputs))
+                    st.count("nodes", stats["nodes"])
+                    st.count("nodes_collapsed", stats["nodes_collapsed"])
+
+                with metrics.stage("hyperedges") as st:
+                    renamed = dropped = 0
+                    w.begin_array("hyperedges")
+                    for i, _ in enumerate(args.inputs):
+                        gid, _, edges_spool = spooled(i)
+                        w.item(
+                            {
+                                "id": f"edge:run_has_subgraph:{i}",
+                                "kind": "run_has_subgraph",
+                                "causes": [root_id],
+                                "effects": [f"SUBGRAPH:{gid}"],
+                                "data": None,
+                            }
+                        )
+                        stats["hyperedges"] += 1
+                        for eid, ckey, text in _spool_lines(edges_spool):
+                            if ckey and ckey in edge_content:
+                                collapse("hyperedges", edge_content[ckey], i)
+                                continue
+                            # Avoid collisions by prefixing duplicates.
+                            if eid in seen_edges:
+                                new_eid = json.dumps(f"{gid}:{json.loads(eid)}")
+                                if new_eid in seen_edges:
+                                    dropped += 1
+                                    continue
+                                text = _rename(text, eid, new_eid, spool_fmt)
+                                eid = new_eid
+                                renamed += 1
+                            if ckey:
+                                edge_content[ckey] = (eid, i)
+                            seen_edges.add(eid)
+                            w.item_raw(text)
+                            stats["hyperedges"] += 1
+                    w.end_array()
+                    st.count("hyperedges", stats["hyperedges"])
+                    st.count("hyperedges_renamed", renamed)
+                    st.count("hyperedges_dropped", dropped)
+                    st.count("hyperedges_collapsed", stats["hyperedges_collapsed"])
+
+                with metrics.stage("metadata"):
+                    metadata: Dict[str, Any] = {"run_id": args.run_id, "generated_at": "", "source": "tribench_merge"}
+                    if args.dedup == "content":
+                        sub_ids = [f"SUBGRAPH:{spooled(i)[0]}" for i in range(len(args.inputs))]
+                        metadata["dedup"] = "content"
+                        metadata["merge_stats"] = stats
+                        metadata["provenance"] = {
+                            section: {json.loads(k): sorted({sub_ids[i] for i in v}) for k, v in entries.items()}
+                            for section, entries in provenance.items()
+                        }
+                    w.member("metadata", metadata)
+                    w.close()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    summary_extra = ""
+    if args.sidecar:
+        with metrics.stage("sidecar") as st:
+            sc = build_sidecar(out_path, sidecar_path(out_path))
+            st.count("pairs", sc.pairs)
+            st.count("components", sc.components)
+        summary_extra = f" sidecar={sidecar_path(out_path)}"
+
+    print(
+        f"merge_ok=1 dedup={args.dedup} nodes={stats['nodes']} hyperedges={stats['hyperedges']}"
+        f" nodes_collapsed={stats['nodes_collapsed']} hyperedges_collapsed={stats['hyperedges_collapsed']}"
+        f" bytes={out_path.stat().st_size} out={out_path}{summary_extra}"
+    )
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Run a UTIR document locally with asyncio subprocesses and write a receipt_v1.
+
+Supported operations (the subset the showcases use):
+  shell        command, timeout ("300s", "5m", "500ms"), working_dir, env, capture_output
+  parallel     steps, max_concurrency
+  conditional  condition op; then_op when it succeeds, else_op otherwise
+  fs.write     path, content, mode, create_dirs
+
+Paths (working_dir, fs.write targets) are resolved against the sandbox root
+(--root, else $GRAPH_SANDBOX_ROOT, else the current directory); anything that
+resolves outside it is recorded as a `blocked` effect instead of being run.
+`allow_network` is recorded in the plan only: a local runner cannot enforce it.
+
+The receipt mirrors meta3-graph-core's: `input_sha256` is the sha256 of the
+document as `json.dumps` renders it, the file lands in
+`<receipt-dir>/receipts/pkt-1-<sha[:12]>/receipt.json`, and every shell step is
+an `exec` effect with `stdout_sha256` when it printed anything. Effects are listed
+in plan order (not completion order), so parallel groups produce stable receipts.
+
+Step cache: after a run, each successful shell step is stored in the cache file
+(default `<root>/.utir_cache/step_cache.json`) with the content hashes of its inputs, i.e. every
+file or directory its command line names (`--opt=value` values included, resolved
+against working_dir), plus the crate directory, path dependencies and Cargo.lock of a
+`cargo` command's manifest and the local modules a `python3 script.py` imports
+(transitively). Other implicit dependencies (files a program opens without naming
+them, `python3 -m`, shell scripts) are not seen; use --no-cache after changing
+those. `$NAME` / `${NAME}` in a command are expanded with the step's effective
+environment (the runner's plus the step's env) before keying and fingerprinting; a step
+whose command still contains a `$` afterwards (unset variables, `$(...)`, `$1`) is
+never cached. A later run skips a step whose expanded command, working_dir, env
+and input hashes all still match, and records its previous result with
+`"cached": true`. Input hashes are taken once all steps have finished, so a
+step's own outputs count as inputs: deleting or editing them re-runs the step, and
+a changed upstream output re-runs every step that names it. Files are re-hashed
+only when their (mtime, size) changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shlex
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+CACHE_VERSION = "utir_step_cache_v1"
+DEFAULT_CACHE = ".utir_cache/step_cache.json"
+# Directory names never fingerprinted: VCS/tool state and build trees that
+# do not change a step's result (and would be expensive to walk).
+SKIP_DIRS = {"target", "node_modules", "__pycache__"}
+_DURATION = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(ms|s|m|h)?\s*$")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, None: 1.0}
+_CARGO_PATH = re.compile(r'\bpath\s*=\s*"([^"]+)"')
+
+
+def parse_timeout(value: Any) -> Optional[float]:
+    """Seconds for a UTIR timeout ("300s", "5m", "500ms", or a bare number); None for no limit."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _DURATION.match(str(value))
+    if not m:
+        raise ValueError(f"bad timeout: {value!r}")
+    return float(m.group(1)) * _UNITS[m.group(2)]
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def input_sha256(doc: Any) -> str:
+    """The engine's receipt key: sha256 of the document as json.dumps renders it."""
+    return sha256_hex(json.dumps(doc).encode("utf-8"))
+
+
+_ENV_REF = re.compile(r"\$(?:\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))")
+
+
+def within(path: Path, root: Path) -> bool:
+    return path == root or root in path.parents
+
+
+def _tokens(command: str) -> List[str]:
+    try:
+        return shlex.split(command, comments=True)
+    except ValueError:
+        return command.split()
+
+
+def command_paths(command: str, cwd: Path) -> List[Path]:
+    """Existing files/directories named on a shell command line, resolved against cwd."""
+    seen: Set[Path] = set()
+    out: List[Path] = []
+    for tok in _tokens(command):
+        # Redirections (`>/dev/null`, `2>log`) and `--opt=value` forms.
+        tok = tok.lstrip("0123456789<>&|")
+        if tok.startswith("-"):
+            if "=" not in tok:
+                continue
+            tok = tok.split("=", 1)[1]
+        if not tok or tok in ("&&", "||", ";") or "$" in tok:
+            continue
+        p = (cwd / tok).resolve()
+        if p in seen:
+            continue
+        if p.is_file() or p.is_dir():
+            seen.add(p)
+            out.append(p)
+    return out
+
+
+def _ancestors(path: Path, root: Path) -> List[Path]:
+    """path and its parents, up to and including root (just path when outside root)."""
+    out = [path]
+    while within(out[-1], root) and out[-1] != root:
+        out.append(out[-1].parent)
+    return out
+
+
+def cargo_inputs(manifest: Path, root: Path) -> List[Path]:
+    """The crate directory, its `path = "..."` dependencies and the nearest Cargo.lock."""
+    out = [manifest.parent]
+    try:
+        text = manifest.read_text(encoding="utf-8")
+    except OSError:
+        text = ""
+    for rel in _CARGO_PATH.findall(text):
+        dep = (manifest.parent / rel).resolve()
+        if dep.is_dir():
+            out.append(dep)
+    for d in _ancestors(manifest.parent, root):
+        if (d / "Cargo.lock").is_file():
+            out.append(d / "Cargo.lock")
+            break
+    return out
+
+
+def python_inputs(script: Path, root: Path) -> List[Path]:
+    """Local modules a script imports, transitively: `name.py` or package `name/` found
+    next to the importing file or in one of its parent directories up to root."""
+    out: List[Path] = []
+    seen: Set[Path] = {script}
+    todo = [script]
+    while todo:
+        f = todo.pop()
+        try:
+            tree = ast.parse(f.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        names: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(a.name.split(".")[0] for a in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = f.parents[node.level - 1]
+                    names.update(f"{base}/{m}" for m in ([node.module.split(".")[0]] if node.module else [a.name for a in node.names]))
+                elif node.module:
+                    names.add(node.module.split(".")[0])
+        for name in sorted(names):
+            dirs = [Path(name).parent] if "/" in name else _ancestors(f.parent, root)
+            for d in dirs:
+                stem = Path(name).name
+                for cand in (d / f"{stem}.py", d / stem):
+                    if cand in seen or not (cand.is_file() or (cand / "__init__.py").is_file()):
+                        continue
+                    seen.add(cand)
+                    out.append(cand)
+                    if cand.is_file():
+                        todo.append(cand)
+    return out
+
+
+def step_inputs(command: str, cwd: Path, root: Path) -> List[Path]:
+    """command_paths plus what the named programs pull in implicitly: the crate sources of a
+    `cargo ... --manifest-path M` (or cwd's Cargo.toml) and the local imports of a
+    `python3 script.py`."""
+    out = command_paths(command, cwd)
+    seen = set(out)
+    tokens = _tokens(command)
+    extra: List[Path] = []
+    for i, tok in enumerate(tokens):
+        prev = Path(tokens[i - 1]).name if i else ""
+        if tok == "cargo" or Path(tok).name == "cargo":
+            manifest = cwd / "Cargo.toml"
+            for j in range(i + 1, len(tokens)):
+                if tokens[j] in ("&&", "||", ";"):
+                    break
+                if tokens[j] == "--manifest-path" and j + 1 < len(tokens):
+                    manifest = cwd / tokens[j + 1]
+                elif tokens[j].startswith("--manifest-path="):
+                    manifest = cwd / tokens[j].split("=", 1)[1]
+            manifest = manifest.resolve()
+            if manifest.is_file():
+                extra += cargo_inputs(manifest, root)
+        elif tok.endswith(".py") and prev.startswith("python"):
+            script = (cwd / tok).resolve()
+            if script.is_file():
+                extra += python_inputs(script, root)
+    for p in extra:
+        if p not in seen:
+            seen.add(p)
+            out.append(p)
+    return out
+
+
+class Fingerprints:
+    """Content hashes of files and directory trees, memoized by (mtime_ns, size)."""
+
+    def __init__(self, known: Dict[str, List[Any]], exclude: List[Path]) -> None:
+        self.known = known
+        self.exclude = exclude
+        self.hashed = 0
+
+    def file(self, path: Path) -> Optional[str]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = str(path)
+        entry = self.known.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        h = hashlib.sha256()
+        try:
+            with path.open("rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            return None
+        self.hashed += 1
+        self.known[key] = [st.st_mtime_ns, st.st_size, h.hexdigest()]
+        return h.hexdigest()
+
+    def tree(self, root: Path) -> str:
+        h = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(root):
+            base = Path(dirpath)
+            dirnames[:] = sorted(
+                d
+                for d in dirnames
+                if not d.startswith(".") and d not in SKIP_DIRS and (base / d) not in self.exclude
+            )
+            for name in sorted(filenames):
+                p = base / name
+                if p in self.exclude or not p.is_file():
+                    continue
+                digest = self.file(p)
+                if digest is not None:
+                    h.update(f"{p.relative_to(root).as_posix()}\0{digest}\n".encode("utf-8"))
+        return "tree:" + h.hexdigest()
+
+    def of(self, paths: List[Path]) -> Dict[str, Optional[str]]:
+        return {str(p): self.tree(p) if p.is_dir() else self.file(p) for p in paths}
+
+
+@dataclass
+class StepCache:
+    path: Optional[Path]
+    steps: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    hashes: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "StepCache":
+        cache = cls(path)
+        if path is None or not path.exists():
+            return cache
+        try:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cache
+        if isinstance(doc, dict) and doc.get("version") == CACHE_VERSION:
+            cache.steps = doc.get("steps") or {}
+            cache.hashes = doc.get("hashes") or {}
+        return cache
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        doc = {"version": CACHE_VERSION, "steps": self.steps, "hashes": self.hashes}
+        tmp.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def step_env(op: Dict[str, Any]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({str(k): str(v) for k, v in (op.get("env") or {}).items()})
+    return env
+
+
+def expand_command(op: Dict[str, Any]) -> Optional[str]:
+    """The step's command with `$NAME`/`${NAME}` taken from its effective env, or None when
+    a `$` is left over (unset variable, `$(...)`, positional): such a step is not cached."""
+    env = step_env(op)
+
+    def sub(m: "re.Match[str]") -> str:
+        value = env.get(m.group(1) or m.group(2))
+        return m.group(0) if value is None else value
+
+    command = _ENV_REF.sub(sub, str(op.get("command", "")))
+    return None if "$" in command else command
+
+
+def step_key(op: Dict[str, Any], cwd: Path, command: str) -> str:
+    ident = {"command": command, "working_dir": str(cwd), "env": op.get("env") or {}}
+    return sha256_hex(json.dumps(ident, sort_keys=True).encode("utf-8"))
+
+
+class Runner:
+    def __init__(self, root: Path, cache: Optional[StepCache], exclude: List[Path], deterministic: bool) -> None:
+        self.root = root
+        self.cache = cache
+        self.deterministic = deterministic
+        self.prints = Fingerprints(cache.hashes if cache is not None else {}, exclude)
+        self.counts = {"ran": 0, "cached": 0, "failed": 0, "blocked": 0}
+        # (cache key, cwd, expanded command, effect) of every successful shell step, fingerprinted after the run.
+        self._done: List[Tuple[str, Path, str, Dict[str, Any]]] = []
+
+    def sandboxed(self, path: str) -> Optional[Path]:
+        p = (self.root / path).resolve()
+        return p if within(p, self.root) else None
+
+    def blocked(self, op: str, reason: str) -> Tuple[bool, List[Dict[str, Any]]]:
+        self.counts["blocked"] += 1
+        return False, [{"kind": "blocked", "op": op, "reason": reason}]
+
+    def lookup(self, op: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The cached effect for a shell step whose command and inputs are unchanged, else None."""
+        if self.cache is None or op.get("type") != "shell":
+            return None
+        cwd = self.sandboxed(op.get("working_dir") or ".")
+        command = expand_command(op)
+        if cwd is None or command is None:
+            return None
+        entry = self.cache.steps.get(step_key(op, cwd, command))
+        if entry is None:
+            return None
+        paths = step_inputs(command, cwd, self.root)
+        if self.prints.of(paths) != entry["inputs"]:
+            return None
+        return entry["effect"]
+
+    async def run(self, op: Any, cached: Optional[Dict[str, Any]] = None) -> Tuple[bool, List[Dict[str, Any]]]:
+        if not isinstance(op, dict):
+            return True, []
+        kind = op.get("type")
+        if kind == "shell":
+            return await self.shell(op, cached if cached is not None else self.lookup(op))
+        if kind == "parallel":
+            return await self.parallel(op)
+        if kind == "conditional":
+            ok, effects = await self.run(op.get("condition"))
+            branch_ok, more = await self.run(op.get("then_op") if ok else op.get("else_op"))
+            return branch_ok, effects + more
+        if kind == "fs.write":
+            return self.fs_write(op)
+        return self.blocked(str(kind), "unsupported operation")
+
+    async def parallel(self, op: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        steps = list(op.get("steps") or [])
+        # Cache decisions are taken before any step starts, so siblings cannot invalidate each other.
+        hits = [self.lookup(s) if isinstance(s, dict) else None for s in steps]
+        sem = asyncio.Semaphore(max(1, int(op.get("max_concurrency") or len(steps) or 1)))
+
+        async def limited(step: Any, hit: Optional[Dict[str, Any]]) -> Tuple[bool, List[Dict[str, Any]]]:
+            async with sem:
+                return await self.run(step, hit)
+
+        results = await asyncio.gather(*(limited(s, h) for s, h in zip(steps, hits)))
+        return all(ok for ok, _ in results), [e for _, step_effects in results for e in step_effects]
+
+    async def shell(self, op: Dict[str, Any], cached: Optional[Dict[str, Any]]) -> Tuple[bool, List[Dict[str, Any]]]:
+        command = str(op.get("command", ""))
+        cwd = self.sandboxed(op.get("working_dir") or ".")
+        if cwd is None:
+            return self.blocked(f"exec:{command}", "working_dir outside sandbox")
+        if cached is not None:
+            self.counts["cached"] += 1
+            effect = dict(cached, cached=True)
+            self._remember_later(op, cwd, cached)
+            return True, [effect]
+
+        env = step_env(op)
+        capture = bool(op.get("capture_output", True))
+        timeout = parse_timeout(op.get("timeout"))
+        t0 = time.perf_counter()
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            cwd=str(cwd),
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE if capture else sys.stderr,
+            stderr=asyncio.subprocess.PIPE if capture else sys.stderr,
+            start_new_session=True,
+        )
+        effect: Dict[str, Any] = {"kind": "exec", "cmd": command}
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            self.counts["failed"] += 1
+            effect.update({"ok": False, "status": None, "reason": f"timeout after {op.get('timeout')}"})
+            return False, [effect]
+        ok = proc.returncode == 0
+        effect.update({"ok": ok, "status": proc.returncode})
+        if stdout:
+            effect["stdout_sha256"] = sha256_hex(stdout)
+        if not self.deterministic:
+            effect["wall_s"] = round(time.perf_counter() - t0, 6)
+        self.counts["ran"] += 1
+        if ok:
+            self._remember_later(op, cwd, {k: v for k, v in effect.items() if k != "wall_s"})
+        else:
+            self.counts["failed"] += 1
+            if stderr:
+                tail = stderr.decode("utf-8", "replace").strip().splitlines()[-20:]
+                print(f"step_failed status={proc.returncode} cmd={command}", file=sys.stderr)
+                print("\n".join(tail), file=sys.stderr)
+        return ok, [effect]
+
+    def _remember_later(self, op: Dict[str, Any], cwd: Path, effect: Dict[str, Any]) -> None:
+        expanded = expand_command(op)
+        if self.cache is not None and expanded is not None:
+            self._done.append((step_key(op, cwd, expanded), cwd, expanded, effect))
+
+    def fs_write(self, op: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        path = str(op.get("path", ""))
+        target = self.sandboxed(path)
+        if target is None:
+            return self.blocked(f"fs.write:{path}", "path outside sandbox")
+        if not target.parent.exists():
+            if not op.get("create_dirs"):
+                return False, [{"kind": "write", "op": f"fs.write:{path}", "ok": False, "reason": "parent missing"}]
+            target.parent.mkdir(parents=True, exist_ok=True)
+        data = str(op.get("content", "")).encode("utf-8")
+        target.write_bytes(data)
+        if op.get("mode"):
+            target.chmod(int(str(op["mode"]), 8))
+        return True, [{"kind": "write", "op": f"fs.write:{path}", "ok": True, "sha256": sha256_hex(data)}]
+
+    def remember(self) -> None:
+        """Fingerprint the inputs of every successful step (post-run state) into the cache."""
+        if self.cache is None:
+            return
+        for key, cwd, command, effect in self._done:
+            inputs = self.prints.of(step_inputs(command, cwd, self.root))
+            self.cache.steps[key] = {"cmd": command, "working_dir": str(cwd), "inputs": inputs, "effect": effect}
+
+
+async def execute(doc: Dict[str, Any], runner: Runner) -> Tuple[bool, List[Dict[str, Any]]]:
+    """Top-level operations run in order; the first failing one stops the plan."""
+    effects: List[Dict[str, Any]] = []
+    for op in doc.get("operations") or []:
+        ok, more = await runner.run(op)
+        effects.extend(more)
+        if not ok:
+            return False, effects
+    return True, effects
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Run a UTIR document locally and write a receipt_v1")
+    ap.add_argument("utir", help="UTIR JSON file ('-' for stdin)")
+    ap.add_argument("--root", default="", help="Sandbox root and base for working_dir (default: $GRAPH_SANDBOX_ROOT or cwd)")
+    ap.add_argument("--receipt-dir", default="utir", help="Receipts go under <dir>/receipts/ (relative to --root)")
+    ap.add_argument("--deterministic", action="store_true", help="Mark the receipt deterministic and omit timings")
+    ap.add_argument("--cache", default=DEFAULT_CACHE, help="Step cache file (relative to --root)")
+    ap.add_argument("--no-cache", action="store_true", help="Run every step and leave the step cache untouched")
+    args = ap.parse_args()
+
+    raw = sys.stdin.read() if args.utir == "-" else Path(args.utir).read_text(encoding="utf-8")
+    doc = json.loads(raw)
+    root = Path(args.root or os.environ.get("GRAPH_SANDBOX_ROOT") or ".").resolve()
+    receipt_dir = (root / args.receipt_dir).resolve()
+    cache_path = (root / args.cache).resolve()
+    cache = None if args.no_cache else StepCache.load(cache_path)
+    runner = Runner(root, cache, exclude=[receipt_dir, cache_path], deterministic=args.deterministic)
+
+    t0 = time.perf_counter()
+    ok, effects = asyncio.run(execute(doc, runner))
+    runner.remember()
+    if cache is not None:
+        cache.save()
+
+    digest = input_sha256(doc)
+    receipt = {"version": "receipt_v1", "deterministic": bool(args.deterministic), "input_sha256": digest, "effects": effects}
+    out = receipt_dir / "receipts" / f"pkt-1-{digest[:12]}" / "receipt.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(receipt, indent=2), encoding="utf-8")
+
+    c = runner.counts
+    print(
+        f"utir_ok={int(ok)} task={doc.get('task_id', '')} ran={c['ran']} cached={c['cached']} failed={c['failed']}"
+        f" blocked={c['blocked']} hashed={runner.prints.hashed} receipt={out}"
+        f" duration_ms={(time.perf_counter() - t0) * 1000:.1f}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())